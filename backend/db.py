@@ -0,0 +1,152 @@
+"""
+Direct Postgres access for the API: an asyncpg pool created in the app lifespan.
+
+Requests run their queries as the calling user: `Database.as_user(claims)`
+opens a transaction with the verified JWT claims in `request.jwt.claims` and
+the `authenticated` role, so auth.uid() and RLS behave exactly as they do
+through PostgREST. Hot queries are named in QUERIES and run through asyncpg's
+per-connection statement cache, so each is prepared once per connection and
+then executed with only a bind/execute round trip.
+
+SUPABASE_DB_URL must be a direct (or session mode pooler) connection string:
+transaction mode poolers do not keep prepared statements.
+"""
+
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict
+
+import asyncpg
+
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+# Seconds to wait for a free connection before failing the request
+DB_ACQUIRE_TIMEOUT = float(os.getenv("DB_ACQUIRE_TIMEOUT", "5"))
+
+QUERIES = {
+    "weekend_board_version": (
+        "select version, full_view, next_expiry"
+        " from weekend_board_version($1, $2)"
+    ),
+    "weekend_board": "select weekend_board($1, $2)",
+    "can_assign_weekends": "select can_assign_weekends()",
+    "weekend_solver_snapshot": "select weekend_solver_snapshot($1)",
+    "finalize_weekend": "select finalize_weekend($1)",
+    "group_stats": (
+        "select member_count, pending_invitation_count, tee_time_count, "
+        "trade_count, updated_at from group_stats where group_id = $1"
+    ),
+}
+
+
+@dataclass(slots=True)
+class PoolMetrics:
+    """Counters since startup; pool size figures are read live from the pool."""
+
+    acquired: int = 0
+    acquire_timeouts: int = 0
+    acquire_wait_ms: float = 0.0
+    max_acquire_wait_ms: float = 0.0
+    queries: int = 0
+    query_errors: int = 0
+    query_ms: float = 0.0
+
+    def record_acquire(self, wait_ms: float):
+        self.acquired += 1
+        self.acquire_wait_ms += wait_ms
+        self.max_acquire_wait_ms = max(self.max_acquire_wait_ms, wait_ms)
+
+
+class Database:
+    def __init__(self, pool: asyncpg.Pool):
+        self.pool = pool
+        self.metrics = PoolMetrics()
+
+    @classmethod
+    async def connect(cls, dsn: str) -> "Database":
+        pool = await asyncpg.create_pool(
+            dsn,
+            min_size=DB_POOL_MIN_SIZE,
+            max_size=DB_POOL_MAX_SIZE,
+            server_settings={"application_name": "grouptee-backend"},
+        )
+        return cls(pool)
+
+    async def close(self):
+        await self.pool.close()
+
+    @asynccontextmanager
+    async def as_user(
+        self, claims: Dict[str, Any]
+    ) -> AsyncIterator["UserConnection"]:
+        """A connection in a transaction scoped to the caller's JWT claims."""
+        started = time.perf_counter()
+        try:
+            conn = await self.pool.acquire(timeout=DB_ACQUIRE_TIMEOUT)
+        except TimeoutError:
+            self.metrics.acquire_timeouts += 1
+            raise
+        self.metrics.record_acquire((time.perf_counter() - started) * 1000)
+        try:
+            async with conn.transaction():
+                await conn.execute(
+                    "select set_config('request.jwt.claims', $1, true), "
+                    "set_config('request.jwt.claim.sub', $2, true), "
+                    "set_config('role', 'authenticated', true)",
+                    json.dumps(claims),
+                    claims.get("sub", ""),
+                )
+                yield UserConnection(conn, self.metrics)
+        finally:
+            await self.pool.release(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        metrics = self.metrics
+        return {
+            "size": self.pool.get_size(),
+            "idle": self.pool.get_idle_size(),
+            "min_size": self.pool.get_min_size(),
+            "max_size": self.pool.get_max_size(),
+            "acquired": metrics.acquired,
+            "acquire_timeouts": metrics.acquire_timeouts,
+            "mean_acquire_wait_ms": round(
+                metrics.acquire_wait_ms / max(metrics.acquired, 1), 3
+            ),
+            "max_acquire_wait_ms": round(metrics.max_acquire_wait_ms, 3),
+            "queries": metrics.queries,
+            "query_errors": metrics.query_errors,
+            "mean_query_ms": round(metrics.query_ms / max(metrics.queries, 1), 3),
+        }
+
+
+class UserConnection:
+    """Runs the named QUERIES on a request's connection, with timing."""
+
+    __slots__ = ("conn", "metrics")
+
+    def __init__(self, conn: asyncpg.Connection, metrics: PoolMetrics):
+        self.conn = conn
+        self.metrics = metrics
+
+    async def _run(self, method, name: str, args) -> Any:
+        started = time.perf_counter()
+        try:
+            return await method(QUERIES[name], *args)
+        except Exception:
+            self.metrics.query_errors += 1
+            raise
+        finally:
+            self.metrics.queries += 1
+            self.metrics.query_ms += (time.perf_counter() - started) * 1000
+
+    async def fetch(self, name: str, *args) -> list:
+        return await self._run(self.conn.fetch, name, args)
+
+    async def fetchrow(self, name: str, *args):
+        return await self._run(self.conn.fetchrow, name, args)
+
+    async def fetchval(self, name: str, *args) -> Any:
+        return await self._run(self.conn.fetchval, name, args)
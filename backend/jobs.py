@@ -0,0 +1,179 @@
+"""
+Background jobs: CPU-bound work on a process pool, off the event loop.
+
+Jobs are single-flight per key (for solves, the weekend id and the solve
+parameters). While a job for a key is queued or running, further submissions
+join it instead of computing the same thing again, and every requester can
+poll or cancel it.
+
+Each job has a wall-clock budget, counted from submission. The job function
+gets the deadline as its `deadline` keyword argument and should stop by then
+with its best result. If it has not finished BUDGET_GRACE_SECONDS later, the
+job is marked timed_out. A cancelled or timed out job that has not started
+is removed from the pool queue. One that is already running can't be
+interrupted in its worker process. Its result is discarded, and the key is
+free for a new job right away.
+
+Jobs and their results are held in this process's memory, so they need a
+long-running host (uvicorn). On serverless (the Vercel deployment), a poll
+can reach another instance and an idle instance may be frozen mid-solve.
+JOB_WORKERS is 0 by default there, which disables jobs; set it on a
+long-running host to enable them.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Set
+
+logger = logging.getLogger("jobs")
+
+# Worker processes; 0 disables jobs
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "0"))
+# Finished jobs stay pollable this long
+JOB_RETENTION_SECONDS = 600
+BUDGET_GRACE_SECONDS = 2.0
+
+ACTIVE_STATUSES = {"queued", "running"}
+
+
+@dataclass(slots=True)
+class Job:
+    id: str
+    key: str
+    budget_seconds: float
+    deadline: float
+    requested_by: Set[str]
+    # The job's inputs other than bulk data, echoed back to requesters
+    params: Dict[str, Any] = field(default_factory=dict)
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    result: Any = None
+    error: str | None = None
+    future: Future | None = None
+    watcher: asyncio.Task | None = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        status = self.status
+        if status == "queued" and self.future is not None and self.future.running():
+            status = "running"
+        return {
+            "id": self.id,
+            "key": self.key,
+            "status": status,
+            "params": self.params,
+            "budget_seconds": self.budget_seconds,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.jobs: Dict[str, Job] = {}
+        self.active: Dict[str, Job] = {}
+        self.deduplicated = 0
+
+    def shutdown(self):
+        for job in self.active.values():
+            if job.watcher is not None:
+                job.watcher.cancel()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def get(self, job_id: str) -> Job | None:
+        return self.jobs.get(job_id)
+
+    def join(self, key: str, requester: str) -> Job | None:
+        """The queued or running job for `key`, with `requester` added to it."""
+        job = self.active.get(key)
+        if job is not None:
+            job.requested_by.add(requester)
+            self.deduplicated += 1
+        return job
+
+    def submit(
+        self,
+        key: str,
+        requester: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        budget_seconds: float,
+        params: Dict[str, Any] | None = None,
+    ) -> Job:
+        """Run fn(*args, deadline=...) in the pool, or join the key's active job."""
+        job = self.join(key, requester)
+        if job is not None:
+            return job
+        self._prune()
+
+        deadline = time.time() + budget_seconds
+        job = Job(
+            id=str(uuid.uuid4()),
+            key=key,
+            budget_seconds=budget_seconds,
+            deadline=deadline,
+            requested_by={requester},
+            params=params or {},
+        )
+        job.future = self.pool.submit(fn, *args, deadline=deadline)
+        job.watcher = asyncio.create_task(self._watch(job))
+        job.watcher.add_done_callback(lambda _task: self._finished(job))
+        self.jobs[job.id] = job
+        self.active[key] = job
+        return job
+
+    async def cancel(self, job: Job) -> bool:
+        if job.status not in ACTIVE_STATUSES or job.watcher is None:
+            return False
+        job.watcher.cancel()
+        await asyncio.wait({job.watcher})
+        return True
+
+    async def _watch(self, job: Job):
+        timeout = job.deadline - time.time() + BUDGET_GRACE_SECONDS
+        try:
+            job.result = await asyncio.wait_for(
+                asyncio.wrap_future(job.future), timeout
+            )
+            job.status = "succeeded"
+        except asyncio.TimeoutError:
+            job.status = "timed_out"
+        except Exception as exc:
+            logger.exception("Job %s (%s) failed", job.id, job.key)
+            job.status = "failed"
+            job.error = repr(exc)
+
+    def _finished(self, job: Job):
+        if job.watcher.cancelled():
+            job.status = "cancelled"
+        # Drops the job from the pool queue if it has not started
+        job.future.cancel()
+        job.finished_at = time.time()
+        if self.active.get(job.key) is job:
+            del self.active[job.key]
+
+    def _prune(self):
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        for job_id in [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]:
+            del self.jobs[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "jobs": len(self.jobs),
+            "active": len(self.active),
+            "deduplicated": self.deduplicated,
+        }
@@ -0,0 +1,136 @@
+"""
+Live change fan-out: Postgres LISTEN/NOTIFY to server-sent events.
+
+One dedicated connection LISTENs on the grouptee_changes channel, fed by the
+notify_live_changes triggers on assignments, tee_times and trades. Each
+notification is scoped to a weekend and a group; the hub hands it to every
+client subscribed to either. A client that falls behind (its queue fills)
+gets a resync event and is expected to refetch, as do all clients when the
+listener connection has to be re-established.
+
+The hub holds a LISTEN connection and every open stream in this process, so
+it needs a long-running host (uvicorn). Serverless functions (the Vercel
+deployment) are frozen between requests and cut off long responses. It is
+off unless LIVE_UPDATES=1.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, Set, Tuple
+
+import asyncpg
+
+logger = logging.getLogger("live")
+
+LIVE_UPDATES = os.getenv("LIVE_UPDATES", "0") == "1"
+
+CHANNEL = "grouptee_changes"
+# Events buffered per client before it is told to resync
+SUBSCRIBER_QUEUE_SIZE = 100
+# Seconds between SSE keepalive comments, and between listener health checks
+KEEPALIVE_SECONDS = 15.0
+RECONNECT_SECONDS = 5.0
+
+RESYNC = 'event: resync\ndata: {"type": "resync"}\n\n'
+
+Scope = Tuple[str, str]
+
+
+class ChangeHub:
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self.conn: asyncpg.Connection | None = None
+        self.subscribers: Dict[Scope, Set[asyncio.Queue]] = defaultdict(set)
+        self.supervisor: asyncio.Task | None = None
+        self.delivered = 0
+        self.dropped = 0
+
+    async def start(self):
+        await self._listen()
+        self.supervisor = asyncio.create_task(self._supervise())
+
+    async def stop(self):
+        if self.supervisor is not None:
+            self.supervisor.cancel()
+        if self.conn is not None and not self.conn.is_closed():
+            await self.conn.close()
+
+    async def _listen(self):
+        self.conn = await asyncpg.connect(
+            self.dsn, server_settings={"application_name": "grouptee-live"}
+        )
+        await self.conn.add_listener(CHANNEL, self._on_notify)
+
+    async def _supervise(self):
+        """Re-establish the listener if its connection drops."""
+        while True:
+            await asyncio.sleep(RECONNECT_SECONDS)
+            if self.conn is not None and not self.conn.is_closed():
+                continue
+            try:
+                await self._listen()
+            except (OSError, asyncpg.PostgresError):
+                logger.exception("Live listener reconnect failed")
+                continue
+            # Changes made while disconnected were missed
+            logger.info("Live listener reconnected")
+            for queues in self.subscribers.values():
+                for queue in list(queues):
+                    self._offer(queue, RESYNC)
+
+    def _on_notify(self, _conn, _pid, _channel, payload: str):
+        try:
+            change = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed live change: %.200s", payload)
+            return
+        change["type"] = "change"
+        # Formatted once, shared by every subscriber
+        event = f"event: change\ndata: {json.dumps(change)}\n\n"
+        for scope in (
+            ("weekend", change.get("weekend_id")),
+            ("group", change.get("group_id")),
+        ):
+            for queue in list(self.subscribers.get(scope, ())):
+                self._offer(queue, event)
+
+    def _offer(self, queue: asyncio.Queue, event: str):
+        try:
+            queue.put_nowait(event)
+            self.delivered += 1
+        except asyncio.QueueFull:
+            # Replace the backlog with a single resync
+            self.dropped += queue.qsize()
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC)
+
+    async def events(self, scope: Scope) -> AsyncIterator[str]:
+        """Server-sent event stream for one weekend or group."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.subscribers[scope].add(queue)
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield event
+        finally:
+            self.subscribers[scope].discard(queue)
+            if not self.subscribers[scope]:
+                del self.subscribers[scope]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "listening": self.conn is not None and not self.conn.is_closed(),
+            "scopes": len(self.subscribers),
+            "subscribers": sum(len(q) for q in self.subscribers.values()),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
@@ -1,17 +1,27 @@
+import json
 import os
-from typing import Any, Dict
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Tuple
 
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import jwt
+import asyncpg
 import httpx
 from dotenv import load_dotenv
 
-load_dotenv()
+import solver
+from db import Database, UserConnection
+from jobs import JOB_WORKERS, JobManager
+from live import LIVE_UPDATES, ChangeHub
 
-app = FastAPI()
+load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL", "")
+SUPABASE_DB_URL = os.getenv("SUPABASE_DB_URL", "")
 SUPABASE_JWKS_URL = os.getenv("SUPABASE_JWKS_URL", "").strip() or (
     SUPABASE_URL.rstrip("/") + "/auth/v1/certs" if SUPABASE_URL else ""
 )
@@ -19,6 +29,20 @@ SUPABASE_JWKS_URL = os.getenv("SUPABASE_JWKS_URL", "").strip() or (
 security = HTTPBearer(auto_error=True)
 
 jwks_cache: Dict[str, Any] | None = None
+db: Database | None = None
+hub: ChangeHub | None = None
+jobs: JobManager | None = None
+
+# Weekend boards by (weekend_id, group_id, full_view) -> (revision, JSON body),
+# where the revision is the weekend's version and the next pending invitation
+# expiry. Every write to a weekend bumps its version and every expiry moves
+# the next one, so stale entries are never served; they are replaced on the
+# next read or evicted least recently used.
+BOARD_CACHE_SIZE = 256
+BoardRevision = Tuple[int, int | None]
+board_cache: "OrderedDict[Tuple[str, str, bool], Tuple[BoardRevision, bytes]]" = (
+    OrderedDict()
+)
 
 
 async def get_jwks() -> Dict[str, Any]:
@@ -33,6 +57,20 @@ async def get_jwks() -> Dict[str, Any]:
     return jwks_cache  # type: ignore
 
 
+def board_etag(revision: BoardRevision, full_view: bool) -> str:
+    version, next_expiry = revision
+    view = "full" if full_view else "member"
+    return f'"{version}-{next_expiry or 0}-{view}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # If-None-Match uses weak comparison
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
 async def verify_jwt(
     creds: HTTPAuthorizationCredentials = Depends(security),
 ) -> Dict[str, Any]:
@@ -56,30 +94,270 @@ async def verify_jwt(
         )
 
 
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    global db, hub, jobs
+    if JOB_WORKERS > 0:
+        jobs = JobManager(JOB_WORKERS)
+    if SUPABASE_DB_URL:
+        db = await Database.connect(SUPABASE_DB_URL)
+        if LIVE_UPDATES:
+            hub = ChangeHub(SUPABASE_DB_URL)
+            await hub.start()
+    try:
+        yield
+    finally:
+        if jobs is not None:
+            jobs.shutdown()
+            jobs = None
+        if hub is not None:
+            await hub.stop()
+            hub = None
+        if db is not None:
+            await db.close()
+            db = None
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+async def user_db(
+    payload: Dict[str, Any] = Depends(verify_jwt),
+) -> AsyncIterator[UserConnection]:
+    """A pooled connection running as the verified caller (RLS applies)."""
+    if db is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database is not configured",
+        )
+    try:
+        async with db.as_user(payload) as conn:
+            yield conn
+    except TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database is busy",
+        )
+
+
 @app.get("/health")
 async def health():
     return {"status": "ok"}
 
 
+@app.get("/health/db")
+async def health_db():
+    """Connection pool size and usage counters."""
+    if db is None:
+        return {"status": "disabled"}
+    return {
+        "status": "ok",
+        "pool": db.stats(),
+        "live": hub.stats() if hub else None,
+        "jobs": jobs.stats() if jobs else None,
+    }
+
+
+def job_manager() -> JobManager:
+    # Jobs live in this process, so they need a long-running host
+    if jobs is None:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Background jobs are disabled (JOB_WORKERS=0)",
+        )
+    return jobs
+
+
+def live_stream(kind: str, scope_id: uuid.UUID) -> StreamingResponse:
+    if hub is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Live updates are not configured",
+        )
+    return StreamingResponse(
+        hub.events((kind, str(scope_id))),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/me")
 async def me(payload: Dict[str, Any] = Depends(verify_jwt)):
     return {"user_id": payload.get("sub"), "email": payload.get("email")}
 
 
-@app.post("/assign-weekend/{weekend_id}")
-async def assign_weekend(
-    weekend_id: str, _payload: Dict[str, Any] = Depends(verify_jwt)
+@app.get("/weekends/{weekend_id}/board")
+async def weekend_board(
+    weekend_id: uuid.UUID,
+    group_id: uuid.UUID,
+    if_none_match: str | None = Header(default=None),
+    conn: UserConnection = Depends(user_db),
 ):
-    # Stubbed dummy assignments
+    """
+    A group's complete weekend in one response: tee times with their players,
+    group members and (for admins) interests and pending invitations.
+    The strong ETag is the weekend's version (plus, for admins, when the next
+    pending invitation expires), so unchanged boards cost one version lookup
+    and a 304.
+    """
+    current = await conn.fetchrow("weekend_board_version", weekend_id, group_id)
+    revision = (current["version"], current["next_expiry"])
+    etag = board_etag(revision, current["full_view"])
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    key = (str(weekend_id), str(group_id), current["full_view"])
+    cached = board_cache.get(key)
+    if cached and cached[0] == revision:
+        board_cache.move_to_end(key)
+        body = cached[1]
+    else:
+        body = await conn.fetchval("weekend_board", weekend_id, group_id)
+        if body is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Weekend not found"
+            )
+        # The board may have been read after a newer write than the version
+        # lookup saw; its own revision is authoritative
+        board = json.loads(body)
+        revision = (board["version"], board["next_expiry"])
+        headers["ETag"] = board_etag(revision, current["full_view"])
+        body = body.encode()
+        board_cache[key] = (revision, body)
+        board_cache.move_to_end(key)
+        while len(board_cache) > BOARD_CACHE_SIZE:
+            board_cache.popitem(last=False)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@app.get("/groups/{group_id}/stats")
+async def group_stats(
+    group_id: uuid.UUID,
+    conn: UserConnection = Depends(user_db),
+):
+    """Dashboard counters for a group, read from the trigger-maintained row."""
+    row = await conn.fetchrow("group_stats", group_id)
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Group not found"
+        )
     return {
-        "weekend_id": weekend_id,
-        "assignments": [
-            {"user_id": "u1", "group": "A", "time": "8:10 AM"},
-            {"user_id": "u2", "group": "B", "time": "8:20 AM"},
-        ],
+        "group_id": str(group_id),
+        "players": row["member_count"] + row["pending_invitation_count"],
+        "members": row["member_count"],
+        "pending_invitations": row["pending_invitation_count"],
+        "tee_times": row["tee_time_count"],
+        "trades": row["trade_count"],
+        "updated_at": row["updated_at"],
     }
 
 
+@app.get("/weekends/{weekend_id}/live")
+async def weekend_live(
+    weekend_id: uuid.UUID, _payload: Dict[str, Any] = Depends(verify_jwt)
+):
+    """Server-sent events for assignment, tee time and trade changes in a weekend."""
+    return live_stream("weekend", weekend_id)
+
+
+@app.get("/groups/{group_id}/live")
+async def group_live(
+    group_id: uuid.UUID, _payload: Dict[str, Any] = Depends(verify_jwt)
+):
+    """Server-sent events for assignment, tee time and trade changes in a group."""
+    return live_stream("group", group_id)
+
+
+@app.post("/assign-weekend/{weekend_id}", status_code=status.HTTP_202_ACCEPTED)
+async def assign_weekend(
+    weekend_id: uuid.UUID,
+    response: Response,
+    budget_seconds: float = Query(default=10.0, gt=0, le=60),
+    max_moves: int = Query(default=solver.DEFAULT_MAX_MOVES, ge=0, le=50),
+    payload: Dict[str, Any] = Depends(verify_jwt),
+    conn: UserConnection = Depends(user_db),
+):
+    """
+    Start (or join) the solver job for a weekend and return it; poll
+    GET /jobs/{id} for the plan. The solve starts from the current
+    assignments and moves at most max_moves existing players. Admins only.
+    """
+    if not await conn.fetchval("can_assign_weekends"):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admins only")
+    # Requests join a solve only if it uses the same parameters
+    key = f"{weekend_id}:{max_moves}:{budget_seconds}"
+    manager = job_manager()
+    job = manager.join(key, payload["sub"])
+    if job is None:
+        snapshot = await conn.fetchval("weekend_solver_snapshot", weekend_id)
+        if snapshot is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Weekend not found"
+            )
+        job = manager.submit(
+            key,
+            payload["sub"],
+            solver.solve,
+            json.loads(snapshot),
+            max_moves,
+            budget_seconds=budget_seconds,
+            params={"weekend_id": str(weekend_id), "max_moves": max_moves},
+        )
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return job.as_dict()
+
+
+@app.post("/weekends/{weekend_id}/finalize")
+async def finalize_weekend(
+    weekend_id: uuid.UUID,
+    conn: UserConnection = Depends(user_db),
+):
+    """
+    Mark a weekend's assignments as final and add them (and the players left
+    out) to the fairness ledger the solver reads. Admins only; once per weekend.
+    """
+    if not await conn.fetchval("can_assign_weekends"):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admins only")
+    try:
+        summary = await conn.fetchval("finalize_weekend", weekend_id)
+    except asyncpg.ObjectNotInPrerequisiteStateError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Weekend already finalized"
+        )
+    if summary is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Weekend not found"
+        )
+    return json.loads(summary)
+
+
+def requested_job(job_id: uuid.UUID, payload: Dict[str, Any]):
+    job = job_manager().get(str(job_id))
+    # Jobs are visible only to the users who requested them
+    if job is None or payload.get("sub") not in job.requested_by:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found"
+        )
+    return job
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: uuid.UUID, payload: Dict[str, Any] = Depends(verify_jwt)):
+    return requested_job(job_id, payload).as_dict()
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: uuid.UUID, payload: Dict[str, Any] = Depends(verify_jwt)):
+    job = requested_job(job_id, payload)
+    if not await job_manager().cancel(job):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Job already finished"
+        )
+    return job.as_dict()
+
+
 @app.post("/trades/validate")
 async def validate_trade(_payload: Dict[str, Any] = Depends(verify_jwt)):
     return {"valid": True}
@@ -0,0 +1,145 @@
+"""
+Local stand-in for the Expo push API, for running the push dispatcher offline.
+
+Accepts POST /--/api/v2/push/send like Expo does: at most 100 messages per
+request, one ticket per message. POST /--/api/v2/push/getReceipts returns
+the receipts of up to 1000 ticket ids. To exercise token pruning, tokens
+containing "unregistered" get a DeviceNotRegistered error ticket, and tokens
+containing "uninstalled" get an ok ticket and a DeviceNotRegistered receipt.
+Send requests are kept on the server (`server.requests`) for inspection.
+
+Usage:
+    python mock_expo_push.py --port 8758
+    EXPO_PUSH_URL=http://127.0.0.1:8758/--/api/v2/push/send \\
+    EXPO_RECEIPTS_URL=http://127.0.0.1:8758/--/api/v2/push/getReceipts \\
+    python push_dispatcher.py
+"""
+
+import argparse
+import json
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+SEND_PATH = "/--/api/v2/push/send"
+RECEIPTS_PATH = "/--/api/v2/push/getReceipts"
+MAX_MESSAGES = 100
+MAX_RECEIPT_IDS = 1000
+
+DEVICE_NOT_REGISTERED = {"error": "DeviceNotRegistered"}
+
+
+def ticket_for(message: dict) -> dict:
+    if "unregistered" in message.get("to", ""):
+        return {
+            "status": "error",
+            "message": f"\"{message['to']}\" is not a registered push token",
+            "details": DEVICE_NOT_REGISTERED,
+        }
+    return {"status": "ok", "id": str(uuid.uuid4())}
+
+
+def receipt_for(token: str) -> dict:
+    if "uninstalled" in token:
+        return {
+            "status": "error",
+            "message": "The device cannot receive push notifications anymore",
+            "details": DEVICE_NOT_REGISTERED,
+        }
+    return {"status": "ok"}
+
+
+class MockExpoPushHandler(BaseHTTPRequestHandler):
+    """Serves the push endpoints; received batches go to server.requests."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"null")
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        if path == SEND_PATH:
+            self._push_send(self._read_json() or [])
+        elif path == RECEIPTS_PATH:
+            self._get_receipts((self._read_json() or {}).get("ids", []))
+        else:
+            self._send_json(404, {"errors": [{"message": "Not found"}]})
+
+    def _get_receipts(self, ids: list):
+        if len(ids) > MAX_RECEIPT_IDS:
+            self._send_json(
+                400, {"errors": [{"message": f"At most {MAX_RECEIPT_IDS} ids"}]}
+            )
+            return
+        with self.server.lock:
+            known = self.server.tickets
+            tokens = {i: known[i] for i in ids if i in known}
+        self._send_json(
+            200, {"data": {i: receipt_for(token) for i, token in tokens.items()}}
+        )
+
+    def _push_send(self, messages):
+        if isinstance(messages, dict):
+            messages = [messages]
+        if len(messages) > MAX_MESSAGES:
+            self._send_json(
+                400,
+                {
+                    "errors": [
+                        {
+                            "code": "PUSH_TOO_MANY_NOTIFICATIONS",
+                            "message": f"Sent {len(messages)} notifications, "
+                            f"the limit is {MAX_MESSAGES}",
+                        }
+                    ]
+                },
+            )
+            return
+        tickets = [ticket_for(m) for m in messages]
+        with self.server.lock:
+            self.server.requests.append(messages)
+            for message, ticket in zip(messages, tickets):
+                if ticket["status"] == "ok":
+                    self.server.tickets[ticket["id"]] = message["to"]
+        self._send_json(200, {"data": tickets})
+
+
+def start_server(host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start the stand-in on a background thread. Port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), MockExpoPushHandler)
+    server.requests = []
+    server.tickets = {}
+    server.lock = threading.Lock()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8758)
+    args = parser.parse_args()
+
+    server = start_server(args.host, args.port)
+    print(f"Mock Expo push API at http://{args.host}:{server.server_port}{SEND_PATH}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
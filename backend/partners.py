@@ -0,0 +1,144 @@
+"""
+Partner clusters: the solver's preprocessing of interests.partners.
+
+Partner requests chain (A asks for B, B for C) and can be one-sided or
+circular. Rather than weigh every pair during the solve, requests are treated
+as undirected links and the players are grouped into connected clusters with
+union-find, which settles chains and cycles in near-linear time. A cluster
+that fits in a tee time becomes one placement unit. One that doesn't is split
+into units that fit, keeping each player with as many of their partners as
+possible.
+
+Clustering runs per group and day over the players being placed; requests
+for players outside that set (another group, not playing, already assigned)
+are not links.
+"""
+
+import json
+from collections import deque
+from typing import Any, Dict, Iterable, List
+
+
+class UnionFind:
+    """Disjoint sets with union by size and path halving."""
+
+    def __init__(self, items: Iterable[str]):
+        self.parent = {item: item for item in items}
+        self.size = {item: 1 for item in self.parent}
+
+    def find(self, item: str) -> str:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: str, b: str):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+
+    def groups(self) -> List[List[str]]:
+        members: Dict[str, List[str]] = {}
+        for item in self.parent:
+            members.setdefault(self.find(item), []).append(item)
+        return sorted(sorted(group) for group in members.values())
+
+
+def parse_partners(value: Any) -> List[str]:
+    """Partner ids from interests.partners: a JSON array, or an older string."""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return []
+    if not isinstance(value, list):
+        return []
+    return [partner for partner in value if isinstance(partner, str)]
+
+
+def partner_links(
+    players: Iterable[str], requests: Dict[str, List[str]]
+) -> Dict[str, List[str]]:
+    """Undirected partner links between `players`, from their requests."""
+    players = set(players)
+    links: Dict[str, set] = {player: set() for player in players}
+    for player in players:
+        for partner in requests.get(player, ()):
+            if partner in players and partner != player:
+                links[player].add(partner)
+                links[partner].add(player)
+    return {player: sorted(partners) for player, partners in links.items()}
+
+
+def split_cluster(
+    cluster: List[str],
+    sizes: Dict[str, int],
+    links: Dict[str, List[str]],
+    capacity: int,
+) -> List[List[str]]:
+    """
+    Pack an oversized cluster into units of at most `capacity` spots.
+    Players are taken breadth-first from the best-connected one, so partners
+    are considered together, and each goes to the unit holding most of its
+    partners that has room (otherwise a new unit). A party too large for any
+    tee time is a unit of its own.
+    """
+    start = min(cluster, key=lambda player: (-len(links[player]), player))
+    order = []
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        player = queue.popleft()
+        order.append(player)
+        for partner in links[player]:
+            if partner not in seen:
+                seen.add(partner)
+                queue.append(partner)
+
+    units: List[List[str]] = []
+    used: List[int] = []
+    for player in order:
+        size = sizes[player]
+        best = None
+        best_key = None
+        for index, unit in enumerate(units):
+            if used[index] + size > capacity:
+                continue
+            together = sum(1 for partner in links[player] if partner in unit)
+            key = (-together, -used[index], index)
+            if best_key is None or key < best_key:
+                best, best_key = index, key
+        if best is None:
+            units.append([player])
+            used.append(size)
+        else:
+            units[best].append(player)
+            used[best] += size
+    return units
+
+
+def partner_units(
+    sizes: Dict[str, int], requests: Dict[str, List[str]], capacity: int
+) -> List[List[str]]:
+    """
+    Group players (ids -> party size, guests included) into placement units
+    of at most `capacity` spots, keeping requested partners together.
+    """
+    links = partner_links(sizes, requests)
+    clusters = UnionFind(sizes)
+    for player, partners in links.items():
+        for partner in partners:
+            clusters.union(player, partner)
+
+    units = []
+    for cluster in clusters.groups():
+        if sum(sizes[player] for player in cluster) <= capacity:
+            units.append(cluster)
+        else:
+            units.extend(split_cluster(cluster, sizes, links, capacity))
+    return units
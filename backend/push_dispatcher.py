@@ -0,0 +1,399 @@
+"""
+Push notification dispatcher: drains notification_outbox into Expo.
+
+Runs as a separate worker next to the API (python push_dispatcher.py). Each
+cycle claims the pending outbox rows of users whose oldest notification has
+waited out the coalescing window, merges each user's rows into a single push,
+looks up all of their push tokens in bulk and sends the messages to Expo in
+batches of up to 100 per request. A user's rows are completed once Expo has
+accepted every batch holding their messages. If any of those batches fail,
+the rows are released and retried after a backoff that grows per attempt.
+Rows that use up their attempts are logged as errors.
+
+Token hygiene: the tickets Expo returns are stored in push_tickets, and a
+second loop fetches their receipts in batches once Expo has them. Ticket and
+receipt outcomes are reported per token to record_push_token_results, which
+deletes DeviceNotRegistered tokens and counts other failures; tokens that
+keep failing are disabled and skipped when sending.
+
+Environment:
+  SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY
+  EXPO_PUSH_URL            push endpoint (point at a local stand-in to test)
+  EXPO_RECEIPTS_URL        receipts endpoint
+  EXPO_ACCESS_TOKEN        optional, for projects with enhanced push security
+  PUSH_COALESCE_SECONDS    how long to gather a user's notifications (5)
+  PUSH_POLL_SECONDS        idle wait between empty cycles (2)
+  PUSH_RECEIPT_POLL_SECONDS  wait between receipt checks (60)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger("push_dispatcher")
+
+SUPABASE_URL = os.getenv("SUPABASE_URL", "")
+SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
+EXPO_PUSH_URL = os.getenv("EXPO_PUSH_URL", "https://exp.host/--/api/v2/push/send")
+EXPO_RECEIPTS_URL = os.getenv(
+    "EXPO_RECEIPTS_URL", "https://exp.host/--/api/v2/push/getReceipts"
+)
+EXPO_ACCESS_TOKEN = os.getenv("EXPO_ACCESS_TOKEN", "")
+PUSH_COALESCE_SECONDS = float(os.getenv("PUSH_COALESCE_SECONDS", "5"))
+PUSH_POLL_SECONDS = float(os.getenv("PUSH_POLL_SECONDS", "2"))
+PUSH_RECEIPT_POLL_SECONDS = float(os.getenv("PUSH_RECEIPT_POLL_SECONDS", "60"))
+
+# Expo accepts at most 100 messages per send request
+EXPO_BATCH_SIZE = 100
+# Users claimed per cycle, and per push_tokens lookup (bounded by URL length)
+CLAIM_USERS = 500
+TOKEN_LOOKUP_CHUNK = 200
+# Expo requests in flight at once
+SEND_CONCURRENCY = 4
+# Expo returns at most 1000 receipts per request, and keeps them for a day
+RECEIPT_BATCH_SIZE = 1000
+RECEIPT_RETENTION = timedelta(hours=24)
+
+
+@dataclass(slots=True)
+class UserPush:
+    """One user's coalesced notifications."""
+
+    user_id: str
+    outbox_ids: List[int] = field(default_factory=list)
+    notification_ids: List[str] = field(default_factory=list)
+    messages: List[str] = field(default_factory=list)
+
+    @property
+    def body(self) -> str:
+        if len(self.messages) == 1:
+            return self.messages[0]
+        return f"{self.messages[-1]} (+{len(self.messages) - 1} more updates)"
+
+
+def coalesce(rows: List[Dict[str, Any]]) -> List[UserPush]:
+    """Group claimed outbox rows (ordered by created_at) into one push per user."""
+    pushes: Dict[str, UserPush] = {}
+    for row in rows:
+        push = pushes.get(row["user_id"])
+        if push is None:
+            push = pushes[row["user_id"]] = UserPush(row["user_id"])
+        push.outbox_ids.append(row["id"])
+        if row["notification_id"]:
+            push.notification_ids.append(row["notification_id"])
+        push.messages.append(row["message"])
+    return list(pushes.values())
+
+
+def expo_messages(
+    pushes: List[UserPush], tokens: Dict[str, List[str]]
+) -> List[Dict[str, Any]]:
+    """Expo push messages: one per device token of each user, each token once."""
+    messages = []
+    seen = set()
+    for push in pushes:
+        for token in tokens.get(push.user_id, []):
+            if token in seen:
+                continue
+            seen.add(token)
+            messages.append(
+                {
+                    "to": token,
+                    "sound": "default",
+                    "title": "GroupTee",
+                    "body": push.body,
+                    "data": {"notificationIds": push.notification_ids},
+                }
+            )
+    return messages
+
+
+def token_outcome(token: str, ticket: Dict[str, Any]) -> Dict[str, Any]:
+    """A record_push_token_results entry from an Expo ticket or receipt."""
+    outcome = {"token": token, "status": ticket.get("status", "error"), "error": None}
+    if outcome["status"] == "error":
+        details = ticket.get("details") or {}
+        outcome["error"] = details.get("error") or ticket.get("message", "unknown")
+    return outcome
+
+
+def chunks(items: List[Any], size: int) -> List[List[Any]]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+class PushDispatcher:
+    def __init__(
+        self,
+        supabase_url: str = SUPABASE_URL,
+        service_role_key: str = SUPABASE_SERVICE_ROLE_KEY,
+        push_url: str = EXPO_PUSH_URL,
+        receipts_url: str = EXPO_RECEIPTS_URL,
+        coalesce_seconds: float = PUSH_COALESCE_SECONDS,
+    ):
+        if not supabase_url or not service_role_key:
+            raise RuntimeError(
+                "SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be configured"
+            )
+        self.rest = httpx.AsyncClient(
+            base_url=supabase_url.rstrip("/") + "/rest/v1",
+            headers={
+                "apikey": service_role_key,
+                "Authorization": f"Bearer {service_role_key}",
+            },
+            timeout=10.0,
+        )
+        push_headers = {"Accept": "application/json", "Accept-Encoding": "gzip"}
+        if EXPO_ACCESS_TOKEN:
+            push_headers["Authorization"] = f"Bearer {EXPO_ACCESS_TOKEN}"
+        self.push = httpx.AsyncClient(headers=push_headers, timeout=30.0)
+        self.push_url = push_url
+        self.receipts_url = receipts_url
+        self.coalesce_seconds = coalesce_seconds
+        self.send_slots = asyncio.Semaphore(SEND_CONCURRENCY)
+
+    async def close(self):
+        await self.rest.aclose()
+        await self.push.aclose()
+
+    async def rpc(self, name: str, params: Dict[str, Any]) -> Any:
+        resp = await self.rest.post(f"/rpc/{name}", json=params)
+        resp.raise_for_status()
+        return resp.json() if resp.content else None
+
+    async def claim(self) -> List[Dict[str, Any]]:
+        return await self.rpc(
+            "claim_notification_outbox",
+            {
+                "max_users": CLAIM_USERS,
+                "coalesce_window": f"{self.coalesce_seconds} seconds",
+            },
+        )
+
+    async def fetch_tokens(self, user_ids: List[str]) -> Dict[str, List[str]]:
+        """All push tokens of the given users, in a few bulk queries."""
+        tokens: Dict[str, List[str]] = {}
+        for chunk in chunks(user_ids, TOKEN_LOOKUP_CHUNK):
+            resp = await self.rest.get(
+                "/push_tokens",
+                params={
+                    "select": "user_id,token",
+                    "disabled_at": "is.null",
+                    "user_id": f"in.({','.join(chunk)})",
+                },
+            )
+            resp.raise_for_status()
+            for row in resp.json():
+                tokens.setdefault(row["user_id"], []).append(row["token"])
+        return tokens
+
+    async def send_batch(
+        self, messages: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Send up to 100 messages in one Expo request; returns the tickets."""
+        async with self.send_slots:
+            resp = await self.push.post(self.push_url, json=messages)
+        resp.raise_for_status()
+        return resp.json().get("data", [])
+
+    async def record_results(
+        self, results: List[Dict[str, Any]], ticket_ids: List[str] | None = None
+    ) -> Dict[str, Any]:
+        """Report per-token outcomes and drop the processed tickets."""
+        summary = await self.rpc(
+            "record_push_token_results",
+            {"results": results, "processed_ticket_ids": ticket_ids or []},
+        )
+        if summary["removed"] or summary["failed"]:
+            logger.info(
+                "Push tokens: %d unregistered removed, %d failing",
+                summary["removed"],
+                summary["failed"],
+            )
+        return summary
+
+    async def store_tickets(self, tickets: List[Dict[str, Any]]):
+        """Keep accepted tickets until their receipts are checked."""
+        if not tickets:
+            return
+        resp = await self.rest.post(
+            "/push_tickets",
+            json=tickets,
+            headers={"Prefer": "resolution=ignore-duplicates,return=minimal"},
+        )
+        resp.raise_for_status()
+
+    async def dispatch(self, pushes: List[UserPush]) -> Tuple[int, Dict[str, str]]:
+        """
+        Send the pushes. Returns the number of Expo messages accepted and,
+        for users with a message in a failed batch, the error.
+        """
+        tokens = await self.fetch_tokens([push.user_id for push in pushes])
+        token_users = {
+            token: user_id for user_id, owned in tokens.items() for token in owned
+        }
+        messages = expo_messages(pushes, tokens)
+        batches = chunks(messages, EXPO_BATCH_SIZE)
+        # A failed batch must not undo the batches Expo accepted
+        results = await asyncio.gather(
+            *(self.send_batch(batch) for batch in batches), return_exceptions=True
+        )
+
+        accepted = []
+        failures = []
+        failed_users: Dict[str, str] = {}
+        sent = 0
+        for batch, tickets in zip(batches, results):
+            if isinstance(tickets, BaseException):
+                logger.error("Expo push batch failed: %r", tickets)
+                for message in batch:
+                    failed_users[token_users[message["to"]]] = str(tickets)[:500]
+                continue
+            sent += len(batch)
+            for message, ticket in zip(batch, tickets):
+                if ticket.get("status") == "ok":
+                    accepted.append({"ticket_id": ticket["id"], "token": message["to"]})
+                else:
+                    failures.append(token_outcome(message["to"], ticket))
+        # The pushes are out; failing to record them must not get their
+        # outbox rows released and sent again
+        try:
+            await self.store_tickets(accepted)
+            if failures:
+                await self.record_results(failures)
+        except Exception:
+            logger.exception(
+                "Recording %d tickets and %d failed tokens failed",
+                len(accepted),
+                len(failures),
+            )
+        return sent, failed_users
+
+    async def release(self, outbox_ids: List[int], error: str):
+        exhausted = await self.rpc(
+            "release_notification_outbox",
+            {"outbox_ids": outbox_ids, "error": error},
+        )
+        if exhausted:
+            logger.error(
+                "%d outbox rows used all their attempts and were marked failed: %s",
+                exhausted,
+                error,
+            )
+
+    async def run_once(self) -> int:
+        """One claim/send cycle; returns the number of outbox rows completed."""
+        rows = await self.claim()
+        if not rows:
+            return 0
+
+        started = time.perf_counter()
+        pushes = coalesce(rows)
+        try:
+            sent, failed_users = await self.dispatch(pushes)
+        except Exception as e:
+            logger.exception("Push dispatch failed; releasing %d rows", len(rows))
+            await self.release([row["id"] for row in rows], str(e)[:500])
+            return 0
+
+        completed = []
+        released: Dict[str, List[int]] = {}
+        for push in pushes:
+            error = failed_users.get(push.user_id)
+            if error is None:
+                completed.extend(push.outbox_ids)
+            else:
+                released.setdefault(error, []).extend(push.outbox_ids)
+        if completed:
+            await self.rpc("complete_notification_outbox", {"outbox_ids": completed})
+        for error, outbox_ids in released.items():
+            await self.release(outbox_ids, error)
+        logger.info(
+            "Dispatched %d of %d notifications as %d pushes (%d messages, %d "
+            "Expo requests) in %.0f ms",
+            len(completed),
+            len(rows),
+            len(pushes),
+            sent,
+            -(-sent // EXPO_BATCH_SIZE),
+            (time.perf_counter() - started) * 1000,
+        )
+        return len(completed)
+
+    async def check_receipts(self) -> int:
+        """
+        Fetch receipts for claimed tickets and apply them to their tokens.
+        Tickets Expo has no receipt for yet are retried after their claim
+        lapses, until they are older than Expo keeps receipts.
+        """
+        tickets = await self.rpc(
+            "claim_push_tickets", {"max_tickets": RECEIPT_BATCH_SIZE}
+        )
+        if not tickets:
+            return 0
+
+        resp = await self.push.post(
+            self.receipts_url, json={"ids": [t["ticket_id"] for t in tickets]}
+        )
+        resp.raise_for_status()
+        receipts = resp.json().get("data", {})
+
+        expired_before = datetime.now(timezone.utc) - RECEIPT_RETENTION
+        results = []
+        processed = []
+        for ticket in tickets:
+            receipt = receipts.get(ticket["ticket_id"])
+            if receipt is not None:
+                results.append(token_outcome(ticket["token"], receipt))
+                processed.append(ticket["ticket_id"])
+            elif datetime.fromisoformat(ticket["created_at"]) < expired_before:
+                processed.append(ticket["ticket_id"])
+        await self.record_results(results, processed)
+        return len(tickets)
+
+    async def run_receipts(self, poll_seconds: float = PUSH_RECEIPT_POLL_SECONDS):
+        while True:
+            try:
+                checked = await self.check_receipts()
+            except Exception:
+                logger.exception("Push receipt check failed")
+                checked = 0
+            if checked < RECEIPT_BATCH_SIZE:
+                await asyncio.sleep(poll_seconds)
+
+    async def run(self, poll_seconds: float = PUSH_POLL_SECONDS):
+        await asyncio.gather(self.run_dispatch(poll_seconds), self.run_receipts())
+
+    async def run_dispatch(self, poll_seconds: float = PUSH_POLL_SECONDS):
+        while True:
+            try:
+                handled = await self.run_once()
+            except Exception:
+                logger.exception("Push dispatcher cycle failed")
+                handled = 0
+            # Also backs off after a cycle whose sends all failed
+            if not handled:
+                await asyncio.sleep(poll_seconds)
+
+
+async def main():
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    dispatcher = PushDispatcher()
+    try:
+        await dispatcher.run()
+    finally:
+        await dispatcher.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
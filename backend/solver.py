@@ -0,0 +1,466 @@
+"""
+Weekend assignment solver.
+
+Places the players who want to play on each day of a weekend into their
+group's tee times. Input is a snapshot from weekend_solver_snapshot() (plain
+JSON, so a solve can run in a worker process); output is a plan that admins
+can review and apply: new placements, moves and removals.
+
+Solves are warm-started from the weekend's existing assignments, so a re-solve
+after a late change only touches the tee times the change affects:
+
+- a player who no longer wants to play is removed, freeing their spots;
+- a tee time over capacity (max_players was lowered) sheds the fewest
+  parties that bring it back under, and they are re-placed in the same group
+  and day if there is room;
+- players not yet assigned are grouped with their requested partners into
+  units (see partners.py) and placed greedily, largest unit first, into the
+  tee time that holds partners already assigned, then best matches their
+  time preference, then fits tightest. When nothing fits, one existing player
+  may be moved to another tee time to make room, up to max_moves moves per
+  solve.
+
+Across weekends, the fairness ledger (rounds played, early and late rounds,
+days missed; see the fairness_ledger migration) evens things out: players who
+were left out before are placed first, and early and late tee times go to the
+players who have had the fewest of them.
+
+Everyone else keeps their tee time. The solver checks its deadline between
+placements and returns the plan so far when the time budget runs out.
+"""
+
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Set, Tuple
+
+from partners import parse_partners, partner_units
+
+# Time preference windows, in tee time order; the cost of a tee time for a
+# player is how many windows it is away from the preferred one
+PREFERENCE_WINDOWS = ["morning", "mid-morning", "afternoon", "late-afternoon"]
+WINDOW_STARTS = ["00:00", "09:00", "11:00", "14:00"]
+
+EARLY_WINDOW = 0
+LATE_WINDOW = len(PREFERENCE_WINDOWS) - 1
+
+# tee_times.max_players is nullable; the column default applies
+DEFAULT_MAX_PLAYERS = 4
+
+# Existing players that may be moved to make room for new ones
+DEFAULT_MAX_MOVES = 2
+
+
+def time_window(tee_time: str) -> int:
+    """Index into PREFERENCE_WINDOWS for an HH:MM[:SS] tee time."""
+    hhmm = tee_time[:5]
+    return max(i for i, start in enumerate(WINDOW_STARTS) if hhmm >= start)
+
+
+def preference_window(preference: str | None) -> int | None:
+    if preference in PREFERENCE_WINDOWS:
+        return PREFERENCE_WINDOWS.index(preference)
+    return None
+
+
+@dataclass(slots=True)
+class Party:
+    """A player who wants to play on a date, with their guests."""
+
+    user_id: str
+    group_id: str
+    tee_date: str
+    size: int
+    window: int | None
+    # Set for players who already have an assignment
+    assignment_id: str | None = None
+    assigned_tee_time_id: str | None = None
+    # From the fairness ledger: days missed, and the share of rounds played
+    # in early and late tee times
+    missed: int = 0
+    early_share: float = 0.0
+    late_share: float = 0.0
+
+
+@dataclass(slots=True)
+class Unit:
+    """Parties placed together in one tee time: a partner cluster, or one."""
+
+    members: List[Party]
+    group_id: str
+    tee_date: str
+    size: int
+    window: int | None
+    # Tee times where partners of the members are already assigned
+    anchors: Set[str] = field(default_factory=set)
+    missed: int = 0
+    early_share: float = 0.0
+    late_share: float = 0.0
+
+    @property
+    def user_id(self) -> str:
+        return self.members[0].user_id
+
+
+@dataclass(slots=True)
+class Slot:
+    """A tee time with its remaining capacity and its (movable) players."""
+
+    id: str
+    group_id: str
+    tee_date: str
+    tee_time: str
+    window: int
+    capacity: int
+    free: int
+    parties: List[Party] = field(default_factory=list)
+
+
+def build_slots(snapshot: Dict[str, Any]) -> Dict[str, Slot]:
+    slots = {}
+    for t in sorted(
+        snapshot["tee_times"], key=lambda t: (t["tee_date"], t["tee_time"])
+    ):
+        capacity = t["max_players"]
+        if capacity is None:
+            capacity = DEFAULT_MAX_PLAYERS
+        slots[t["id"]] = Slot(
+            id=t["id"],
+            group_id=t["group_id"],
+            tee_date=t["tee_date"],
+            tee_time=t["tee_time"],
+            window=time_window(t["tee_time"]),
+            capacity=capacity,
+            free=capacity - t["occupied_spots"],
+        )
+    return slots
+
+
+def new_party(player: Dict[str, Any], ledger: Dict[str, int] | None) -> Party:
+    ledger = ledger or {}
+    rounds = max(ledger.get("rounds_played", 0), 1)
+    return Party(
+        user_id=player["user_id"],
+        group_id=player["group_id"],
+        tee_date=player["interest_date"],
+        size=1 + (player.get("guest_count") or 0),
+        window=preference_window(player.get("time_preference")),
+        missed=ledger.get("missed_rounds", 0),
+        early_share=ledger.get("early_rounds", 0) / rounds,
+        late_share=ledger.get("late_rounds", 0) / rounds,
+    )
+
+
+def make_unit(members: List[Party], anchors: Set[str] | None = None) -> Unit:
+    windows = Counter(m.window for m in members if m.window is not None)
+    return Unit(
+        members=members,
+        group_id=members[0].group_id,
+        tee_date=members[0].tee_date,
+        size=sum(m.size for m in members),
+        # The most common preference; ties go to the earlier window
+        window=min(windows, key=lambda w: (-windows[w], w)) if windows else None,
+        anchors=anchors or set(),
+        missed=max(m.missed for m in members),
+        early_share=sum(m.early_share for m in members) / len(members),
+        late_share=sum(m.late_share for m in members) / len(members),
+    )
+
+
+def window_share(unit: Unit, window: int | None) -> float:
+    """The unit's past share of rounds in an early or late window, else 0."""
+    if window == EARLY_WINDOW:
+        return unit.early_share
+    if window == LATE_WINDOW:
+        return unit.late_share
+    return 0.0
+
+
+def placement_order(unit: Unit) -> tuple:
+    # Units joining assigned partners want one particular tee time; then
+    # players left out on earlier weekends; large units are the hardest to
+    # place; flexible players go last. Among players wanting early (or late)
+    # tee times, those who have had the fewest pick first.
+    return (
+        not unit.anchors,
+        -unit.missed,
+        -unit.size,
+        unit.window is None,
+        window_share(unit, unit.window),
+        unit.tee_date,
+        unit.user_id,
+    )
+
+
+def placement_cost(unit: Unit, slot: Slot) -> tuple:
+    preference_cost = 0 if unit.window is None else abs(slot.window - unit.window)
+    return (
+        slot.id not in unit.anchors,
+        preference_cost,
+        window_share(unit, slot.window),
+        slot.free - unit.size,
+        slot.tee_time,
+    )
+
+
+def shed(slot: Slot) -> List[Party]:
+    """Remove the fewest parties that bring an overfull slot back to capacity."""
+    removed = []
+    while slot.free < 0 and slot.parties:
+        overflow = -slot.free
+        large_enough = [p for p in slot.parties if p.size >= overflow]
+        if large_enough:
+            party = min(large_enough, key=lambda p: (p.size, p.user_id))
+        else:
+            party = max(slot.parties, key=lambda p: (p.size, p.user_id))
+        slot.parties.remove(party)
+        slot.free += party.size
+        removed.append(party)
+    return removed
+
+
+class Planner:
+    """One solve: the slots, the warm-start state and the plan being built."""
+
+    def __init__(self, snapshot: Dict[str, Any], max_moves: int):
+        self.slots = build_slots(snapshot)
+        self.by_group_date: Dict[Tuple[str, str], List[Slot]] = {}
+        for slot in self.slots.values():
+            key = (slot.group_id, slot.tee_date)
+            self.by_group_date.setdefault(key, []).append(slot)
+        self.max_moves = max_moves
+        self.fairness: Dict[str, Dict[str, int]] = snapshot.get("fairness", {})
+        self.voluntary_moves = 0
+        # Assignment ids already moved once; nobody moves twice
+        self.moved: Set[str] = set()
+        self.affected: Set[str] = set()
+        self.placements: List[Dict[str, Any]] = []
+        self.moves: List[Dict[str, Any]] = []
+        self.removals: List[Dict[str, Any]] = []
+        self.unassigned: List[Dict[str, Any]] = []
+
+    def siblings(self, unit: Unit) -> List[Slot]:
+        return self.by_group_date.get((unit.group_id, unit.tee_date), [])
+
+    def warm_start(self, snapshot: Dict[str, Any]) -> List[Unit]:
+        """
+        Seat existing assignments, release withdrawn players and shed
+        overfull slots. Returns the displaced parties, to be re-placed.
+        """
+        interests = {
+            (p["user_id"], p["interest_date"]): p for p in snapshot["players"]
+        }
+        for assignment in snapshot["assignments"]:
+            slot = self.slots.get(assignment["tee_time_id"])
+            # Pending invitations hold their spots and are never moved
+            if slot is None or assignment["user_id"] is None:
+                continue
+            size = 1 + assignment["guest_count"]
+            interest = interests.get((assignment["user_id"], slot.tee_date))
+            if interest is not None and not interest.get("wants_to_play", True):
+                slot.free += size
+                self.affected.add(slot.id)
+                self.removals.append(
+                    {
+                        "assignment_id": assignment["id"],
+                        "user_id": assignment["user_id"],
+                        "tee_time_id": slot.id,
+                        "reason": "withdrawn",
+                    }
+                )
+                continue
+            slot.parties.append(
+                Party(
+                    user_id=assignment["user_id"],
+                    group_id=slot.group_id,
+                    tee_date=slot.tee_date,
+                    size=size,
+                    window=preference_window(
+                        interest.get("time_preference") if interest else None
+                    ),
+                    assignment_id=assignment["id"],
+                    assigned_tee_time_id=slot.id,
+                )
+            )
+
+        displaced = []
+        for slot in self.slots.values():
+            if slot.free < 0:
+                self.affected.add(slot.id)
+                displaced.extend(shed(slot))
+        return sorted((make_unit([p]) for p in displaced), key=placement_order)
+
+    def pending_units(
+        self, snapshot: Dict[str, Any], assigned: Set[Tuple[str, str]]
+    ) -> List[Unit]:
+        """Players to place, clustered with their partners per group and day."""
+        by_group_date: Dict[Tuple[str, str], Dict[str, Party]] = {}
+        requests: Dict[Tuple[str, str], Dict[str, List[str]]] = {}
+        for player in snapshot["players"]:
+            if not player.get("wants_to_play", True):
+                continue
+            if (player["user_id"], player["interest_date"]) in assigned:
+                continue
+            party = new_party(player, self.fairness.get(player["user_id"]))
+            key = (party.group_id, party.tee_date)
+            by_group_date.setdefault(key, {})[party.user_id] = party
+            requests.setdefault(key, {})[party.user_id] = parse_partners(
+                player.get("partners")
+            )
+
+        seated = {
+            (party.user_id, slot.tee_date): slot.id
+            for slot in self.slots.values()
+            for party in slot.parties
+        }
+        units = []
+        for key, parties in by_group_date.items():
+            slots = self.by_group_date.get(key, [])
+            capacity = max((slot.capacity for slot in slots), default=0)
+            sizes = {user_id: party.size for user_id, party in parties.items()}
+            for members in partner_units(sizes, requests[key], capacity):
+                anchors = {
+                    seated[(partner, key[1])]
+                    for user_id in members
+                    for partner in requests[key][user_id]
+                    if (partner, key[1]) in seated
+                }
+                units.append(make_unit([parties[m] for m in members], anchors))
+        return sorted(units, key=placement_order)
+
+    def seat(self, party: Party, slot: Slot):
+        slot.free -= party.size
+        slot.parties.append(party)
+        self.affected.add(slot.id)
+
+    def record_move(self, party: Party, target: Slot):
+        self.moved.add(party.assignment_id)
+        self.moves.append(
+            {
+                "assignment_id": party.assignment_id,
+                "user_id": party.user_id,
+                "from_tee_time_id": party.assigned_tee_time_id,
+                "to_tee_time_id": target.id,
+            }
+        )
+
+    def best_slot(self, unit: Unit, exclude: Slot | None = None) -> Slot | None:
+        candidates = [
+            slot
+            for slot in self.siblings(unit)
+            if slot is not exclude and slot.free >= unit.size
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda s: placement_cost(unit, s))
+
+    def make_room(self, unit: Unit) -> Slot | None:
+        """Move one existing player so that `unit` fits; None if none can."""
+        if self.voluntary_moves >= self.max_moves:
+            return None
+        for slot in sorted(self.siblings(unit), key=lambda s: placement_cost(unit, s)):
+            need = unit.size - slot.free
+            occupants = sorted(
+                (
+                    p
+                    for p in slot.parties
+                    if p.assignment_id is not None
+                    and p.assignment_id not in self.moved
+                    and p.size >= need
+                ),
+                key=lambda p: (p.size, p.user_id),
+            )
+            for occupant in occupants:
+                target = self.best_slot(make_unit([occupant]), exclude=slot)
+                if target is None:
+                    continue
+                slot.parties.remove(occupant)
+                slot.free += occupant.size
+                self.seat(occupant, target)
+                self.record_move(occupant, target)
+                self.voluntary_moves += 1
+                return slot
+        return None
+
+    def replace(self, unit: Unit):
+        """Re-place a party displaced from an overfull slot."""
+        party = unit.members[0]
+        target = self.best_slot(unit)
+        if target is None:
+            self.removals.append(
+                {
+                    "assignment_id": party.assignment_id,
+                    "user_id": party.user_id,
+                    "tee_time_id": party.assigned_tee_time_id,
+                    "reason": "capacity",
+                }
+            )
+            return
+        # Displacements are forced, so they don't count against max_moves
+        self.seat(party, target)
+        self.record_move(party, target)
+
+    def place(self, unit: Unit):
+        slot = self.best_slot(unit) or self.make_room(unit)
+        if slot is None:
+            self.unassigned.extend(
+                {"user_id": p.user_id, "tee_date": p.tee_date, "reason": "full"}
+                for p in unit.members
+            )
+            return
+        for party in unit.members:
+            self.seat(party, slot)
+            self.placements.append(
+                {
+                    "tee_time_id": slot.id,
+                    "user_id": party.user_id,
+                    "guest_count": party.size - 1,
+                }
+            )
+
+
+def solve(
+    snapshot: Dict[str, Any], max_moves: int = DEFAULT_MAX_MOVES, *, deadline: float
+) -> Dict[str, Any]:
+    """Plan the weekend; stops early (timed_out) at `deadline` (epoch seconds)."""
+    started = time.monotonic()
+    planner = Planner(snapshot, max_moves)
+
+    for unit in planner.warm_start(snapshot):
+        planner.replace(unit)
+
+    assigned = {(a["user_id"], a["tee_date"]) for a in snapshot["assignments"]}
+    pending = planner.pending_units(snapshot, assigned)
+    timed_out = False
+    for index, unit in enumerate(pending):
+        if time.time() > deadline:
+            timed_out = True
+            planner.unassigned.extend(
+                {"user_id": p.user_id, "tee_date": p.tee_date, "reason": "timed_out"}
+                for u in pending[index:]
+                for p in u.members
+            )
+            break
+        planner.place(unit)
+
+    seated = sum(len(slot.parties) for slot in planner.slots.values())
+    return {
+        "weekend_id": snapshot["weekend"]["id"],
+        "assignments": planner.placements,
+        "moves": planner.moves,
+        "removals": planner.removals,
+        "unassigned": planner.unassigned,
+        "timed_out": timed_out,
+        "stats": {
+            "tee_times": len(planner.slots),
+            "affected_tee_times": len(planner.affected),
+            "parties": sum(len(unit.members) for unit in pending),
+            "units": len(pending),
+            "assigned": len(planner.placements),
+            "kept": seated - len(planner.placements) - len(planner.moves),
+            "moved": len(planner.moves),
+            "removed": len(planner.removals),
+            "unassigned": len(planner.unassigned),
+            "solve_ms": round((time.monotonic() - started) * 1000, 3),
+        },
+    }
@@ -0,0 +1,100 @@
+"""
+Persistent golfer aliases: raw tee sheet names resolved to club members.
+
+Each run loads the club's golfer_aliases rows and merges them with the
+member lookup into a single name index, so every golfer string on the sheet
+resolves with one dict lookup. Admin-confirmed aliases override name
+matches and rejected aliases never match. Names seen on the sheet are
+recorded back (via the record_golfer_aliases RPC) so unresolved names show
+up for admins to map.
+"""
+
+import functools
+import re
+
+from supabase import Client
+
+from slots import TeeSheet
+
+AUTO = "auto"
+UNRESOLVED = "unresolved"
+CONFIRMED = "confirmed"
+REJECTED = "rejected"
+
+
+@functools.lru_cache(maxsize=4096)
+def normalize_name(name: str) -> str:
+    """Normalize a name for matching (lowercase, trim, collapse whitespace)."""
+    if not name:
+        return ""
+    return re.sub(r"\s+", " ", name.lower().strip())
+
+
+def load_aliases(supabase: Client, club_id: str) -> dict[str, dict]:
+    """Fetch the club's resolved and rejected aliases, keyed by raw_name."""
+    result = (
+        supabase.table("golfer_aliases")
+        .select("raw_name, user_id, invitation_id, status")
+        .eq("club_id", club_id)
+        .in_("status", [AUTO, CONFIRMED, REJECTED])
+        .execute()
+    )
+    return {row["raw_name"]: row for row in result.data}
+
+
+def build_name_index(
+    club_members: dict[str, dict], aliases: dict[str, dict]
+) -> dict[str, dict | None]:
+    """
+    Merge member names and aliases into normalized name -> member info
+    ({user_id, group_id, invitation_id}), or None for rejected names.
+
+    Precedence: rejected and confirmed aliases, then exact member names,
+    then aliases learned by earlier runs. Aliases pointing at someone who
+    is no longer a member of the club are ignored.
+    """
+    by_user = {}
+    by_invitation = {}
+    for info in club_members.values():
+        if info["user_id"]:
+            by_user[info["user_id"]] = info
+        elif info["invitation_id"]:
+            by_invitation[info["invitation_id"]] = info
+
+    index: dict[str, dict | None] = {}
+    for raw_name, alias in aliases.items():
+        if alias["status"] == AUTO and raw_name in club_members:
+            continue
+        if alias["status"] == REJECTED:
+            index[raw_name] = None
+            continue
+        if alias["user_id"]:
+            info = by_user.get(alias["user_id"])
+        else:
+            info = by_invitation.get(alias["invitation_id"])
+        if info is not None:
+            index[raw_name] = info
+
+    for name, info in club_members.items():
+        index.setdefault(name, info)
+    return index
+
+
+def alias_observations(
+    tee_sheet: TeeSheet, name_index: dict[str, dict | None]
+) -> list[dict]:
+    """One observation per distinct golfer name on the sheet, with its resolution."""
+    observations = {}
+    for slot in tee_sheet.slots:
+        for golfer in slot.golfers:
+            normalized = normalize_name(golfer)
+            if not normalized or normalized in observations:
+                continue
+            info = name_index.get(normalized)
+            observations[normalized] = {
+                "raw_name": normalized,
+                "display_name": golfer,
+                "user_id": info["user_id"] if info else None,
+                "invitation_id": info["invitation_id"] if info else None,
+            }
+    return list(observations.values())
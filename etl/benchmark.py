@@ -0,0 +1,92 @@
+"""
+End-to-end ETL benchmark against the local mock club site.
+
+Runs get_tee_times.main() repeatedly in replay mode (mock site plus the
+in-memory database) and reports runs per minute and per-phase latency.
+Requires Chrome and ChromeDriver, like a normal run.
+
+Usage:
+    python benchmark.py --fixtures fixtures/sample_club.json --runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from mock_club_site import load_fixture, start_server
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ETL offline.")
+    parser.add_argument("--fixtures", default="fixtures/sample_club.json")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    fixture = load_fixture(args.fixtures)
+    server = start_server(fixture["tee_sheets"])
+    metrics_file = tempfile.NamedTemporaryFile(suffix=".jsonl", delete=False)
+    metrics_file.close()
+
+    # get_tee_times reads its configuration at import time
+    os.environ.update(
+        {
+            "CLUB_ID": fixture["club_id"],
+            "CLUB_SITE_URL": f"http://127.0.0.1:{server.server_port}",
+            "ETL_REPLAY_FIXTURES": os.path.abspath(args.fixtures),
+            "ETL_METRICS_JSONL": metrics_file.name,
+            "GOLF_CLUB_USERNAME": "replay",
+            "GOLF_CLUB_PASSWORD": "replay",
+        }
+    )
+    os.environ.pop("ETL_METRICS_PROM", None)
+    import get_tee_times
+
+    wall_times = []
+    try:
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            try:
+                get_tee_times.main()
+            except Exception as e:
+                print(f"Run failed: {e}")
+            wall_times.append(time.perf_counter() - start)
+    finally:
+        server.shutdown()
+
+    runs = []
+    with open(metrics_file.name) as f:
+        for line in f:
+            record = json.loads(line)
+            if record["type"] == "run":
+                runs.append(record)
+    os.unlink(metrics_file.name)
+
+    phases: dict[str, list[float]] = {}
+    for run in runs:
+        for name, totals in run["phase_durations"].items():
+            phases.setdefault(name, []).append(totals["total_ms"])
+
+    total_s = sum(wall_times)
+    print("\n" + "=" * 50)
+    print(f"Runs: {len(wall_times)} ({sum(r['status'] == 'success' for r in runs)} ok)")
+    print(f"Mean run: {statistics.mean(wall_times):.2f}s")
+    print(f"Throughput: {len(wall_times) / total_s * 60:.2f} runs/minute")
+    print(f"\n{'phase':<22} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for name, values in sorted(phases.items(), key=lambda item: -max(item[1])):
+        print(
+            f"{name:<22} {percentile(values, 50):>9.0f} "
+            f"{percentile(values, 95):>9.0f} {max(values):>9.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Per-(club, date) checkpoints so failed ETL runs can resume where they stopped."""
+
+import datetime
+import hashlib
+import json
+import threading
+
+from supabase import Client
+
+SCRAPED = "scraped"
+SYNCED = "synced"
+FAILED = "failed"
+
+
+def content_hash(tee_sheet: list) -> str:
+    """Stable hash of a scraped tee sheet, used to detect unchanged sheets."""
+    payload = json.dumps(tee_sheet, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class CheckpointStore:
+    """
+    Track the status of each (club, date) unit of work in etl_checkpoints.
+
+    A unit is `scraped` once its tee sheet has been extracted, `synced` once
+    its tee times and raw sheet are written, and `failed` if anything raised.
+    Reruns only need to process units that are not `synced`.
+
+    The writer thread marks units while the scraping thread reads and marks
+    them, so access to the units goes through a lock.
+    """
+
+    def __init__(self, supabase: Client, club_id: str, run_id: str):
+        self.supabase = supabase
+        self.club_id = club_id
+        self.run_id = run_id
+        self.units: dict[str, dict] = {}
+        self._attempted: set[str] = set()
+        self._lock = threading.Lock()
+
+    def load(self, dates: list[datetime.date]) -> dict[str, dict]:
+        """Fetch existing checkpoints for the given dates, keyed by ISO date."""
+        result = (
+            self.supabase.table("etl_checkpoints")
+            .select("scraped_date, status, content_hash, attempts")
+            .eq("club_id", self.club_id)
+            .in_("scraped_date", [d.isoformat() for d in dates])
+            .execute()
+        )
+        with self._lock:
+            self.units = {row["scraped_date"]: row for row in result.data}
+            return self.units
+
+    def get(self, tee_date: str) -> dict | None:
+        """Return the loaded checkpoint for tee_date, if any."""
+        with self._lock:
+            return self.units.get(tee_date)
+
+    def is_synced(self, tee_date: str) -> bool:
+        """Whether tee_date was fully synced by an earlier run."""
+        with self._lock:
+            unit = self.units.get(tee_date)
+        return unit is not None and unit["status"] == SYNCED
+
+    def mark(
+        self,
+        tee_date: str,
+        status: str,
+        sheet_hash: str | None = None,
+        error: str | None = None,
+    ):
+        """Record the status of a unit, keeping the last known content hash."""
+        # Held through the upsert so the attempt count and the stored row
+        # stay consistent when both threads mark the same date
+        with self._lock:
+            previous = self.units.get(tee_date) or {}
+            attempts = previous.get("attempts") or 0
+            if tee_date not in self._attempted:
+                attempts += 1
+                self._attempted.add(tee_date)
+
+            row = {
+                "club_id": self.club_id,
+                "scraped_date": tee_date,
+                "status": status,
+                "content_hash": sheet_hash or previous.get("content_hash"),
+                "run_id": self.run_id,
+                "attempts": attempts,
+                "error": error,
+                "updated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            }
+            self.supabase.table("etl_checkpoints").upsert(
+                row, on_conflict="club_id,scraped_date"
+            ).execute()
+            self.units[tee_date] = row
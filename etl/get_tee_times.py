@@ -1,15 +1,29 @@
 import datetime
 import os
-import re
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions
-from supabase import create_client, Client
+from supabase import acreate_client, create_client, Client
+
+from aliases import (
+    alias_observations,
+    build_name_index,
+    load_aliases,
+    normalize_name,
+)
+from checkpoints import FAILED, SYNCED, CheckpointStore, content_hash
+from memory_supabase import MemorySupabase
+from metrics import RunMetrics
+from resilience import BrowserSession, breaker_for, call_with_retry
+from slots import RejectedRow, TeeSheet, TeeSlot, WonSlot, parse_tee_time
+from timeline import PhaseTimeline
+from weekends import WeekendResolver
+from writer import AsyncWriter, DayWrite
 
 # Load environment variables
 load_dotenv()
@@ -21,6 +35,33 @@ SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_SERVICE_KEY = os.environ.get("SUPABASE_SERVICE_KEY")
 CLUB_ID = os.environ.get("CLUB_ID")
 
+# Club site root; point at mock_club_site.py for offline runs
+CLUB_SITE_URL = os.environ.get("CLUB_SITE_URL", "https://www.1757golfclub.com")
+CLUB_SITE_URL = CLUB_SITE_URL.rstrip("/")
+
+# Replay mode: use an in-memory database seeded from a mock club site fixture
+ETL_REPLAY_FIXTURES = os.environ.get("ETL_REPLAY_FIXTURES")
+
+# Optional metrics sinks: JSON lines log and Prometheus textfile
+ETL_METRICS_JSONL = os.environ.get("ETL_METRICS_JSONL")
+ETL_METRICS_PROM = os.environ.get("ETL_METRICS_PROM")
+
+# Background write pipeline: concurrent writers, and days queued before scraping waits
+ETL_WRITE_CONCURRENCY = int(os.environ.get("ETL_WRITE_CONCURRENCY", "4"))
+ETL_WRITE_QUEUE_SIZE = int(os.environ.get("ETL_WRITE_QUEUE_SIZE", "4"))
+
+# Restart Chrome before a day if its process tree exceeds this (0 disables)
+ETL_DRIVER_MAX_RSS_MB = float(os.environ.get("ETL_DRIVER_MAX_RSS_MB", "1500"))
+
+# Days processed each run: (day_of_week, name) with Monday=0
+DAYS = [(5, "Saturday"), (6, "Sunday")]
+
+# Re-scrape days already synced by an earlier run (writes still skipped if unchanged)
+ETL_FORCE_RESCRAPE = os.environ.get("ETL_FORCE_RESCRAPE", "").lower() in ("1", "true")
+
+# Number of weekends (starting with the upcoming one) to pre-create per run
+WEEKEND_SEASON_WEEKS = int(os.environ.get("WEEKEND_SEASON_WEEKS", "1"))
+
 # Chrome paths with fallbacks
 GOOGLE_CHROME_BIN = os.environ.get("GOOGLE_CHROME_BIN", "/usr/bin/google-chrome")
 CHROMEDRIVER_PATH = os.environ.get("CHROMEDRIVER_PATH", "/usr/local/bin/chromedriver")
@@ -62,57 +103,44 @@ def create_driver():
     return driver
 
 
-def normalize_name(name: str) -> str:
-    """Normalize a name for matching (lowercase, trim, collapse whitespace)."""
-    if not name:
-        return ""
-    return re.sub(r"\s+", " ", name.lower().strip())
-
-
-def parse_time(time_str: str) -> str:
-    """Convert '7:30 am' format to '07:30:00' PostgreSQL time format."""
-    match = re.match(r"(\d{1,2}):(\d{2})\s*(am|pm)", time_str.lower())
-    if not match:
-        return "00:00:00"
-
-    hours = int(match.group(1))
-    minutes = match.group(2)
-    period = match.group(3)
-
-    if period == "pm" and hours != 12:
-        hours += 12
-    elif period == "am" and hours == 12:
-        hours = 0
-
-    return f"{hours:02d}:{minutes}:00"
-
-
-def extract_tee_times(html: str) -> list[dict]:
-    """Extract tee times and golfer names from HTML."""
+def extract_tee_times(html: str) -> TeeSheet:
+    """
+    Extract tee time slots and golfer names from HTML.
+    Rows whose time cannot be parsed are reported in TeeSheet.rejected.
+    """
     soup = BeautifulSoup(html, "html.parser")
-    tee_sheet = []
+    tee_sheet = TeeSheet()
     table = soup.find("table", class_="table table-bordered header")
     if table:
-        for row in table.find("tbody").find_all("tr"):
-            cells = row.find_all("td")
-            if not cells:
-                continue
-            tee_time = cells[0].get_text(strip=True)
+        rows = (row.find_all("td") for row in table.find("tbody").find_all("tr"))
+        for index, cells in enumerate(c for c in rows if c):
+            label = cells[0].get_text(strip=True)
             golfers = [cell.get_text(strip=True) for cell in cells[1:]]
-            tee_sheet.append({"tee_time": tee_time, "golfers": golfers})
+            tee_time = parse_tee_time(label)
+            if tee_time is None:
+                tee_sheet.rejected.append(
+                    RejectedRow(index, label, tuple(golfers), "unparseable time")
+                )
+                continue
+            tee_sheet.slots.append(TeeSlot.from_cells(tee_time, label, golfers))
     return tee_sheet
 
 
+def upcoming_date(day_of_week: int) -> datetime.date:
+    """Return the next date (after today) falling on day_of_week (Monday=0)."""
+    today = datetime.date.today()
+    days_ahead = day_of_week - today.weekday()
+    if days_ahead <= 0:
+        days_ahead += 7
+    return today + datetime.timedelta(days=days_ahead)
+
+
 def select_upcoming_day(driver, wait, day_of_week: int) -> str:
     """
     Select the upcoming date for the given day_of_week (Monday=0, Sunday=6).
     Returns the date string in YYYY-MM-DD format.
     """
-    today = datetime.date.today()
-    days_ahead = day_of_week - today.weekday()
-    if days_ahead <= 0:
-        days_ahead += 7
-    next_day = today + datetime.timedelta(days=days_ahead)
+    next_day = upcoming_date(day_of_week)
     target_day = next_day.day
 
     wait.until(
@@ -160,53 +188,60 @@ def select_upcoming_day(driver, wait, day_of_week: int) -> str:
     raise Exception(f"Upcoming day {day_of_week} not found in calendar.")
 
 
-def go_to_teesheet_1757(driver, wait):
+def go_to_teesheet_1757(driver, wait, metrics: RunMetrics):
     """Navigate to the tee sheet page for 1757 Golf Club."""
-    webpage = "https://www.1757golfclub.com/member-home"
-    driver.get(webpage)
-
-    # Wait for the login form to load
-    wait.until(
-        expected_conditions.presence_of_element_located((By.ID, "login_username_main"))
-    )
-    wait.until(
-        expected_conditions.presence_of_element_located((By.ID, "login_password_main"))
-    )
+    with metrics.span("login"):
+        webpage = f"{CLUB_SITE_URL}/member-home"
+        driver.get(webpage)
+
+        # Wait for the login form to load
+        wait.until(
+            expected_conditions.presence_of_element_located(
+                (By.ID, "login_username_main")
+            )
+        )
+        wait.until(
+            expected_conditions.presence_of_element_located(
+                (By.ID, "login_password_main")
+            )
+        )
 
-    # Enter credentials
-    driver.find_element(By.ID, "login_username_main").send_keys(GOLF_CLUB_USERNAME)
-    driver.find_element(By.ID, "login_password_main").send_keys(GOLF_CLUB_PASSWORD)
+        # Enter credentials
+        driver.find_element(By.ID, "login_username_main").send_keys(GOLF_CLUB_USERNAME)
+        driver.find_element(By.ID, "login_password_main").send_keys(GOLF_CLUB_PASSWORD)
 
-    # Submit the form
-    driver.find_element(By.ID, "login_submit_main").click()
+        # Submit the form
+        driver.find_element(By.ID, "login_submit_main").click()
 
-    anchor_element = driver.find_element(By.CSS_SELECTOR, '[data-id="10136"] a')
-    driver.execute_script("arguments[0].click();", anchor_element)
+        anchor_element = driver.find_element(By.CSS_SELECTOR, '[data-id="10136"] a')
+        driver.execute_script("arguments[0].click();", anchor_element)
 
-    time.sleep(3)
+        time.sleep(3)
 
-    driver.switch_to.window(driver.window_handles[-1])
+        driver.switch_to.window(driver.window_handles[-1])
 
     # Wait for Cloudflare challenge to resolve (if present)
-    for _ in range(15):
-        if "Just a moment" not in driver.title:
-            break
-        time.sleep(1)
+    with metrics.span("cloudflare_wait"):
+        for _ in range(15):
+            if "Just a moment" not in driver.title:
+                break
+            time.sleep(1)
 
     # Wait for the tee sheet link to be present after switching windows
-    view_teesheet_link = wait.until(
-        expected_conditions.presence_of_element_located(
-            (By.CSS_SELECTOR, 'a[ui-sref="view-teesheet"]')
+    with metrics.span("navigation", step="open_teesheet"):
+        view_teesheet_link = wait.until(
+            expected_conditions.presence_of_element_located(
+                (By.CSS_SELECTOR, 'a[ui-sref="view-teesheet"]')
+            )
         )
-    )
-    driver.execute_script("arguments[0].scrollIntoView();", view_teesheet_link)
-    driver.execute_script("arguments[0].click();", view_teesheet_link)
+        driver.execute_script("arguments[0].scrollIntoView();", view_teesheet_link)
+        driver.execute_script("arguments[0].click();", view_teesheet_link)
 
 
-def go_to_teesheet(driver, wait, scraper_type: str):
+def go_to_teesheet(driver, wait, scraper_type: str, metrics: RunMetrics):
     """Navigate to the tee sheet page based on scraper type."""
     if scraper_type == "1757":
-        go_to_teesheet_1757(driver, wait)
+        go_to_teesheet_1757(driver, wait, metrics)
     else:
         raise ValueError(f"Unknown scraper type: {scraper_type}")
 
@@ -230,26 +265,31 @@ def get_club_groups(supabase: Client, club_id: str) -> list[dict]:
     return result.data
 
 
-def get_all_club_members(supabase: Client, club_id: str) -> dict[str, dict]:
+def get_all_club_members(
+    supabase: Client, club_id: str, club_groups: list[dict] | None = None
+) -> dict[str, dict]:
     """
     Fetch all members (real and pending) across all groups in a club.
     Returns dict mapping normalized_name -> {user_id, group_id, invitation_id}
     Uses is_primary flag to determine which group gets the tee time.
     Includes pending members from unclaimed invitations.
+    Pass club_groups if already fetched to avoid querying groups again.
     """
     # Get groups for this club
-    club_groups = get_club_groups(supabase, club_id)
+    if club_groups is None:
+        club_groups = get_club_groups(supabase, club_id)
     club_group_ids = {g["id"] for g in club_groups}
 
     if not club_group_ids:
         return {}
 
-    # Fetch memberships with is_primary flag (real members)
+    # Fetch memberships with is_primary flag (real members) for this club only
     result = (
         supabase.table("memberships")
         .select(
             "user_id, group_id, is_primary, profiles!inner(id, full_name, normalized_name)"
         )
+        .in_("group_id", list(club_group_ids))
         .execute()
     )
 
@@ -280,6 +320,7 @@ def get_all_club_members(supabase: Client, club_id: str) -> dict[str, dict]:
         .select("id, group_id, display_name")
         .eq("invitation_type", "group_member")
         .is_("claimed_by", "null")
+        .in_("group_id", list(club_group_ids))
         .execute()
     )
 
@@ -307,144 +348,195 @@ def get_all_club_members(supabase: Client, club_id: str) -> dict[str, dict]:
 
 
 def find_lottery_won_tee_times(
-    tee_sheet: list[dict], club_members: dict[str, dict]
-) -> list[dict]:
+    tee_sheet: TeeSheet, name_index: dict[str, dict | None]
+) -> list[WonSlot]:
     """
     Find tee times where any club member (real or pending) won the lottery.
-    Returns list with group_id (primary group) and invitation_id for each match.
+    name_index comes from build_name_index (member names plus golfer aliases).
+    Returns a WonSlot with group_id (primary group) and invitation_id for each match.
     """
     won_tee_times = []
-    for entry in tee_sheet:
-        for golfer in entry["golfers"]:
-            if not golfer or golfer == "* BLOCKED *":
-                continue
-            normalized = normalize_name(golfer)
-            if normalized in club_members:
-                member_info = club_members[
-                    normalized
-                ]  # Already resolved to primary group
+    for slot in tee_sheet.slots:
+        for golfer in slot.golfers:
+            # Already resolved to primary group; None for rejected aliases
+            member_info = name_index.get(normalize_name(golfer))
+            if member_info:
                 won_tee_times.append(
-                    {
-                        "tee_time": entry["tee_time"],
-                        "won_by_user_id": member_info["user_id"],
-                        "won_by_name": golfer,
-                        "group_id": member_info["group_id"],
-                        "invitation_id": member_info["invitation_id"],
-                    }
+                    WonSlot(
+                        slot=slot,
+                        won_by_name=golfer,
+                        won_by_user_id=member_info["user_id"],
+                        group_id=member_info["group_id"],
+                        invitation_id=member_info["invitation_id"],
+                    )
                 )
                 break
     return won_tee_times
 
 
-def get_or_create_weekend(supabase: Client, tee_date: str) -> str:
+def scrape_day(session: BrowserSession, day_of_week: int) -> tuple[str, str]:
+    """Select the upcoming day on the tee sheet; returns (tee_date, page HTML)."""
+    tee_date = select_upcoming_day(session.driver, session.wait, day_of_week)
+    time.sleep(2)  # Wait for page to load
+    return tee_date, session.driver.page_source
+
+
+def process_day(
+    session: BrowserSession,
+    writer: AsyncWriter,
+    weekends: WeekendResolver,
+    checkpoints: CheckpointStore,
+    metrics: RunMetrics,
+    name_index: dict[str, dict | None],
+    day_of_week: int,
+    day_name: str,
+) -> int:
     """
-    Get or create a weekend record that contains the given date.
-    Returns the weekend UUID.
+    Scrape and match a single day's tee sheet for a club, then hand it to the
+    writer, which checkpoints the (club, date) unit and performs the writes in
+    the background. Writes are skipped when the sheet is unchanged since the
+    last successful sync.
     """
-    date_obj = datetime.date.fromisoformat(tee_date)
+    print(f"\nProcessing {day_name}...")
 
-    # Find the Saturday of this weekend
-    days_since_saturday = (date_obj.weekday() + 2) % 7
-    saturday = date_obj - datetime.timedelta(days=days_since_saturday)
-    sunday = saturday + datetime.timedelta(days=1)
+    # Recycle the browser first if it crashed or is leaking memory
+    session.recover()
+
+    # Select the day and get the date (retried on its own if the site flakes)
+    with metrics.span("navigation", step="select_date", day=day_name):
+        tee_date, page_source = call_with_retry(
+            "select_date",
+            scrape_day,
+            session,
+            day_of_week,
+            breaker=breaker_for(CLUB_SITE_URL),
+            metrics=metrics,
+            recover=session.recover,
+        )
+    print(f"  Date: {tee_date}")
 
-    # Check if weekend exists
-    result = (
-        supabase.table("weekends")
-        .select("id")
-        .eq("start_date", saturday.isoformat())
-        .eq("end_date", sunday.isoformat())
-        .execute()
-    )
+    # Extract tee times
+    with metrics.span("extraction", day=day_name):
+        tee_sheet = extract_tee_times(page_source)
+    metrics.incr("rows_scraped", len(tee_sheet))
+    print(f"  Found {len(tee_sheet)} total tee time slots")
+    if tee_sheet.rejected:
+        metrics.incr("rows_rejected", len(tee_sheet.rejected))
+        print(f"  Warning: {len(tee_sheet.rejected)} rows could not be parsed:")
+        for row in tee_sheet.rejected:
+            print(f"    - row {row.index}: {row.label!r} ({row.reason})")
 
-    if result.data:
-        return result.data[0]["id"]
+    # Find lottery-won tee times (now includes group_id for each)
+    with metrics.span("matching", day=day_name):
+        won_tee_times = find_lottery_won_tee_times(tee_sheet, name_index)
+        aliases = alias_observations(tee_sheet, name_index)
+    metrics.incr("rows_matched", len(won_tee_times))
+    print(f"  Found {len(won_tee_times)} tee times won by club members")
 
-    # Create new weekend
-    result = (
-        supabase.table("weekends")
-        .insert({"start_date": saturday.isoformat(), "end_date": sunday.isoformat()})
-        .execute()
+    # Include the matches so alias corrections re-sync an otherwise unchanged sheet
+    matches = [[tt.slot.label, tt.group_id, tt.invitation_id] for tt in won_tee_times]
+    sheet_hash = content_hash([tee_sheet.to_raw(), matches])
+    previous = checkpoints.get(tee_date)
+    unchanged = (
+        previous is not None
+        and previous["status"] == SYNCED
+        and previous["content_hash"] == sheet_hash
+    )
+    if unchanged:
+        print("  Tee sheet unchanged since last sync, skipping writes")
+
+    # Resolve weekend (memoized after start-up materialization)
+    weekend_id = weekends.resolve(tee_date) if won_tee_times else None
+    for tt in won_tee_times:
+        print(f"    - {tt.slot.label} — {tt.won_by_name}")
+
+    writer.submit(
+        DayWrite(
+            tee_date=tee_date,
+            day_name=day_name,
+            weekend_id=weekend_id,
+            won_tee_times=won_tee_times,
+            tee_sheet=tee_sheet,
+            sheet_hash=sheet_hash,
+            aliases=aliases,
+            skip_writes=unchanged,
+        )
     )
 
-    return result.data[0]["id"]
-
-
-def sync_single_tee_time(
-    supabase: Client, group_id: str, weekend_id: str, tee_date: str, tee_time_info: dict
-):
-    """Create a single tee_time entry for a lottery-won slot."""
-    time_value = parse_time(tee_time_info["tee_time"])
-
-    # Upsert tee time - makes it available to the group
-    supabase.table("tee_times").upsert(
-        {
-            "weekend_id": weekend_id,
-            "tee_date": tee_date,
-            "tee_time": time_value,
-            "group_id": group_id,
-            "max_players": 4,
-        },
-        on_conflict="weekend_id,tee_date,tee_time,group_id",
-    ).execute()
+    return len(won_tee_times)
 
 
-def store_raw_tee_sheet(
-    supabase: Client, club_id: str, tee_date: str, tee_sheet: list[dict]
-):
-    """Store the raw tee sheet data for audit purposes."""
-    supabase.table("external_tee_sheets").insert(
-        {"club_id": club_id, "scraped_date": tee_date, "raw_data": tee_sheet}
-    ).execute()
+def with_db_retry(step: str, func, *args):
+    """Run a Supabase call under the step's retry policy and the database breaker."""
+    return call_with_retry(step, func, *args, breaker=breaker_for("supabase"))
+
+
+def load_club_members(
+    timeline: PhaseTimeline, supabase: Client, groups_future
+) -> dict[str, dict]:
+    """Fetch club members once the club's groups are available."""
+    club_groups = groups_future.result()
+    return timeline.run(
+        "fetch_members",
+        with_db_retry,
+        "fetch_members",
+        get_all_club_members,
+        supabase,
+        CLUB_ID,
+        club_groups,
+        after=("fetch_groups",),
+    )
 
 
-def process_day(
-    driver,
-    wait,
-    supabase: Client,
-    club_id: str,
-    club_members: dict[str, dict],
-    day_of_week: int,
-    day_name: str,
-) -> int:
-    """Process a single day's tee sheet for a club."""
-    print(f"\nProcessing {day_name}...")
+def load_name_index(
+    timeline: PhaseTimeline, members_future, aliases_future
+) -> dict[str, dict | None]:
+    """Merge club members and stored golfer aliases into the matcher's name index."""
+    club_members = members_future.result()
+    aliases = aliases_future.result()
+    with timeline.phase("build_name_index", after=("fetch_members", "fetch_aliases")):
+        return build_name_index(club_members, aliases)
 
-    # Select the day and get the date
-    tee_date = select_upcoming_day(driver, wait, day_of_week)
-    print(f"  Date: {tee_date}")
 
-    time.sleep(2)  # Wait for page to load
+def connect_database() -> Client:
+    """Create the Supabase client, or the in-memory stand-in in replay mode."""
+    if ETL_REPLAY_FIXTURES:
+        return MemorySupabase.from_fixture(ETL_REPLAY_FIXTURES)
+    return create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
 
-    # Extract tee times
-    tee_sheet = extract_tee_times(driver.page_source)
-    print(f"  Found {len(tee_sheet)} total tee time slots")
 
-    # Find lottery-won tee times (now includes group_id for each)
-    won_tee_times = find_lottery_won_tee_times(tee_sheet, club_members)
-    print(f"  Found {len(won_tee_times)} tee times won by club members")
+async def connect_async_database(supabase: Client):
+    """Async client for the write pipeline; replay mode shares the in-memory db."""
+    if ETL_REPLAY_FIXTURES:
+        return supabase
+    return await acreate_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
 
-    if won_tee_times:
-        # Get or create weekend
-        weekend_id = get_or_create_weekend(supabase, tee_date)
 
-        # Group won tee times by group_id for reporting
-        by_group = {}
-        for tt in won_tee_times:
-            gid = tt["group_id"]
-            if gid not in by_group:
-                by_group[gid] = []
-            by_group[gid].append(tt)
+def report_run(
+    metrics: RunMetrics, supabase: Client | None, status: str, error: str | None
+):
+    """Write run metrics to the configured sinks and the etl_runs ledger."""
+    summary = metrics.summary(status, error)
 
-        # Sync each tee time to appropriate group
-        for tt in won_tee_times:
-            sync_single_tee_time(supabase, tt["group_id"], weekend_id, tee_date, tt)
-            print(f"    - {tt['tee_time']} — {tt['won_by_name']}")
+    print("\nPhase durations:")
+    for name, totals in sorted(
+        summary["phase_durations"].items(), key=lambda item: -item[1]["total_ms"]
+    ):
+        print(f"  {name}: {totals['total_ms'] / 1000:.2f}s ({totals['count']}x)")
 
-    # Store raw data for audit
-    store_raw_tee_sheet(supabase, club_id, tee_date, tee_sheet)
+    try:
+        if ETL_METRICS_JSONL:
+            metrics.write_jsonl(ETL_METRICS_JSONL, summary)
+        if ETL_METRICS_PROM:
+            metrics.write_prometheus(ETL_METRICS_PROM, summary)
+    except OSError as e:
+        print(f"Warning: could not write metrics files: {e}")
 
-    return len(won_tee_times)
+    if supabase is not None:
+        try:
+            metrics.persist(supabase, summary)
+        except Exception as e:
+            print(f"Warning: could not record run in etl_runs: {e}")
 
 
 def main():
@@ -454,7 +546,12 @@ def main():
     print("=" * 50)
 
     # Validate configuration
-    if not all([SUPABASE_URL, SUPABASE_SERVICE_KEY, CLUB_ID]):
+    if ETL_REPLAY_FIXTURES:
+        print(f"Replay mode: {ETL_REPLAY_FIXTURES} against {CLUB_SITE_URL}")
+        if not CLUB_ID:
+            print("Error: Missing CLUB_ID for replay fixture.")
+            return
+    elif not all([SUPABASE_URL, SUPABASE_SERVICE_KEY, CLUB_ID]):
         print("Error: Missing required environment variables.")
         print("Please set SUPABASE_URL, SUPABASE_SERVICE_KEY, and CLUB_ID")
         return
@@ -464,68 +561,224 @@ def main():
         print("Please set GOLF_CLUB_USERNAME and GOLF_CLUB_PASSWORD")
         return
 
-    # Initialize Supabase client
-    print("\nConnecting to Supabase...")
-    supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
-
-    # Get club configuration
-    print(f"Fetching club configuration for {CLUB_ID}...")
-    club_config = get_club_config(supabase, CLUB_ID)
-    print(f"Processing club: {club_config['name']}")
-    print(f"Scraper type: {club_config['scraper_type']}")
-
-    # Get all groups for this club
-    club_groups = get_club_groups(supabase, CLUB_ID)
-    print(f"Found {len(club_groups)} groups in this club:")
-    for g in club_groups:
-        print(f"  - {g['name']} ({g['id'][:8]}...)")
-
-    if not club_groups:
-        print(
-            "Error: No groups found for this club. Please associate groups with the club first."
+    timeline = PhaseTimeline()
+    metrics = RunMetrics(CLUB_ID)
+    supabase = None
+    driver_future = None
+    session = None
+    writer = None
+    run_status, run_error = "failed", None
+
+    # Start-up: the browser launches while Supabase metadata loads, and login
+    # runs while club members are still being fetched.
+    pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="etl-startup")
+    try:
+        print("\nStarting browser and connecting to Supabase...")
+        driver_future = pool.submit(
+            timeline.run,
+            "start_browser",
+            call_with_retry,
+            "start_browser",
+            create_driver,
         )
-        return
-
-    # Get all members across all groups in this club
-    print("\nFetching members across all groups...")
-    club_members = get_all_club_members(supabase, CLUB_ID)
-    print(f"Found {len(club_members)} unique members")
 
-    if not club_members:
-        print("Warning: No club members found. No tee times will be matched.")
+        supabase = timeline.run("connect_supabase", connect_database)
+        config_future = pool.submit(
+            timeline.run,
+            "fetch_club_config",
+            with_db_retry,
+            "fetch_club_config",
+            get_club_config,
+            supabase,
+            CLUB_ID,
+            after=("connect_supabase",),
+        )
+        groups_future = pool.submit(
+            timeline.run,
+            "fetch_groups",
+            with_db_retry,
+            "fetch_groups",
+            get_club_groups,
+            supabase,
+            CLUB_ID,
+            after=("connect_supabase",),
+        )
+        members_future = pool.submit(
+            load_club_members, timeline, supabase, groups_future
+        )
+        aliases_future = pool.submit(
+            timeline.run,
+            "fetch_aliases",
+            with_db_retry,
+            "fetch_aliases",
+            load_aliases,
+            supabase,
+            CLUB_ID,
+            after=("connect_supabase",),
+        )
+        weekends = WeekendResolver(supabase)
+        checkpoints = CheckpointStore(supabase, CLUB_ID, metrics.run_id)
+        checkpoints_future = pool.submit(
+            timeline.run,
+            "load_checkpoints",
+            with_db_retry,
+            "load_checkpoints",
+            checkpoints.load,
+            [upcoming_date(day_of_week) for day_of_week, _ in DAYS],
+            after=("connect_supabase",),
+        )
+        weekends_future = pool.submit(
+            timeline.run,
+            "materialize_weekends",
+            with_db_retry,
+            "materialize_weekends",
+            weekends.materialize,
+            upcoming_date(5),
+            WEEKEND_SEASON_WEEKS,
+            after=("connect_supabase",),
+        )
 
-    # Initialize browser
-    print("\nStarting browser...")
-    driver = create_driver()
-    wait = WebDriverWait(driver, 10)
+        # Get club configuration
+        club_config = config_future.result()
+        print(f"Processing club: {club_config['name']}")
+        print(f"Scraper type: {club_config['scraper_type']}")
+
+        # Get all groups for this club
+        club_groups = groups_future.result()
+        print(f"Found {len(club_groups)} groups in this club:")
+        for g in club_groups:
+            print(f"  - {g['name']} ({g['id'][:8]}...)")
+
+        driver = driver_future.result()
+
+        if not club_groups:
+            print(
+                "Error: No groups found for this club. Please associate groups with the club first."
+            )
+            run_error = "No groups found for this club"
+            return
+
+        # Resume: only days not already synced by an earlier run
+        checkpoints_future.result()
+        pending_days = []
+        for day_of_week, day_name in DAYS:
+            tee_date = upcoming_date(day_of_week).isoformat()
+            if checkpoints.is_synced(tee_date) and not ETL_FORCE_RESCRAPE:
+                print(f"Skipping {day_name} ({tee_date}): already synced")
+                metrics.incr("units_skipped")
+            else:
+                pending_days.append((day_of_week, day_name))
+
+        if not pending_days:
+            print("All days already synced, nothing to do.")
+            run_status = "success"
+            return
+
+        session = BrowserSession(
+            lambda: call_with_retry("start_browser", create_driver),
+            lambda driver, wait: go_to_teesheet(
+                driver, wait, club_config["scraper_type"], metrics
+            ),
+            max_rss_mb=ETL_DRIVER_MAX_RSS_MB,
+        )
+        session.attach(driver)
 
-    try:
-        # Navigate to tee sheet using club-specific scraper
+        # Navigate to tee sheet using club-specific scraper; a failed login
+        # is retried in a fresh browser
         print(f"Logging into {club_config['name']}...")
-        go_to_teesheet(driver, wait, club_config["scraper_type"])
+        timeline.run(
+            "open_teesheet",
+            call_with_retry,
+            "login",
+            session.login,
+            breaker=breaker_for(CLUB_SITE_URL),
+            metrics=metrics,
+            recover=lambda: session.restart(login=False),
+            after=("start_browser", "fetch_club_config"),
+        )
 
-        total_won = 0
+        # Get all members across all groups in this club
+        club_members = members_future.result()
+        print(f"Found {len(club_members)} unique members")
 
-        # Process Saturday (day_of_week=5)
-        total_won += process_day(
-            driver, wait, supabase, CLUB_ID, club_members, 5, "Saturday"
-        )
+        if not club_members:
+            print("Warning: No club members found. No tee times will be matched.")
 
-        # Process Sunday (day_of_week=6)
-        total_won += process_day(
-            driver, wait, supabase, CLUB_ID, club_members, 6, "Sunday"
+        name_index = load_name_index(timeline, members_future, aliases_future)
+        print(f"Matching against {len(name_index) - len(club_members)} extra aliases")
+
+        weekends_future.result()
+
+        print("\nStart-up timeline:")
+        print(timeline.report())
+
+        # Writes run on a background loop while the browser moves on
+        writer = AsyncWriter(
+            lambda: connect_async_database(supabase),
+            checkpoints,
+            metrics,
+            CLUB_ID,
+            concurrency=ETL_WRITE_CONCURRENCY,
+            queue_size=ETL_WRITE_QUEUE_SIZE,
+            breaker=breaker_for("supabase"),
         )
+        writer.start()
+
+        total_won = 0
+        failed_days = []
+
+        for day_of_week, day_name in pending_days:
+            try:
+                total_won += process_day(
+                    session,
+                    writer,
+                    weekends,
+                    checkpoints,
+                    metrics,
+                    name_index,
+                    day_of_week,
+                    day_name,
+                )
+            except Exception as e:
+                # Keep going so the other days still sync; a rerun resumes this one
+                print(f"  Error processing {day_name}: {e}")
+                metrics.incr("units_failed")
+                failed_days.append(day_name)
+                try:
+                    checkpoints.mark(
+                        upcoming_date(day_of_week).isoformat(), FAILED, error=str(e)
+                    )
+                except Exception as mark_error:
+                    print(f"  Warning: could not checkpoint {day_name}: {mark_error}")
+
+        with metrics.span("drain_writes"):
+            failed_days += writer.close()
+
+        if failed_days:
+            raise RuntimeError(f"Failed to process {', '.join(failed_days)}")
 
         print("\n" + "=" * 50)
         print(f"ETL Complete! Synced {total_won} lottery-won tee times")
+        if session.restarts:
+            print(f"Browser restarted {session.restarts} time(s)")
         print("=" * 50)
+        run_status = "success"
 
     except Exception as e:
         print(f"\nError during ETL: {e}")
+        run_error = str(e)
         raise
 
     finally:
-        driver.quit()
+        if writer is not None:
+            writer.close()
+        pool.shutdown(wait=True)
+        if session is not None:
+            session.quit()
+        elif driver_future is not None and driver_future.exception() is None:
+            driver_future.result().quit()
+        metrics.add_timeline(timeline)
+        report_run(metrics, supabase, run_status, run_error)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,203 @@
+"""
+In-memory stand-in for the subset of the Supabase client the ETL uses.
+
+Used by replay mode (ETL_REPLAY_FIXTURES) and the benchmark so the
+pipeline can run end-to-end without a Supabase project.
+"""
+
+import datetime
+import json
+import re
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Any
+
+# Embedded resources supported in select(): (table, embedded table) -> local column
+# holding the embedded row's id
+FOREIGN_KEYS = {
+    ("memberships", "profiles"): "user_id",
+}
+
+EMBED_PATTERN = re.compile(r"(\w+)!inner\(([^)]*)\)")
+
+
+@dataclass
+class MemoryResult:
+    data: Any
+    count: int | None = None
+
+
+class MemoryQuery:
+    """Chainable query mirroring the postgrest builder methods used by the ETL."""
+
+    def __init__(self, db: "MemorySupabase", table: str):
+        self._db = db
+        self._table = table
+        self._op = "select"
+        self._embeds: list[str] = []
+        self._filters: list = []
+        self._single = False
+        self._rows: list[dict] = []
+        self._on_conflict: list[str] = []
+        self._ignore_duplicates = False
+
+    def select(self, columns: str = "*"):
+        self._op = "select"
+        self._embeds = [m.group(1) for m in EMBED_PATTERN.finditer(columns)]
+        return self
+
+    def insert(self, rows):
+        self._op = "insert"
+        self._rows = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def upsert(self, rows, on_conflict: str = "", ignore_duplicates: bool = False):
+        self._op = "upsert"
+        self._rows = rows if isinstance(rows, list) else [rows]
+        self._on_conflict = [c.strip() for c in on_conflict.split(",") if c.strip()]
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def eq(self, column: str, value):
+        self._filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column: str, values):
+        allowed = set(values)
+        self._filters.append(lambda row: row.get(column) in allowed)
+        return self
+
+    def is_(self, column: str, value):
+        expected = None if value in ("null", None) else value
+        self._filters.append(lambda row: row.get(column) is expected)
+        return self
+
+    def gte(self, column: str, value):
+        self._filters.append(
+            lambda row: row.get(column) is not None and row[column] >= value
+        )
+        return self
+
+    def lte(self, column: str, value):
+        self._filters.append(
+            lambda row: row.get(column) is not None and row[column] <= value
+        )
+        return self
+
+    def single(self):
+        self._single = True
+        return self
+
+    def execute(self) -> MemoryResult:
+        with self._db.lock:
+            if self._op == "select":
+                return self._execute_select()
+            return self._execute_write()
+
+    def _execute_select(self) -> MemoryResult:
+        rows = []
+        for row in self._db.tables.get(self._table, []):
+            if not all(f(row) for f in self._filters):
+                continue
+            row = dict(row)
+            if not self._embed(row):
+                continue
+            rows.append(row)
+
+        if self._single:
+            if len(rows) != 1:
+                raise ValueError(
+                    f"Expected a single {self._table} row, found {len(rows)}"
+                )
+            return MemoryResult(rows[0])
+        return MemoryResult(rows)
+
+    def _embed(self, row: dict) -> bool:
+        """Attach embedded rows (inner join); False if any is missing."""
+        for embedded in self._embeds:
+            column = FOREIGN_KEYS[(self._table, embedded)]
+            match = next(
+                (
+                    r
+                    for r in self._db.tables.get(embedded, [])
+                    if r.get("id") == row.get(column)
+                ),
+                None,
+            )
+            if match is None:
+                return False
+            row[embedded] = dict(match)
+        return True
+
+    def _execute_write(self) -> MemoryResult:
+        table = self._db.tables.setdefault(self._table, [])
+        written = []
+        for new_row in self._rows:
+            existing = None
+            if self._op == "upsert" and self._on_conflict:
+                existing = next(
+                    (
+                        r
+                        for r in table
+                        if all(r.get(c) == new_row.get(c) for c in self._on_conflict)
+                    ),
+                    None,
+                )
+
+            if existing is not None:
+                if self._ignore_duplicates:
+                    continue
+                existing.update(new_row)
+                written.append(dict(existing))
+                continue
+
+            row = {
+                "id": str(uuid.uuid4()),
+                "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            }
+            row.update(new_row)
+            table.append(row)
+            written.append(dict(row))
+        return MemoryResult(written)
+
+
+class MemorySupabase:
+    """Minimal in-memory replacement for supabase.Client (tables as lists of dicts)."""
+
+    def __init__(self, tables: dict[str, list[dict]] | None = None):
+        self.tables: dict[str, list[dict]] = {
+            name: [dict(r) for r in rows] for name, rows in (tables or {}).items()
+        }
+        self.rpc_calls: list[tuple[str, dict]] = []
+        self.lock = threading.RLock()
+
+    @classmethod
+    def from_fixture(cls, path: str) -> "MemorySupabase":
+        """Load the `tables` section of a mock club site fixture."""
+        with open(path) as f:
+            fixture = json.load(f)
+        return cls(fixture.get("tables", {}))
+
+    def table(self, name: str) -> MemoryQuery:
+        return MemoryQuery(self, name)
+
+    def rpc(self, name: str, params: dict | None = None) -> "MemoryRpc":
+        return MemoryRpc(self, name, params or {})
+
+
+class MemoryRpc:
+    """
+    Database functions are not emulated: calls are recorded in
+    MemorySupabase.rpc_calls and return no data.
+    """
+
+    def __init__(self, db: MemorySupabase, name: str, params: dict):
+        self._db = db
+        self._name = name
+        self._params = params
+
+    def execute(self) -> MemoryResult:
+        with self._db.lock:
+            self._db.rpc_calls.append((self._name, self._params))
+        return MemoryResult(None)
@@ -0,0 +1,170 @@
+"""Run instrumentation for the ETL pipeline: timing spans, counters and sinks."""
+
+import datetime
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from supabase import Client
+
+from timeline import PhaseTimeline
+
+
+class RunMetrics:
+    """
+    Collect timing spans and counters for a single ETL run.
+
+    Spans and counters can be written out as JSON lines and as a Prometheus
+    textfile (for the node_exporter textfile collector), and a summary row is
+    stored in the etl_runs table.
+    """
+
+    def __init__(self, club_id: str | None):
+        self.run_id = str(uuid.uuid4())
+        self.club_id = club_id
+        self.started_at = datetime.datetime.now(datetime.timezone.utc)
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self.spans: list[dict] = []
+        self.counters: dict[str, int] = {}
+
+    @contextmanager
+    def span(self, name: str, **labels):
+        """Time the body of the `with` block as span `name`."""
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            end = time.perf_counter()
+            self._add_span(name, start - self._origin, end - start, status, labels)
+
+    def add_timeline(self, timeline: PhaseTimeline):
+        """Record the phases of a start-up timeline as spans."""
+        offset = timeline.origin - self._origin
+        for name, phase in timeline.phases.items():
+            self._add_span(
+                name,
+                offset + phase["start"],
+                phase["end"] - phase["start"],
+                "ok",
+                {},
+            )
+
+    def _add_span(self, name, offset, duration, status, labels):
+        with self._lock:
+            self.spans.append(
+                {
+                    "name": name,
+                    "offset_s": round(offset, 4),
+                    "duration_s": round(duration, 4),
+                    "status": status,
+                    "labels": labels,
+                }
+            )
+
+    def incr(self, name: str, value: int = 1):
+        """Increment counter `name` by value."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def phase_totals(self) -> dict[str, dict]:
+        """Aggregate spans by name: {name: {count, total_ms, max_ms, errors}}."""
+        totals: dict[str, dict] = {}
+        with self._lock:
+            spans = list(self.spans)
+        for s in spans:
+            entry = totals.setdefault(
+                s["name"], {"count": 0, "total_ms": 0, "max_ms": 0, "errors": 0}
+            )
+            ms = int(s["duration_s"] * 1000)
+            entry["count"] += 1
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+            if s["status"] != "ok":
+                entry["errors"] += 1
+        return totals
+
+    def summary(self, status: str, error: str | None = None) -> dict:
+        """Build the etl_runs row for this run."""
+        finished_at = datetime.datetime.now(datetime.timezone.utc)
+        return {
+            "id": self.run_id,
+            "club_id": self.club_id,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": finished_at.isoformat(),
+            "status": status,
+            "error": error,
+            "duration_ms": int((time.perf_counter() - self._origin) * 1000),
+            "rows_scraped": self.counters.get("rows_scraped", 0),
+            "rows_matched": self.counters.get("rows_matched", 0),
+            "rows_written": self.counters.get("rows_written", 0),
+            "phase_durations": self.phase_totals(),
+            "counters": dict(self.counters),
+        }
+
+    def write_jsonl(self, path: str, summary: dict):
+        """Append every span, then the run summary, as JSON lines."""
+        with open(path, "a") as f:
+            for s in self.spans:
+                record = {
+                    "type": "span",
+                    "run_id": self.run_id,
+                    "club_id": self.club_id,
+                }
+                record.update(s)
+                f.write(json.dumps(record) + "\n")
+            f.write(json.dumps({"type": "run", **summary}) + "\n")
+
+    def write_prometheus(self, path: str, summary: dict):
+        """Write the run as a Prometheus textfile, atomically replacing path."""
+        club = f'club_id="{self.club_id or ""}"'
+        lines = [
+            "# HELP grouptee_etl_phase_seconds Total seconds spent in each ETL phase.",
+            "# TYPE grouptee_etl_phase_seconds gauge",
+        ]
+        totals = summary["phase_durations"]
+        for name, t in sorted(totals.items()):
+            lines.append(
+                f'grouptee_etl_phase_seconds{{{club},phase="{name}"}} {t["total_ms"] / 1000:.3f}'
+            )
+        lines += [
+            "# HELP grouptee_etl_phase_count Number of times each ETL phase ran.",
+            "# TYPE grouptee_etl_phase_count gauge",
+        ]
+        for name, t in sorted(totals.items()):
+            lines.append(
+                f'grouptee_etl_phase_count{{{club},phase="{name}"}} {t["count"]}'
+            )
+        lines += [
+            "# HELP grouptee_etl_rows Rows processed in the last ETL run.",
+            "# TYPE grouptee_etl_rows gauge",
+        ]
+        for name, value in sorted(summary["counters"].items()):
+            lines.append(f'grouptee_etl_rows{{{club},kind="{name}"}} {value}')
+        lines += [
+            "# HELP grouptee_etl_run_duration_seconds Duration of the last ETL run.",
+            "# TYPE grouptee_etl_run_duration_seconds gauge",
+            f"grouptee_etl_run_duration_seconds{{{club}}} {summary['duration_ms'] / 1000:.3f}",
+            "# HELP grouptee_etl_last_run_success Whether the last ETL run succeeded.",
+            "# TYPE grouptee_etl_last_run_success gauge",
+            f"grouptee_etl_last_run_success{{{club}}} {int(summary['status'] == 'success')}",
+            "# HELP grouptee_etl_last_run_timestamp_seconds When the last ETL run finished.",
+            "# TYPE grouptee_etl_last_run_timestamp_seconds gauge",
+            f"grouptee_etl_last_run_timestamp_seconds{{{club}}} {int(time.time())}",
+        ]
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+
+    def persist(self, supabase: Client, summary: dict):
+        """Store the run summary in the etl_runs table."""
+        supabase.table("etl_runs").insert(summary).execute()
@@ -0,0 +1,338 @@
+"""
+Local mock of the 1757 Golf Club member site, for offline ETL runs.
+
+Reproduces what the scraper touches: the login form ids, the
+`[data-id="10136"]` tee times tile (opening a new window), the
+`view-teesheet` link, the jQuery-UI style datepicker and the tee sheet
+table. Tee sheets come from a fixture recorded from external_tee_sheets.
+
+Usage:
+    python mock_club_site.py record --club-id <uuid> --out fixtures/recorded/club.json
+    python mock_club_site.py serve --fixtures fixtures/sample_club.json --port 8757
+
+Fixture format:
+    {
+      "club_id": "<uuid>",
+      "tables": {"clubs": [...], "groups": [...], "profiles": [...],
+                 "memberships": [...], "invitations": [...]},
+      "tee_sheets": {"YYYY-MM-DD": [{"tee_time": "7:30 am", "golfers": [...]}]}
+    }
+"""
+
+import argparse
+import datetime
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+LOGIN_PAGE = """<!doctype html>
+<html><head><title>Member Home | 1757 Golf Club</title></head>
+<body>
+  <form method="post" action="/login">
+    <input id="login_username_main" name="username" type="text">
+    <input id="login_password_main" name="password" type="password">
+    <button id="login_submit_main" type="submit">Log In</button>
+  </form>
+</body></html>
+"""
+
+MEMBER_HOME_PAGE = """<!doctype html>
+<html><head><title>Member Home | 1757 Golf Club</title></head>
+<body>
+  <ul class="tiles">
+    <li data-id="10136"><a href="/teesheet" target="_blank">Tee Times</a></li>
+  </ul>
+</body></html>
+"""
+
+TEESHEET_PAGE = """<!doctype html>
+<html><head><title>Tee Times</title></head>
+<body>
+  <a ui-sref="view-teesheet" href="#" id="view-teesheet">View Tee Sheet</a>
+  <div id="sheet" style="display:none">
+    <input type="text" id="date-input" aria-describedby="dateInput" readonly>
+    <span id="dateInput">Select a date</span>
+    <div id="datepicker"></div>
+    <div id="teesheet"></div>
+  </div>
+<script>
+  var months = ["January", "February", "March", "April", "May", "June", "July",
+                "August", "September", "October", "November", "December"];
+  var shown = new Date();
+  shown.setDate(1);
+
+  function pad(n) { return n < 10 ? "0" + n : "" + n; }
+
+  function closeCalendar() {
+    document.getElementById("datepicker").innerHTML = "";
+  }
+
+  function renderCalendar() {
+    var picker = document.getElementById("datepicker");
+    picker.innerHTML = "";
+    var header = document.createElement("div");
+    var next = document.createElement("a");
+    next.className = "ui-datepicker-next";
+    next.textContent = "Next";
+    next.href = "#";
+    next.addEventListener("click", function (e) {
+      e.preventDefault();
+      shown.setMonth(shown.getMonth() + 1);
+      renderCalendar();
+    });
+    var title = document.createElement("span");
+    title.className = "ui-datepicker-title";
+    title.textContent = months[shown.getMonth()] + " " + shown.getFullYear();
+    header.appendChild(title);
+    header.appendChild(next);
+    picker.appendChild(header);
+
+    var table = document.createElement("table");
+    table.className = "ui-datepicker-calendar";
+    var body = document.createElement("tbody");
+    var row = document.createElement("tr");
+    var first = new Date(shown.getFullYear(), shown.getMonth(), 1);
+    var days = new Date(shown.getFullYear(), shown.getMonth() + 1, 0).getDate();
+    for (var i = 0; i < first.getDay(); i++) {
+      row.appendChild(document.createElement("td"));
+    }
+    for (var d = 1; d <= days; d++) {
+      var cell = document.createElement("td");
+      var link = document.createElement("a");
+      link.href = "#";
+      link.textContent = d;
+      link.setAttribute("data-date",
+        shown.getFullYear() + "-" + pad(shown.getMonth() + 1) + "-" + pad(d));
+      link.addEventListener("click", function (e) {
+        e.preventDefault();
+        selectDate(this.getAttribute("data-date"));
+      });
+      cell.appendChild(link);
+      row.appendChild(cell);
+      if (row.children.length === 7) {
+        body.appendChild(row);
+        row = document.createElement("tr");
+      }
+    }
+    if (row.children.length) body.appendChild(row);
+    table.appendChild(body);
+    picker.appendChild(table);
+  }
+
+  function selectDate(isoDate) {
+    document.getElementById("date-input").value = isoDate;
+    var parts = isoDate.split("-");
+    shown = new Date(+parts[0], +parts[1] - 1, 1);
+    closeCalendar();
+    fetch("/api/teesheet?date=" + isoDate)
+      .then(function (r) { return r.json(); })
+      .then(renderSheet);
+  }
+
+  function renderSheet(rows) {
+    var container = document.getElementById("teesheet");
+    container.innerHTML = "";
+    var table = document.createElement("table");
+    table.className = "table table-bordered header";
+    var head = document.createElement("thead");
+    head.innerHTML = "<tr><th>Time</th><th>Player 1</th><th>Player 2</th>" +
+      "<th>Player 3</th><th>Player 4</th></tr>";
+    table.appendChild(head);
+    var body = document.createElement("tbody");
+    rows.forEach(function (slot) {
+      var tr = document.createElement("tr");
+      [slot.tee_time].concat(slot.golfers).forEach(function (text) {
+        var td = document.createElement("td");
+        td.textContent = text;
+        tr.appendChild(td);
+      });
+      body.appendChild(tr);
+    });
+    table.appendChild(body);
+    container.appendChild(table);
+  }
+
+  document.getElementById("view-teesheet").addEventListener("click", function (e) {
+    e.preventDefault();
+    document.getElementById("sheet").style.display = "block";
+  });
+  document.getElementById("date-input").addEventListener("click", renderCalendar);
+</script>
+</body></html>
+"""
+
+
+def load_fixture(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def sheet_for_date(tee_sheets: dict[str, list], tee_date: str) -> list:
+    """
+    Return the recorded sheet for tee_date, falling back to the most recent
+    recording on the same weekday (so upcoming dates replay real sheets).
+    """
+    if tee_date in tee_sheets:
+        return tee_sheets[tee_date]
+
+    weekday = datetime.date.fromisoformat(tee_date).weekday()
+    same_weekday = sorted(
+        d for d in tee_sheets if datetime.date.fromisoformat(d).weekday() == weekday
+    )
+    if same_weekday:
+        return tee_sheets[same_weekday[-1]]
+    return []
+
+
+class MockClubSiteHandler(BaseHTTPRequestHandler):
+    """Serves the mock club site; `tee_sheets` is set on the server."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: str, content_type: str = "text/html"):
+        payload = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path in ("/", "/member-home"):
+            logged_in = "session=1" in self.headers.get("Cookie", "")
+            self._send(200, MEMBER_HOME_PAGE if logged_in else LOGIN_PAGE)
+        elif url.path == "/teesheet":
+            self._send(200, TEESHEET_PAGE)
+        elif url.path == "/api/teesheet":
+            tee_date = parse_qs(url.query).get("date", [""])[0]
+            try:
+                rows = sheet_for_date(self.server.tee_sheets, tee_date)
+            except ValueError:
+                body = json.dumps({"error": "invalid date"})
+                self._send(400, body, "application/json")
+                return
+            self._send(200, json.dumps(rows), "application/json")
+        else:
+            self._send(404, "Not found", "text/plain")
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/login":
+            self._send(404, "Not found", "text/plain")
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        self.send_response(303)
+        self.send_header("Location", "/member-home")
+        self.send_header("Set-Cookie", "session=1; Path=/")
+        self.end_headers()
+
+
+def start_server(
+    tee_sheets: dict[str, list], host: str = "127.0.0.1", port: int = 0
+) -> ThreadingHTTPServer:
+    """Start the mock site on a background thread. Port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), MockClubSiteHandler)
+    server.tee_sheets = tee_sheets
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def record_fixture(club_id: str, out_path: str, sheets: int):
+    """Record club metadata and recent external_tee_sheets into a fixture file."""
+    from dotenv import load_dotenv
+    from supabase import create_client
+
+    load_dotenv()
+    supabase = create_client(
+        os.environ["SUPABASE_URL"], os.environ["SUPABASE_SERVICE_KEY"]
+    )
+
+    clubs = supabase.table("clubs").select("*").eq("id", club_id).execute().data
+    groups = supabase.table("groups").select("*").eq("club_id", club_id).execute().data
+    group_ids = [g["id"] for g in groups]
+    memberships = (
+        supabase.table("memberships").select("*").in_("group_id", group_ids).execute()
+    ).data
+    user_ids = list({m["user_id"] for m in memberships})
+    profiles = (
+        supabase.table("profiles")
+        .select("id, full_name, normalized_name")
+        .in_("id", user_ids)
+        .execute()
+    ).data
+    invitations = (
+        supabase.table("invitations")
+        .select("id, group_id, display_name, invitation_type, claimed_by")
+        .in_("group_id", group_ids)
+        .is_("claimed_by", "null")
+        .execute()
+    ).data
+    recorded = (
+        supabase.table("external_tee_sheets")
+        .select("scraped_date, raw_data")
+        .eq("club_id", club_id)
+        .order("scraped_at", desc=True)
+        .limit(sheets)
+        .execute()
+    ).data
+
+    # Newest recording wins for each date
+    tee_sheets = {}
+    for row in recorded:
+        tee_sheets.setdefault(row["scraped_date"], row["raw_data"])
+
+    fixture = {
+        "club_id": club_id,
+        "tables": {
+            "clubs": clubs,
+            "groups": groups,
+            "profiles": profiles,
+            "memberships": memberships,
+            "invitations": invitations,
+        },
+        "tee_sheets": tee_sheets,
+    }
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with open(out_path, "w") as f:
+        json.dump(fixture, f, indent=2)
+    print(f"Recorded {len(tee_sheets)} tee sheets for club {club_id} to {out_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="Serve the mock club site")
+    serve.add_argument("--fixtures", required=True)
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8757)
+
+    record = sub.add_parser("record", help="Record a fixture from Supabase")
+    record.add_argument("--club-id", required=True)
+    record.add_argument("--out", required=True)
+    record.add_argument("--sheets", type=int, default=8)
+
+    args = parser.parse_args()
+    if args.command == "record":
+        record_fixture(args.club_id, args.out, args.sheets)
+        return
+
+    fixture = load_fixture(args.fixtures)
+    server = start_server(fixture["tee_sheets"], args.host, args.port)
+    print(
+        f"Mock club site for {fixture['club_id']} "
+        f"at http://{args.host}:{server.server_port}"
+    )
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Tee sheet analytics over the tee_slot_occupancy time series.
+
+Computes, per season (tee date year):
+  - fill curves: mean fill ratio of bookable spots by days before the tee date
+  - availability: share of slots still open at the last scrape, by weekday
+    and hour
+  - win rates: lottery-won slots and days per group and per member
+
+Everything is vectorized pandas/NumPy over the narrow occupancy table, so
+years of history run in seconds. Load the data either from Supabase or from
+a CSV export, which is faster for large histories:
+
+    \\copy tee_slot_occupancy to 'occupancy.csv' csv header
+
+Usage:
+    python occupancy_analytics.py --club-id <uuid> [--since 2024-01-01] [--out reports/]
+    python occupancy_analytics.py --csv occupancy.csv [--out reports/]
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = [
+    "club_id",
+    "tee_date",
+    "tee_time",
+    "slot_index",
+    "scraped_at",
+    "filled_spots",
+    "blocked_spots",
+    "open_spots",
+    "group_id",
+    "user_id",
+    "invitation_id",
+]
+
+PAGE_SIZE = 1000
+
+
+def fetch_occupancy(supabase, club_id: str, since: str | None = None) -> pd.DataFrame:
+    """Page a club's occupancy rows out of Supabase into a DataFrame."""
+    pages = []
+    start = 0
+    while True:
+        query = (
+            supabase.table("tee_slot_occupancy")
+            .select(",".join(COLUMNS))
+            .eq("club_id", club_id)
+        )
+        if since:
+            query = query.gte("tee_date", since)
+        result = (
+            query.order("tee_date")
+            .order("tee_time")
+            .order("slot_index")
+            .order("scraped_at")
+            .range(start, start + PAGE_SIZE - 1)
+            .execute()
+        )
+        pages.append(pd.DataFrame.from_records(result.data, columns=COLUMNS))
+        if len(result.data) < PAGE_SIZE:
+            break
+        start += PAGE_SIZE
+    return pd.concat(pages, ignore_index=True)
+
+
+def prepare(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Parse types and derive season, days_before, hour and fill ratio columns.
+    Fully blocked slots have no bookable spots and a NaN fill ratio.
+    """
+    df = df.copy()
+    df["tee_date"] = pd.to_datetime(df["tee_date"])
+    df["scraped_at"] = pd.to_datetime(df["scraped_at"], utc=True)
+    for column in ("filled_spots", "blocked_spots", "open_spots"):
+        df[column] = df[column].astype(np.int16)
+    for column in ("club_id", "group_id", "user_id", "invitation_id"):
+        df[column] = df[column].astype("category")
+
+    scraped_day = df["scraped_at"].dt.tz_localize(None).dt.normalize()
+    df["days_before"] = (df["tee_date"] - scraped_day).dt.days.astype(np.int16)
+    df["season"] = df["tee_date"].dt.year.astype(np.int16)
+    df["weekday"] = df["tee_date"].dt.day_name()
+    df["hour"] = pd.to_datetime(df["tee_time"], format="%H:%M:%S").dt.hour
+
+    bookable = (df["filled_spots"] + df["open_spots"]).to_numpy()
+    df["fill_ratio"] = np.divide(
+        df["filled_spots"].to_numpy(),
+        bookable,
+        out=np.full(len(df), np.nan),
+        where=bookable > 0,
+    )
+    df["member"] = df["user_id"].astype(object).fillna(
+        df["invitation_id"].astype(object)
+    )
+    return df
+
+
+def final_scrapes(df: pd.DataFrame) -> pd.DataFrame:
+    """The last observation of each slot (its state closest to the tee date)."""
+    ordered = df.sort_values("scraped_at", kind="stable")
+    return ordered.drop_duplicates(
+        ["club_id", "tee_date", "tee_time", "slot_index"], keep="last"
+    )
+
+
+def fill_curves(df: pd.DataFrame) -> pd.DataFrame:
+    """Mean fill ratio and slots observed by season and days before the tee date."""
+    return (
+        df.groupby(["season", "days_before"], observed=True)
+        .agg(fill_ratio=("fill_ratio", "mean"), slots=("fill_ratio", "size"))
+        .reset_index()
+        .sort_values(["season", "days_before"], ascending=[True, False])
+    )
+
+
+def availability(df: pd.DataFrame) -> pd.DataFrame:
+    """Share of slots open at the last scrape, by season, weekday and hour."""
+    final = final_scrapes(df)
+    return (
+        final.assign(has_open=final["open_spots"] > 0)
+        .groupby(["season", "weekday", "hour"], observed=True)
+        .agg(
+            slots=("has_open", "size"),
+            open_share=("has_open", "mean"),
+            mean_open_spots=("open_spots", "mean"),
+        )
+        .reset_index()
+    )
+
+
+def win_rates(df: pd.DataFrame, by: str) -> pd.DataFrame:
+    """
+    Lottery wins per season for `by` ("group_id" or "member"): won slots,
+    days with at least one win, the share of scraped days won and the share
+    of all won slots.
+    """
+    final = final_scrapes(df)
+    days_scraped = final.groupby("season")["tee_date"].nunique()
+    won = final[final[by].notna()]
+    rates = (
+        won.groupby(["season", by], observed=True)
+        .agg(won_slots=("tee_time", "size"), days_won=("tee_date", "nunique"))
+        .reset_index()
+    )
+    rates["days_scraped"] = rates["season"].map(days_scraped).to_numpy()
+    rates["day_win_rate"] = rates["days_won"] / rates["days_scraped"]
+    season_total = rates.groupby("season")["won_slots"].transform("sum")
+    rates["slot_share"] = rates["won_slots"] / season_total
+    return rates.sort_values(["season", "won_slots"], ascending=[True, False])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tee sheet occupancy analytics.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--club-id", help="Load the club's rows from Supabase")
+    source.add_argument("--csv", help="Load a tee_slot_occupancy CSV export")
+    parser.add_argument("--since", help="Only tee dates on or after YYYY-MM-DD")
+    parser.add_argument("--out", help="Directory to write the reports as CSV")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.csv:
+        raw = pd.read_csv(args.csv, usecols=COLUMNS)
+        if args.since:
+            raw = raw[raw["tee_date"] >= args.since]
+    else:
+        from dotenv import load_dotenv
+        from supabase import create_client
+
+        load_dotenv()
+        supabase = create_client(
+            os.environ["SUPABASE_URL"], os.environ["SUPABASE_SERVICE_KEY"]
+        )
+        raw = fetch_occupancy(supabase, args.club_id, args.since)
+    loaded = time.perf_counter()
+
+    if raw.empty:
+        print("No occupancy rows found.")
+        return
+
+    df = prepare(raw)
+    reports = {
+        "fill_curves": fill_curves(df),
+        "availability": availability(df),
+        "group_win_rates": win_rates(df, "group_id"),
+        "member_win_rates": win_rates(df, "member"),
+    }
+    computed = time.perf_counter()
+
+    with pd.option_context("display.width", 120, "display.max_rows", 40):
+        for name, report in reports.items():
+            print(f"\n{name} ({len(report)} rows)")
+            text = report.to_string(
+                index=False, max_rows=40, float_format="{:.3f}".format
+            )
+            print(text)
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        for name, report in reports.items():
+            report.to_csv(os.path.join(args.out, f"{name}.csv"), index=False)
+        print(f"\nWrote {len(reports)} reports to {args.out}")
+
+    print(
+        f"\n{len(df)} rows: loaded in {loaded - start:.2f}s, "
+        f"analyzed in {computed - loaded:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
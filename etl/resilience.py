@@ -0,0 +1,294 @@
+"""
+Retry, backoff, circuit breaking and browser recycling for the ETL.
+
+Steps are retried individually (a failed date selection is retried, not
+the whole session) when the error looks transient: Selenium timeouts, stale
+elements and driver crashes, network errors and PostgREST 5xx / retryable
+Postgres errors. Consecutive failures against one site open its circuit so the rest
+of the run fails fast instead of hammering a site that is down.
+"""
+
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+import httpx
+from postgrest.exceptions import APIError
+from selenium.common.exceptions import (
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Postgres error classes worth retrying: serialization/deadlock, statement
+# timeout, connection exceptions and insufficient resources
+RETRYABLE_PG_CODES = {"40001", "40P01", "57014"}
+RETRYABLE_PG_PREFIXES = ("08", "53", "57P")
+
+# WebDriverException messages that mean the browser or its session is gone,
+# as opposed to the page not matching what the step expected
+LOST_SESSION_MARKERS = (
+    "invalid session id",
+    "session deleted",
+    "no such window",
+    "chrome not reachable",
+    "disconnected",
+    "connection refused",
+    "max retries exceeded",
+    "tab crashed",
+)
+
+
+@dataclass(slots=True, frozen=True)
+class RetryPolicy:
+    """How often and how long to retry a step."""
+
+    attempts: int = 3
+    base_delay: float = 2.0
+    max_delay: float = 30.0
+
+    @classmethod
+    def from_env(cls, step: str) -> "RetryPolicy":
+        """
+        Read ETL_RETRY_<STEP>_ATTEMPTS / ETL_RETRY_<STEP>_BASE_DELAY, falling
+        back to ETL_RETRY_ATTEMPTS / ETL_RETRY_BASE_DELAY / ETL_RETRY_MAX_DELAY.
+        """
+        prefix = f"ETL_RETRY_{step.upper()}_"
+
+        def setting(name: str, default: str) -> str:
+            return os.environ.get(
+                prefix + name, os.environ.get(f"ETL_RETRY_{name}", default)
+            )
+
+        return cls(
+            attempts=max(1, int(setting("ATTEMPTS", "3"))),
+            base_delay=float(setting("BASE_DELAY", "2.0")),
+            max_delay=float(setting("MAX_DELAY", "30.0")),
+        )
+
+    def delay(self, attempt: int) -> float:
+        """Equal-jitter exponential backoff before retry number `attempt` (1-based)."""
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(ceiling / 2, ceiling)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a site whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures and rejects calls until
+    `cooldown` seconds have passed, then lets one trial call through.
+    """
+
+    def __init__(self, name: str, threshold: int = 5, cooldown: float = 60.0):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.cooldown:
+                raise CircuitOpenError(
+                    f"Circuit for {self.name} is open after {self.failures} failures"
+                )
+            # Half-open: allow a trial call
+            self.opened_at = None
+            self.failures = self.threshold - 1
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(name: str) -> CircuitBreaker:
+    """Shared circuit breaker per site (club site URL, Supabase URL, ...)."""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(
+                name,
+                threshold=int(os.environ.get("ETL_BREAKER_THRESHOLD", "5")),
+                cooldown=float(os.environ.get("ETL_BREAKER_COOLDOWN", "60")),
+            )
+        return _breakers[name]
+
+
+def is_transient(exc: BaseException) -> bool:
+    """
+    Whether an error is worth retrying. Selenium errors such as NoSuchElement
+    or InvalidSelector mean the page or a selector changed and fail the same
+    way every time, so only timeouts, stale elements and a lost browser
+    session are retried.
+    """
+    if isinstance(exc, CircuitOpenError):
+        return False
+    if isinstance(exc, (TimeoutException, StaleElementReferenceException)):
+        return True
+    if isinstance(exc, WebDriverException):
+        message = (exc.msg or str(exc)).lower()
+        return any(marker in message for marker in LOST_SESSION_MARKERS)
+    if isinstance(exc, (httpx.TransportError, ConnectionError, TimeoutError)):
+        return True
+    if isinstance(exc, APIError):
+        code = str(exc.code or "")
+        if len(code) == 3 and code.startswith("5"):
+            return True
+        return code in RETRYABLE_PG_CODES or code.startswith(RETRYABLE_PG_PREFIXES)
+    return False
+
+
+def call_with_retry(
+    step: str,
+    func,
+    *args,
+    policy: RetryPolicy | None = None,
+    breaker: CircuitBreaker | None = None,
+    metrics=None,
+    recover=None,
+    **kwargs,
+):
+    """
+    Call func(*args, **kwargs), retrying transient failures per policy.
+    `recover` runs before each retry (e.g. to restart a crashed browser).
+    """
+    policy = policy or RetryPolicy.from_env(step)
+    for attempt in range(1, policy.attempts + 1):
+        if breaker is not None:
+            breaker.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            # A permanent error (a bad selector, a rejected row) says nothing
+            # about the site's health, so only transient ones count
+            if not is_transient(e):
+                raise
+            if breaker is not None:
+                breaker.record_failure()
+            if attempt == policy.attempts:
+                raise
+            delay = policy.delay(attempt)
+            print(
+                f"  {step} failed ({type(e).__name__}: {str(e).strip()[:120]}), "
+                f"retrying in {delay:.1f}s ({attempt}/{policy.attempts - 1})"
+            )
+            if metrics is not None:
+                metrics.incr(f"retries_{step}")
+            time.sleep(delay)
+            if recover is not None:
+                recover()
+        else:
+            if breaker is not None:
+                breaker.record_success()
+            return result
+
+
+def process_tree_rss_mb(pid: int) -> float | None:
+    """Resident memory of a process and its descendants (Linux /proc only)."""
+    if not os.path.isdir(f"/proc/{pid}"):
+        return None
+
+    total_kb = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+            with open(f"/proc/{current}/task/{current}/children") as f:
+                pending.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError):
+            continue
+    return total_kb / 1024
+
+
+class BrowserSession:
+    """
+    Owns the WebDriver and its logged-in tee sheet window. Restarts the
+    browser (and logs in again) when it has crashed or grown past
+    max_rss_mb of resident memory.
+    """
+
+    def __init__(
+        self, create_driver, login, wait_timeout: int = 10, max_rss_mb: float = 0
+    ):
+        self.create_driver = create_driver
+        self.login_func = login
+        self.wait_timeout = wait_timeout
+        self.max_rss_mb = max_rss_mb
+        self.driver = None
+        self.wait = None
+        self.restarts = 0
+
+    def attach(self, driver):
+        """Adopt a driver started elsewhere (e.g. during start-up)."""
+        self.driver = driver
+        self.wait = WebDriverWait(driver, self.wait_timeout)
+
+    def login(self):
+        self.login_func(self.driver, self.wait)
+
+    def rss_mb(self) -> float | None:
+        process = getattr(getattr(self.driver, "service", None), "process", None)
+        if process is None:
+            return None
+        return process_tree_rss_mb(process.pid)
+
+    def is_healthy(self) -> bool:
+        if self.driver is None:
+            return False
+        try:
+            self.driver.window_handles
+        except WebDriverException:
+            return False
+        if self.max_rss_mb:
+            rss = self.rss_mb()
+            if rss is not None and rss > self.max_rss_mb:
+                print(f"  Browser using {rss:.0f} MB (limit {self.max_rss_mb:.0f} MB)")
+                return False
+        return True
+
+    def restart(self, login: bool = True):
+        """Replace the browser with a fresh one and (by default) log in again."""
+        print("  Restarting browser...")
+        self.quit()
+        self.attach(self.create_driver())
+        self.restarts += 1
+        if login:
+            self.login()
+
+    def recover(self):
+        """Restart the browser if it crashed or is leaking memory."""
+        if not self.is_healthy():
+            self.restart()
+
+    def quit(self):
+        if self.driver is None:
+            return
+        try:
+            self.driver.quit()
+        except Exception:
+            pass  # already dead
+        self.driver = None
@@ -0,0 +1,112 @@
+"""Typed tee sheet model for the ETL pipeline."""
+
+import datetime
+import functools
+import re
+import sys
+from dataclasses import dataclass, field
+
+BLOCKED = "* BLOCKED *"
+
+TIME_PATTERN = re.compile(r"(\d{1,2}):(\d{2})\s*(am|pm)")
+
+
+@functools.lru_cache(maxsize=512)
+def parse_tee_time(label: str) -> datetime.time | None:
+    """Convert '7:30 am' to datetime.time(7, 30). Returns None if unparseable."""
+    match = TIME_PATTERN.match(label.strip().lower())
+    if not match:
+        return None
+
+    hours = int(match.group(1))
+    minutes = int(match.group(2))
+    period = match.group(3)
+    if hours > 12 or minutes > 59:
+        return None
+
+    if period == "pm" and hours != 12:
+        hours += 12
+    elif period == "am" and hours == 12:
+        hours = 0
+
+    return datetime.time(hours, minutes)
+
+
+@dataclass(slots=True, frozen=True)
+class TeeSlot:
+    """
+    One row of a tee sheet. `cells` holds the golfer cells as scraped
+    (interned, so repeated names and empty cells share one string).
+    """
+
+    tee_time: datetime.time
+    label: str
+    cells: tuple[str, ...]
+    open_spots: int
+    blocked: bool
+
+    @classmethod
+    def from_cells(cls, tee_time: datetime.time, label: str, cells: list[str]):
+        interned = tuple(sys.intern(c) for c in cells)
+        return cls(
+            tee_time=tee_time,
+            label=sys.intern(label),
+            cells=interned,
+            open_spots=sum(1 for c in interned if not c),
+            blocked=BLOCKED in interned,
+        )
+
+    @property
+    def golfers(self) -> tuple[str, ...]:
+        """Names in the slot, excluding open and blocked cells."""
+        return tuple(c for c in self.cells if c and c != BLOCKED)
+
+    @property
+    def blocked_spots(self) -> int:
+        return sum(1 for c in self.cells if c == BLOCKED)
+
+    def to_raw(self) -> dict:
+        """The slot in the raw_data format stored in external_tee_sheets."""
+        return {"tee_time": self.label, "golfers": list(self.cells)}
+
+
+@dataclass(slots=True, frozen=True)
+class RejectedRow:
+    """A tee sheet row whose time could not be parsed (index is its row position)."""
+
+    index: int
+    label: str
+    cells: tuple[str, ...]
+    reason: str
+
+    def to_raw(self) -> dict:
+        return {"tee_time": self.label, "golfers": list(self.cells)}
+
+
+@dataclass(slots=True)
+class TeeSheet:
+    """Parsed slots for one day, plus any rows rejected while parsing."""
+
+    slots: list[TeeSlot] = field(default_factory=list)
+    rejected: list[RejectedRow] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def to_raw(self) -> list[dict]:
+        """All rows (parsed and rejected) in the raw_data format."""
+        rows = [s.to_raw() for s in self.slots]
+        for r in sorted(self.rejected, key=lambda r: r.index):
+            rows.insert(r.index, r.to_raw())
+        return rows
+
+
+@dataclass(slots=True, frozen=True)
+class WonSlot:
+    """A tee sheet slot won by a club member (real or pending)."""
+
+    slot: TeeSlot
+    won_by_name: str
+    won_by_user_id: str | None
+    group_id: str
+    invitation_id: str | None
@@ -0,0 +1,87 @@
+"""Phase timing for the ETL pipeline."""
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PhaseTimeline:
+    """
+    Record named phases (which may overlap across threads) relative to the
+    start of the run, and report them as a timeline with the critical path.
+    Each phase may name the phases it had to wait for via `after`.
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self.phases: dict[str, dict] = {}
+
+    def elapsed(self) -> float:
+        """Seconds since the timeline was created."""
+        return time.perf_counter() - self.origin
+
+    @contextmanager
+    def phase(self, name: str, after: tuple[str, ...] = ()):
+        """Time the body of the `with` block as phase `name`."""
+        start = self.elapsed()
+        try:
+            yield
+        finally:
+            end = self.elapsed()
+            with self._lock:
+                self.phases[name] = {
+                    "start": start,
+                    "end": end,
+                    "after": tuple(after),
+                    "thread": threading.current_thread().name,
+                }
+
+    def run(self, name: str, func, *args, after: tuple[str, ...] = (), **kwargs):
+        """Call func(*args, **kwargs) inside phase `name` and return its result."""
+        with self.phase(name, after=after):
+            return func(*args, **kwargs)
+
+    def critical_path(self) -> list[str]:
+        """
+        Walk back from the phase that finished last, following whichever
+        dependency finished latest. Returns phase names in start order.
+        """
+        with self._lock:
+            phases = dict(self.phases)
+        if not phases:
+            return []
+
+        name = max(phases, key=lambda n: phases[n]["end"])
+        path = [name]
+        while True:
+            deps = [d for d in phases[name]["after"] if d in phases]
+            if not deps:
+                break
+            name = max(deps, key=lambda n: phases[n]["end"])
+            path.append(name)
+        return list(reversed(path))
+
+    def report(self, width: int = 40) -> str:
+        """Render the phases as an ASCII timeline, critical path marked with '*'."""
+        with self._lock:
+            phases = sorted(self.phases.items(), key=lambda item: item[1]["start"])
+        if not phases:
+            return ""
+
+        critical = set(self.critical_path())
+        total = max(p["end"] for _, p in phases) or 1e-9
+        label_width = max(len(name) for name, _ in phases)
+
+        lines = []
+        for name, p in phases:
+            left = int(p["start"] / total * width)
+            length = max(1, int((p["end"] - p["start"]) / total * width))
+            bar = " " * left + "#" * min(length, width - left)
+            marker = "*" if name in critical else " "
+            lines.append(
+                f"  {marker} {name:<{label_width}} |{bar:<{width}}| "
+                f"{p['start']:6.2f}s → {p['end']:6.2f}s"
+            )
+        lines.append(f"  critical path: {' → '.join(self.critical_path())}")
+        return "\n".join(lines)
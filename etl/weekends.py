@@ -0,0 +1,81 @@
+"""Weekend id resolution for the ETL pipeline."""
+
+import datetime
+import threading
+
+from supabase import Client
+
+
+def weekend_bounds(tee_date: datetime.date) -> tuple[datetime.date, datetime.date]:
+    """Return the (Saturday, Sunday) of the weekend containing tee_date."""
+    days_since_saturday = (tee_date.weekday() + 2) % 7
+    saturday = tee_date - datetime.timedelta(days=days_since_saturday)
+    return saturday, saturday + datetime.timedelta(days=1)
+
+
+class WeekendResolver:
+    """
+    Resolve tee dates to weekend ids with at most one bulk upsert and one
+    select per materialized range, memoizing Saturday -> weekend_id so later
+    lookups cost no round trips.
+
+    Relies on the unique (start_date, end_date) constraint on weekends, so
+    concurrent runs creating the same weekend cannot produce duplicates.
+    """
+
+    def __init__(self, supabase: Client):
+        self.supabase = supabase
+        self._ids: dict[datetime.date, str] = {}
+        self._lock = threading.Lock()
+
+    def materialize(self, first_date: datetime.date, weeks: int = 1) -> int:
+        """
+        Ensure weekend rows exist for `weeks` consecutive weekends starting
+        with the one containing first_date. Returns the number memoized.
+        """
+        first_saturday, _ = weekend_bounds(first_date)
+        saturdays = [
+            first_saturday + datetime.timedelta(weeks=i) for i in range(max(weeks, 1))
+        ]
+
+        missing = [s for s in saturdays if s not in self._ids]
+        if not missing:
+            return 0
+
+        rows = [
+            {
+                "start_date": s.isoformat(),
+                "end_date": (s + datetime.timedelta(days=1)).isoformat(),
+            }
+            for s in missing
+        ]
+        self.supabase.table("weekends").upsert(
+            rows, on_conflict="start_date,end_date", ignore_duplicates=True
+        ).execute()
+
+        # ignore_duplicates hides existing rows from the upsert response,
+        # so read the whole range back in one query
+        result = (
+            self.supabase.table("weekends")
+            .select("id, start_date, end_date")
+            .gte("start_date", missing[0].isoformat())
+            .lte("start_date", missing[-1].isoformat())
+            .execute()
+        )
+
+        found = 0
+        with self._lock:
+            for row in result.data:
+                saturday = datetime.date.fromisoformat(row["start_date"])
+                end_date = datetime.date.fromisoformat(row["end_date"])
+                if end_date == saturday + datetime.timedelta(days=1):
+                    self._ids[saturday] = row["id"]
+                    found += 1
+        return found
+
+    def resolve(self, tee_date: str) -> str:
+        """Return the weekend UUID containing tee_date (YYYY-MM-DD)."""
+        saturday, _ = weekend_bounds(datetime.date.fromisoformat(tee_date))
+        if saturday not in self._ids:
+            self.materialize(saturday)
+        return self._ids[saturday]
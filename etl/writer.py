@@ -0,0 +1,296 @@
+"""
+Asynchronous write pipeline for the ETL.
+
+The scraper (producer) hands each parsed day to an AsyncWriter, which runs
+an asyncio loop on a background thread. A bounded queue feeds a few worker
+coroutines that upsert tee times, archive the raw sheet, record golfer
+aliases and append slot occupancy concurrently over the client's pooled
+connections, so database latency overlaps with browser work on the next day.
+"""
+
+import asyncio
+import threading
+from dataclasses import dataclass, field
+
+from checkpoints import FAILED, SCRAPED, SYNCED, CheckpointStore
+from metrics import RunMetrics
+from resilience import CircuitBreaker, RetryPolicy, is_transient
+from slots import TeeSheet, WonSlot
+
+TEE_TIME_CONFLICT = "weekend_id,tee_date,tee_time,group_id"
+OCCUPANCY_CONFLICT = "club_id,tee_date,tee_time,slot_index,scraped_at"
+
+
+@dataclass(slots=True)
+class DayWrite:
+    """Everything needed to persist one scraped day."""
+
+    tee_date: str
+    day_name: str
+    weekend_id: str | None
+    won_tee_times: list[WonSlot]
+    tee_sheet: TeeSheet
+    sheet_hash: str
+    aliases: list[dict] = field(default_factory=list)
+    skip_writes: bool = False
+
+
+def tee_time_row(weekend_id: str, tee_date: str, won: WonSlot) -> dict:
+    """tee_times row making a lottery-won slot available to its group."""
+    return {
+        "weekend_id": weekend_id,
+        "tee_date": tee_date,
+        "tee_time": won.slot.tee_time.isoformat(),
+        "group_id": won.group_id,
+        "max_players": 4,
+    }
+
+
+def tee_time_rows(weekend_id: str, tee_date: str, won: list[WonSlot]) -> list[dict]:
+    """
+    tee_times rows for the day's won slots, one per TEE_TIME_CONFLICT key: a
+    batch upsert fails if two rows hit the same key (e.g. a time listed for
+    two starting tees).
+    """
+    rows = {}
+    for slot in won:
+        row = tee_time_row(weekend_id, tee_date, slot)
+        key = tuple(row[column] for column in TEE_TIME_CONFLICT.split(","))
+        rows.setdefault(key, row)
+    return list(rows.values())
+
+
+def raw_tee_sheet_row(club_id: str, tee_date: str, tee_sheet: TeeSheet) -> dict:
+    """external_tee_sheets row archiving the scraped sheet for audit."""
+    return {
+        "club_id": club_id,
+        "scraped_date": tee_date,
+        "raw_data": tee_sheet.to_raw(),
+    }
+
+
+def occupancy_rows(
+    club_id: str,
+    tee_date: str,
+    scraped_at: str,
+    tee_sheet: TeeSheet,
+    won_tee_times: list[WonSlot],
+) -> list[dict]:
+    """
+    tee_slot_occupancy rows: one per slot, with the winning group if any.
+    A time listed for several starting tees has one row per listing, told
+    apart by slot_index (its position among the day's rows at that time).
+    """
+    won_by_slot = {id(won.slot): won for won in won_tee_times}
+    listings = {}
+    rows = []
+    for slot in tee_sheet.slots:
+        won = won_by_slot.get(id(slot))
+        slot_index = listings.get(slot.tee_time, 0)
+        listings[slot.tee_time] = slot_index + 1
+        rows.append(
+            {
+                "club_id": club_id,
+                "tee_date": tee_date,
+                "tee_time": slot.tee_time.isoformat(),
+                "slot_index": slot_index,
+                "scraped_at": scraped_at,
+                "filled_spots": len(slot.golfers),
+                "blocked_spots": slot.blocked_spots,
+                "open_spots": slot.open_spots,
+                "group_id": won.group_id if won else None,
+                "user_id": won.won_by_user_id if won else None,
+                "invitation_id": won.invitation_id if won else None,
+            }
+        )
+    return rows
+
+
+class AsyncWriter:
+    """
+    Bounded producer/consumer writer. submit() blocks only while the queue
+    is full; close() drains it and returns the names of days that failed.
+    """
+
+    def __init__(
+        self,
+        client_factory,
+        checkpoints: CheckpointStore,
+        metrics: RunMetrics,
+        club_id: str,
+        concurrency: int = 4,
+        queue_size: int = 4,
+        policy: RetryPolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+    ):
+        self.client_factory = client_factory
+        self.checkpoints = checkpoints
+        self.metrics = metrics
+        self.club_id = club_id
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.policy = policy or RetryPolicy.from_env("db_write")
+        self.breaker = breaker
+        self.failed_days: list[str] = []
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="etl-writer", daemon=True
+        )
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+        self._client = None
+
+    def start(self):
+        """Start the loop thread, create the async client and spawn workers."""
+        self._thread.start()
+        self._call(self._start())
+
+    def submit(self, job: DayWrite):
+        """Queue a day for writing (blocks while the queue is full)."""
+        self._call(self._queue.put(job))
+
+    def close(self) -> list[str]:
+        """Wait for queued writes to finish and stop the loop thread."""
+        if self._thread.is_alive():
+            self._call(self._stop())
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+        self._loop.close()
+        return self.failed_days
+
+    def _call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _start(self):
+        self._client = await self.client_factory()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.concurrency)
+        ]
+
+    async def _stop(self):
+        for _ in self._workers:
+            await self._queue.put(None)
+        await asyncio.gather(*self._workers)
+        postgrest = getattr(self._client, "postgrest", None)
+        aclose = getattr(postgrest, "aclose", None)
+        if aclose is not None and asyncio.iscoroutinefunction(aclose):
+            await aclose()
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            if job is None:
+                return
+            try:
+                await self._write_day(job)
+            except Exception as e:
+                print(f"  Error writing {job.day_name} ({job.tee_date}): {e}")
+                self.metrics.incr("units_failed")
+                self.failed_days.append(job.day_name)
+                try:
+                    await asyncio.to_thread(
+                        self.checkpoints.mark, job.tee_date, FAILED, None, str(e)
+                    )
+                except Exception as mark_error:
+                    print(
+                        f"  Warning: could not checkpoint {job.day_name}: {mark_error}"
+                    )
+
+    async def _write_day(self, job: DayWrite):
+        if job.skip_writes:
+            # Unchanged sheets still add a point to the occupancy time series
+            await self._record_occupancy(job)
+            await asyncio.to_thread(
+                self.checkpoints.mark, job.tee_date, SYNCED, job.sheet_hash
+            )
+            return
+
+        await asyncio.to_thread(
+            self.checkpoints.mark, job.tee_date, SCRAPED, job.sheet_hash
+        )
+        await asyncio.gather(
+            self._write_tee_times(job),
+            self._archive(job),
+            self._record_aliases(job),
+            self._record_occupancy(job),
+        )
+        await asyncio.to_thread(
+            self.checkpoints.mark, job.tee_date, SYNCED, job.sheet_hash
+        )
+
+    async def _write_tee_times(self, job: DayWrite):
+        if not job.won_tee_times:
+            return
+        rows = tee_time_rows(job.weekend_id, job.tee_date, job.won_tee_times)
+        with self.metrics.span("db_write", table="tee_times", day=job.day_name):
+            await self._execute(
+                lambda: self._client.table("tee_times").upsert(
+                    rows, on_conflict=TEE_TIME_CONFLICT
+                )
+            )
+        self.metrics.incr("rows_written", len(rows))
+
+    async def _archive(self, job: DayWrite):
+        row = raw_tee_sheet_row(self.club_id, job.tee_date, job.tee_sheet)
+        with self.metrics.span("archive", day=job.day_name):
+            await self._execute(
+                lambda: self._client.table("external_tee_sheets").insert(row)
+            )
+        self.metrics.incr("sheets_archived")
+
+    async def _record_aliases(self, job: DayWrite):
+        if not job.aliases:
+            return
+        params = {"target_club_id": self.club_id, "observations": job.aliases}
+        with self.metrics.span("db_write", table="golfer_aliases", day=job.day_name):
+            await self._execute(
+                lambda: self._client.rpc("record_golfer_aliases", params)
+            )
+        self.metrics.incr("aliases_recorded", len(job.aliases))
+
+    async def _record_occupancy(self, job: DayWrite):
+        rows = occupancy_rows(
+            self.club_id,
+            job.tee_date,
+            self.metrics.started_at.isoformat(),
+            job.tee_sheet,
+            job.won_tee_times,
+        )
+        if not rows:
+            return
+        with self.metrics.span(
+            "db_write", table="tee_slot_occupancy", day=job.day_name
+        ):
+            await self._execute(
+                lambda: self._client.table("tee_slot_occupancy").upsert(
+                    rows, on_conflict=OCCUPANCY_CONFLICT, ignore_duplicates=True
+                )
+            )
+        self.metrics.incr("occupancy_rows", len(rows))
+
+    async def _execute(self, build_query):
+        """Run a query, retrying transient failures with jittered backoff."""
+        for attempt in range(1, self.policy.attempts + 1):
+            if self.breaker is not None:
+                self.breaker.before_call()
+            try:
+                query = build_query()
+                if asyncio.iscoroutinefunction(query.execute):
+                    result = await query.execute()
+                else:
+                    result = await asyncio.to_thread(query.execute)
+            except Exception as e:
+                # Permanent errors don't count toward opening the breaker
+                if not is_transient(e):
+                    raise
+                if self.breaker is not None:
+                    self.breaker.record_failure()
+                if attempt == self.policy.attempts:
+                    raise
+                self.metrics.incr("retries_db_write")
+                await asyncio.sleep(self.policy.delay(attempt))
+            else:
+                if self.breaker is not None:
+                    self.breaker.record_success()
+                return result
@@ -21,7 +21,7 @@ export default function TeeTimeCard({
     }, 0);
   };
 
-  const totalSpotsUsed = getTotalSpotsUsed();
+  const totalSpotsUsed = teeTime.occupied_spots ?? getTotalSpotsUsed();
   const availability = getAvailabilityStatus(
     totalSpotsUsed,
     teeTime.max_players
@@ -136,7 +136,7 @@ export default function TeeTimeCard({
               })}
             {/* Show empty slots */}
             {Array.from({
-              length: teeTime.max_players - getTotalSpotsUsed(),
+              length: teeTime.max_players - totalSpotsUsed,
             }).map((_, index) => (
               <View key={`empty-${index}`} style={styles.emptySlot}>
                 <Text style={styles.emptySlotText}>Available</Text>
@@ -24,6 +24,7 @@ export const useMyTeeTimes = (userId: string | null) => {
             tee_date,
             tee_time,
             max_players,
+            occupied_spots,
             created_at,
             weekend_id,
             weekends(id, start_date, end_date),
@@ -58,6 +59,7 @@ export const useMyTeeTimes = (userId: string | null) => {
             weekend_id: teeTime.weekend_id,
             group_id: "", // Not needed for user's view
             max_players: teeTime.max_players,
+            occupied_spots: teeTime.occupied_spots,
             created_at: teeTime.created_at,
             players:
               teeTime.assignments?.map((a: any) => {
@@ -15,42 +15,23 @@ export const useStats = (groupId: string | null) => {
 
     setLoading(true);
     try {
-      const [
-        { count: membersCount },
-        { count: pendingCount },
-        { count: teeTimesCount },
-        { count: tradesCount },
-      ] = await Promise.all([
-        // Count members in the selected group
-        supabase
-          .from("memberships")
-          .select("*", { count: "exact", head: true })
-          .eq("group_id", groupId),
-        // Count pending members (unclaimed invitations)
-        supabase
-          .from("invitations")
-          .select("*", { count: "exact", head: true })
-          .eq("group_id", groupId)
-          .eq("invitation_type", "group_member")
-          .is("claimed_by", null),
-        // Count tee times for this group
-        supabase
-          .from("tee_times")
-          .select("*", { count: "exact", head: true })
-          .eq("group_id", groupId),
-        // Count trades involving members of this group
-        supabase
-          .from("trades")
-          .select("*", { count: "exact", head: true })
-          .or(`from_group_id.eq.${groupId},to_group_id.eq.${groupId}`),
-      ]);
+      // Counters are maintained by triggers on group_stats (one row per group)
+      const { data, error } = await supabase
+        .from("group_stats")
+        .select("member_count, pending_invitation_count, tee_time_count, trade_count")
+        .eq("group_id", groupId)
+        .maybeSingle();
 
-      const totalPlayers = (membersCount || 0) + (pendingCount || 0);
+      if (error || !data) return;
 
       setStats([
-        { id: "s1", label: "Players", value: totalPlayers },
-        { id: "s2", label: "Tee Times", value: teeTimesCount || 0 },
-        { id: "s3", label: "Trades", value: tradesCount || 0 },
+        {
+          id: "s1",
+          label: "Players",
+          value: data.member_count + data.pending_invitation_count,
+        },
+        { id: "s2", label: "Tee Times", value: data.tee_time_count },
+        { id: "s3", label: "Trades", value: data.trade_count },
       ]);
     } catch (_e) {
       // Keep defaults if error
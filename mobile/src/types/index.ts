@@ -64,6 +64,7 @@ export type TeeTime = {
   weekend_id: string;
   group_id: string;
   max_players: number;
+  occupied_spots?: number; // Players + guests, maintained by the database
   created_at: string;
   players?: Player[];
   weekends: Weekend;
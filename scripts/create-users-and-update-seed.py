@@ -4,10 +4,12 @@ Script to create users and generate updated seed data
 Run with: python scripts/create-users-and-update-seed.py
 """
 
+import asyncio
 import os
 import sys
+import time
 from pathlib import Path
-from supabase import create_client, Client
+from supabase import acreate_client, AsyncClient
 
 # Try to load from .env file if it exists
 try:
@@ -24,7 +26,9 @@ if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
     print("Please set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY environment variables")
     sys.exit(1)
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+# Auth admin requests in flight at once while creating users
+PROVISION_CONCURRENCY = int(os.getenv("PROVISION_CONCURRENCY", "16"))
+LIST_PAGE_SIZE = 1000
 
 # User data with expected IDs for reference
 test_users = [
@@ -207,44 +211,25 @@ def convert_partners_to_ids(partners_str):
     return partner_ids if partner_ids else None
 
 
-async def verify_users_in_auth_table(created_users):
-    """Verify that all created users exist in the auth.users table"""
-    verified_count = 0
+async def list_existing_users(client: AsyncClient):
+    """Map email -> user ID for every user already in auth.users (paged)."""
+    existing = {}
+    page = 1
+    while True:
+        users = await client.auth.admin.list_users(page=page, per_page=LIST_PAGE_SIZE)
+        for user in users:
+            if user.email:
+                existing[user.email.lower()] = user.id
+        if len(users) < LIST_PAGE_SIZE:
+            return existing
+        page += 1
 
-    for user in created_users:
-        try:
-            # Try to get the user by ID
-            response = supabase.auth.admin.get_user_by_id(user["actual_id"])
-
-            if response and hasattr(response, "user") and response.user:
-                print(f"   ✓ {user['email']} exists in auth.users")
-                verified_count += 1
-            else:
-                print(f"   ❌ {user['email']} NOT found in auth.users")
-
-        except Exception as e:
-            print(f"   ❌ Error verifying {user['email']}: {e}")
-
-    print(
-        f"\n📊 Verification complete: {verified_count}/{len(created_users)} users verified in auth.users"
-    )
 
-    if verified_count == len(created_users):
-        print("✅ All users successfully created in auth.users table!")
-    else:
-        print("⚠️  Some users may not have been created properly in auth.users table")
-
-
-async def create_users_and_generate_seed():
-    print("Creating users in auth.users and generating updated seed data...")
-
-    created_users = []
-
-    for user in test_users:
+async def create_user(client: AsyncClient, semaphore: asyncio.Semaphore, user):
+    """Create one confirmed auth user; returns its ID, or None on failure."""
+    async with semaphore:
         try:
-            print(f"Creating user: {user['email']}...")
-
-            response = supabase.auth.admin.create_user(
+            response = await client.auth.admin.create_user(
                 {
                     "email": user["email"],
                     "password": user["password"],
@@ -252,58 +237,76 @@ async def create_users_and_generate_seed():
                     "user_metadata": {"full_name": user["full_name"]},
                 }
             )
+        except Exception as e:
+            print(f"❌ Error creating {user['email']}: {e}")
+            return None
 
-            if hasattr(response, "user") and response.user:
-                actual_id = response.user.id
-                created_users.append(
-                    {
-                        "email": user["email"],
-                        "full_name": user["full_name"],
-                        "actual_id": actual_id,
-                        "expected_id": user["expected_id"],
-                    }
-                )
-                print(f"✅ Created in auth.users: {user['email']} → {actual_id}")
-
-                # Verify the user was actually created in auth.users
-                try:
-                    verify_response = supabase.auth.admin.get_user_by_id(actual_id)
-                    if (
-                        verify_response
-                        and hasattr(verify_response, "user")
-                        and verify_response.user
-                    ):
-                        print(f"   ✓ Verified in auth.users table")
-                    else:
-                        print(f"   ⚠️  Warning: User not found in auth.users table")
-                except Exception as verify_error:
-                    print(
-                        f"   ⚠️  Warning: Could not verify user in auth.users: {verify_error}"
-                    )
+    if not response.user:
+        print(f"❌ Failed to create: {user['email']}")
+        return None
+    print(f"✅ Created in auth.users: {user['email']} → {response.user.id}")
+    return response.user.id
+
+
+async def provision_users(client: AsyncClient, users):
+    """
+    Make sure every user exists in auth.users, creating the missing ones with
+    at most PROVISION_CONCURRENCY requests in flight. Users that already exist
+    (from an earlier run) are reused, so the script can be re-run safely.
+    """
+    started = time.perf_counter()
+    existing = await list_existing_users(client)
+    missing = [user for user in users if user["email"].lower() not in existing]
+    print(
+        f"Found {len(users) - len(missing)} existing users, "
+        f"creating {len(missing)} (concurrency {PROVISION_CONCURRENCY})..."
+    )
 
-            else:
-                print(f"❌ Failed to create: {user['email']}")
-                if hasattr(response, "error"):
-                    print(f"   Error: {response.error}")
+    semaphore = asyncio.Semaphore(PROVISION_CONCURRENCY)
+    created_ids = await asyncio.gather(
+        *(create_user(client, semaphore, user) for user in missing)
+    )
+    ids = dict(existing)
+    for user, actual_id in zip(missing, created_ids):
+        if actual_id:
+            ids[user["email"].lower()] = actual_id
 
-        except Exception as e:
-            print(f"❌ Error creating {user['email']}: {e}")
+    elapsed = time.perf_counter() - started
+    created = sum(1 for actual_id in created_ids if actual_id)
+    print(
+        f"\n📊 Provisioned {created}/{len(missing)} new users in {elapsed:.2f}s "
+        f"({created / elapsed:.1f} users/s)"
+    )
+
+    return [
+        {
+            "email": user["email"],
+            "full_name": user["full_name"],
+            "actual_id": ids[user["email"].lower()],
+            "expected_id": user["expected_id"],
+        }
+        for user in users
+        if user["email"].lower() in ids
+    ]
+
+
+async def create_users_and_generate_seed():
+    print("Creating users in auth.users and generating updated seed data...")
+
+    client = await acreate_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+    created_users = await provision_users(client, test_users)
 
     if not created_users:
         print("No users were created successfully.")
         return
 
-    print(f"\n📊 Summary: Created {len(created_users)} users in auth.users")
+    print(f"\n📊 Summary: {len(created_users)} users in auth.users")
 
-    # List all created users for verification
-    print("\n🔍 Created users in auth.users:")
+    # List all users for verification
+    print("\n🔍 Users in auth.users:")
     for user in created_users:
         print(f"   - {user['email']} (ID: {user['actual_id']})")
 
-    # Verify all users exist in auth.users table
-    print("\n🔍 Verifying users in auth.users table...")
-    await verify_users_in_auth_table(created_users)
-
     # Generate the complete seed.sql content
     seed_content = generate_seed_content(created_users)
 
@@ -317,7 +320,7 @@ async def create_users_and_generate_seed():
             f.write(seed_content)
         print(f"\n✅ Successfully generated updated seed.sql at: {seed_file_path}")
         print(f"\n📋 Summary:")
-        print(f"   - Created {len(created_users)} users in auth.users")
+        print(f"   - Provisioned {len(created_users)} users in auth.users")
         print(f"   - Generated updated seed.sql with correct user IDs")
         print(f"   - All relationships (memberships, interests, etc.) updated")
         print(f"\n🚀 Next steps:")
@@ -2133,8 +2136,6 @@ SET session_replication_role = DEFAULT;
 
 
 def main():
-    import asyncio
-
     asyncio.run(create_users_and_generate_seed())
 
 
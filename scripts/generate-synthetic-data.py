@@ -0,0 +1,552 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic dataset at production scale as PostgreSQL COPY files
+Run with: python scripts/generate-synthetic-data.py --clubs 20 --groups-per-club 10 \\
+    --members 5000 --weekends 52
+
+Writes one COPY (text format) file per table plus a load.sql that loads them
+in foreign key order, for load-testing the schema, RLS and the solver:
+
+    python scripts/generate-synthetic-data.py --out synthetic-data
+    cd synthetic-data && psql "$SUPABASE_DB_URL" -f load.sql
+
+Rows are streamed weekend by weekend, so memory stays flat as --weekends
+grows. The same --seed and --start-date always produce the same dataset;
+without --start-date the weekends follow today's calendar, so pass the start
+date printed by a run to reproduce it. Profiles are not backed by
+auth.users; use create-users-and-update-seed.py for loginable accounts. Load
+into a database without seed data (weekend dates are unique).
+"""
+
+import argparse
+import datetime
+import json
+import math
+import random
+import time
+import uuid
+from pathlib import Path
+
+FIRST_NAMES = """
+James Mary Robert Patricia John Jennifer Michael Linda David
+Elizabeth William Barbara Richard Susan Joseph Jessica Thomas Sarah
+Charles Karen Daniel Lisa Matthew Nancy Anthony Betty Mark Sandra
+Steven Ashley Paul Emily Andrew Donna Kevin Michelle Brian Carol
+George Amanda Edward Melissa Ronald Deborah
+""".split()
+
+LAST_NAMES = """
+Smith Johnson Williams Brown Jones Garcia Miller Davis Rodriguez
+Martinez Hernandez Lopez Wilson Anderson Thomas Taylor Moore Jackson
+Martin Lee Thompson White Harris Clark Lewis Robinson Walker Young
+Allen King Wright Scott Hill Green Adams Baker Nelson Carter Mitchell
+Roberts Turner Phillips
+""".split()
+
+TIME_PREFERENCES = ["morning", "mid-morning", "afternoon", "late-afternoon"]
+TRADE_STATUSES = ["pending", "accepted", "rejected"]
+BLOCKED = "* BLOCKED *"
+
+# Course tee sheet: first tee time, interval and slots per day
+FIRST_TEE = datetime.time(7, 0)
+TEE_INTERVAL_MINUTES = 9
+SLOTS_PER_DAY = 48
+MAX_PLAYERS = 4
+
+# Tables in load order, with their COPY columns
+TABLES = {
+    "clubs": ["id", "name", "website_url", "scraper_type"],
+    "groups": ["id", "name", "club_id"],
+    "profiles": ["id", "full_name", "email"],
+    "memberships": ["id", "user_id", "group_id", "role", "is_primary"],
+    "club_admins": ["id", "user_id", "club_id"],
+    "invitations": [
+        "id",
+        "code",
+        "invitation_type",
+        "group_id",
+        "target_role",
+        "invited_email",
+        "display_name",
+        "created_by",
+        "expires_at",
+    ],
+    "weekends": ["id", "start_date", "end_date"],
+    "tee_times": [
+        "id",
+        "weekend_id",
+        "tee_date",
+        "tee_time",
+        "group_id",
+        "max_players",
+    ],
+    "interests": [
+        "id",
+        "user_id",
+        "interest_date",
+        "wants_to_play",
+        "time_preference",
+        "transportation",
+        "partners",
+        "guest_count",
+        "notes",
+    ],
+    "assignments": [
+        "id",
+        "weekend_id",
+        "user_id",
+        "tee_time_id",
+        "guest_names",
+    ],
+    "trades": [
+        "id",
+        "weekend_id",
+        "from_group_id",
+        "to_group_id",
+        "from_tee_time_id",
+        "to_tee_time_id",
+        "initiated_by",
+        "status",
+    ],
+    "external_tee_sheets": ["id", "club_id", "scraped_date", "scraped_at", "raw_data"],
+}
+
+
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def copy_value(value) -> str:
+    """Format a value for COPY text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (dict, list)) and not isinstance(value, TextArray):
+        text = json.dumps(value, separators=(",", ":"))
+    else:
+        text = str(value)
+    # Most values (ids, dates, names) need no escaping
+    if "\\" in text or not text.isprintable():
+        text = text.translate(COPY_ESCAPES)
+    return text
+
+
+class TextArray(list):
+    """A text[] value (as opposed to a jsonb array)."""
+
+    def __str__(self):
+        quoted = (
+            '"' + item.replace("\\", "\\\\").replace('"', '\\"') + '"' for item in self
+        )
+        return "{" + ",".join(quoted) + "}"
+
+
+class CopyWriter:
+    """Streams rows for one table into <out>/<table>.copy."""
+
+    def __init__(self, out_dir: Path, table: str):
+        self.table = table
+        self.columns = TABLES[table]
+        self.path = out_dir / f"{table}.copy"
+        self.file = open(self.path, "w", encoding="utf-8")
+        self.rows = 0
+
+    def write(self, *values):
+        self.file.write("\t".join(copy_value(v) for v in values) + "\n")
+        self.rows += 1
+
+    def close(self):
+        self.file.close()
+
+
+def new_id(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def tee_label(tee_time: datetime.time) -> str:
+    """Tee sheet label as shown on the club site, e.g. '7:30 am'."""
+    hour = tee_time.hour % 12 or 12
+    period = "am" if tee_time.hour < 12 else "pm"
+    return f"{hour}:{tee_time.minute:02d} {period}"
+
+
+def course_times() -> list[datetime.time]:
+    start = datetime.datetime.combine(datetime.date.today(), FIRST_TEE)
+    return [
+        (start + datetime.timedelta(minutes=i * TEE_INTERVAL_MINUTES)).time()
+        for i in range(SLOTS_PER_DAY)
+    ]
+
+
+def upcoming_saturday() -> datetime.date:
+    today = datetime.date.today()
+    return today + datetime.timedelta(days=(5 - today.weekday()) % 7)
+
+
+class Generator:
+    def __init__(self, args, out_dir: Path):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.writers = {table: CopyWriter(out_dir, table) for table in TABLES}
+        self.times = course_times()
+        self.clubs: list[dict] = []
+
+    def write(self, table: str, *values):
+        self.writers[table].write(*values)
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
+
+    def random_name(self) -> str:
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    # Clubs, groups and members
+
+    def generate_clubs(self):
+        rng = self.rng
+        total_groups = self.args.clubs * self.args.groups_per_club
+
+        for c in range(1, self.args.clubs + 1):
+            club = {"id": new_id(rng), "groups": []}
+            self.write(
+                "clubs",
+                club["id"],
+                f"Synthetic Golf Club {c}",
+                f"https://club{c}.example.com",
+                "1757",
+            )
+            for g in range(1, self.args.groups_per_club + 1):
+                group = {"id": new_id(rng), "members": []}
+                self.write("groups", group["id"], f"Club {c} Group {g}", club["id"])
+                club["groups"].append(group)
+            self.clubs.append(club)
+
+        # Spread members over groups, with the remainder going to the first ones
+        groups = [group for club in self.clubs for group in club["groups"]]
+        for index in range(self.args.members):
+            group = groups[index % total_groups]
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            member = {
+                "id": new_id(rng),
+                "name": f"{first} {last}",
+                "group": group,
+            }
+            self.write(
+                "profiles",
+                member["id"],
+                member["name"],
+                f"{first.lower()}.{last.lower()}{index + 1}@example.com",
+            )
+            group["members"].append(member)
+
+        for club in self.clubs:
+            for group in club["groups"]:
+                for position, member in enumerate(group["members"]):
+                    if position < 2:
+                        role = "admin"
+                    elif rng.random() < 0.05:
+                        role = "guest"
+                    else:
+                        role = "member"
+                    self.write(
+                        "memberships",
+                        new_id(rng),
+                        member["id"],
+                        group["id"],
+                        role,
+                        True,
+                    )
+
+                    # Some members also play with a second group at their club
+                    if len(club["groups"]) > 1 and rng.random() < 0.1:
+                        other = rng.choice(
+                            [g for g in club["groups"] if g is not group]
+                        )
+                        self.write(
+                            "memberships",
+                            new_id(rng),
+                            member["id"],
+                            other["id"],
+                            "member",
+                            False,
+                        )
+
+                if group["members"]:
+                    admin = group["members"][0]
+                    for _ in range(2):
+                        display_name = self.random_name()
+                        self.write(
+                            "invitations",
+                            new_id(rng),
+                            "".join(
+                                rng.choices("ABCDEFGHJKLMNPQRSTUVWXYZ23456789", k=10)
+                            ),
+                            "group_member",
+                            group["id"],
+                            "member",
+                            f"{display_name.replace(' ', '.').lower()}@example.com",
+                            display_name,
+                            admin["id"],
+                            "2099-12-31T00:00:00+00:00",
+                        )
+
+            first_member = next(
+                (g["members"][0] for g in club["groups"] if g["members"]), None
+            )
+            if first_member is not None:
+                self.write("club_admins", new_id(rng), first_member["id"], club["id"])
+
+    # Weekends
+
+    def generate_weekends(self):
+        last = self.args.start_date + datetime.timedelta(weeks=self.args.weekends - 1)
+        open_from = last - datetime.timedelta(weeks=self.args.open_weekends - 1)
+
+        for week in range(self.args.weekends):
+            saturday = self.args.start_date + datetime.timedelta(weeks=week)
+            weekend_id = new_id(self.rng)
+            self.write(
+                "weekends", weekend_id, saturday, saturday + datetime.timedelta(days=1)
+            )
+            for day in (saturday, saturday + datetime.timedelta(days=1)):
+                for club in self.clubs:
+                    self.generate_club_day(
+                        club, weekend_id, day, assigned=saturday < open_from
+                    )
+
+    def generate_club_day(
+        self, club: dict, weekend_id: str, day: datetime.date, assigned: bool
+    ):
+        """Interests, tee times, assignments, trades and tee sheet for a club day."""
+        rng = self.rng
+        free_slots = list(range(len(self.times)))
+        rng.shuffle(free_slots)
+        sheet: dict[int, list[str]] = {}
+        group_tee_times = []
+
+        for group in club["groups"]:
+            players = self.generate_interests(group, day)
+            spots = sum(1 + p["guests"] for p in players)
+            wanted = min(math.ceil(spots / MAX_PLAYERS), len(free_slots))
+
+            tee_times = []
+            for _ in range(wanted):
+                slot = free_slots.pop()
+                tee_time = {
+                    "id": new_id(rng),
+                    "slot": slot,
+                    "open": MAX_PLAYERS,
+                    "names": [],
+                }
+                self.write(
+                    "tee_times",
+                    tee_time["id"],
+                    weekend_id,
+                    day,
+                    self.times[slot],
+                    group["id"],
+                    MAX_PLAYERS,
+                )
+                tee_times.append(tee_time)
+            group_tee_times.append((group, tee_times))
+
+            if assigned:
+                self.assign(weekend_id, players, tee_times)
+
+            # The lottery winner's name appears on the club's sheet
+            for tee_time in tee_times:
+                names = tee_time["names"] or [rng.choice(players)["name"]]
+                sheet[tee_time["slot"]] = names
+
+        self.generate_trades(weekend_id, group_tee_times)
+        self.write_tee_sheet(club, day, sheet)
+
+    def generate_interests(self, group: dict, day: datetime.date) -> list[dict]:
+        """Write the group's interests for a day; returns those who want to play."""
+        rng = self.rng
+        players = []
+        for member in group["members"]:
+            if rng.random() >= self.args.interest_rate:
+                continue
+            wants_to_play = rng.random() < 0.85
+            guests = (
+                rng.choices([0, 1, 2], weights=[80, 15, 5])[0] if wants_to_play else 0
+            )
+            partners = None
+            if len(group["members"]) > 1 and rng.random() < 0.3:
+                others = [m for m in group["members"] if m is not member]
+                partners = [
+                    m["id"]
+                    for m in rng.sample(others, min(len(others), rng.randint(1, 2)))
+                ]
+            self.write(
+                "interests",
+                new_id(rng),
+                member["id"],
+                day,
+                wants_to_play,
+                rng.choice(TIME_PREFERENCES),
+                rng.choice(["walking", "riding"]),
+                partners,
+                guests,
+                None,
+            )
+            if wants_to_play:
+                players.append(
+                    {"id": member["id"], "name": member["name"], "guests": guests}
+                )
+        return players
+
+    def assign(self, weekend_id: str, players: list[dict], tee_times: list[dict]):
+        """First-fit players (with their guests) into the group's tee times."""
+        self.rng.shuffle(players)
+        for player in players:
+            needed = 1 + player["guests"]
+            tee_time = next((t for t in tee_times if t["open"] >= needed), None)
+            if tee_time is None:
+                continue
+            guest_names = TextArray(
+                f"{player['name']} Guest {n}" for n in range(1, player["guests"] + 1)
+            )
+            self.write(
+                "assignments",
+                new_id(self.rng),
+                weekend_id,
+                player["id"],
+                tee_time["id"],
+                guest_names or None,
+            )
+            tee_time["open"] -= needed
+            tee_time["names"].append(player["name"])
+            tee_time["names"].extend(guest_names)
+
+    def generate_trades(self, weekend_id: str, group_tee_times: list[tuple]):
+        rng = self.rng
+        with_tee_times = [(g, t) for g, t in group_tee_times if t]
+        for _ in range(len(with_tee_times) // 4):
+            (from_group, from_times), (to_group, to_times) = rng.sample(
+                with_tee_times, 2
+            )
+            initiated_by = from_group["members"][0]["id"]
+            self.write(
+                "trades",
+                new_id(rng),
+                weekend_id,
+                from_group["id"],
+                to_group["id"],
+                rng.choice(from_times)["id"],
+                rng.choice(to_times)["id"],
+                initiated_by,
+                rng.choices(TRADE_STATUSES, weights=[30, 50, 20])[0],
+            )
+
+    def write_tee_sheet(
+        self, club: dict, day: datetime.date, sheet: dict[int, list[str]]
+    ):
+        """The club's scraped tee sheet: member groups plus the public around them."""
+        rng = self.rng
+        rows = []
+        for slot, tee_time in enumerate(self.times):
+            if slot in sheet:
+                cells = sheet[slot][:MAX_PLAYERS]
+            elif rng.random() < 0.05:
+                cells = [BLOCKED] * MAX_PLAYERS
+            else:
+                cells = [self.random_name() for _ in range(rng.randint(0, MAX_PLAYERS))]
+            cells += [""] * (MAX_PLAYERS - len(cells))
+            rows.append({"tee_time": tee_label(tee_time), "golfers": cells})
+
+        scraped_at = datetime.datetime.combine(
+            day - datetime.timedelta(days=day.weekday()),
+            datetime.time(6, 0),
+            tzinfo=datetime.timezone.utc,
+        )
+        self.write(
+            "external_tee_sheets",
+            new_id(rng),
+            club["id"],
+            day,
+            scraped_at.isoformat(),
+            rows,
+        )
+
+
+def write_load_script(out_dir: Path, writers: dict[str, CopyWriter]):
+    lines = [
+        "-- Load the synthetic dataset (run from this directory):",
+        '--   psql "$SUPABASE_DB_URL" -f load.sql',
+        "\\set ON_ERROR_STOP on",
+        "begin;",
+    ]
+    for table, writer in writers.items():
+        lines.append(
+            f"\\copy {table} ({', '.join(writer.columns)}) from '{writer.path.name}'"
+        )
+    lines += ["commit;", f"analyze {', '.join(writers)};", ""]
+    (out_dir / "load.sql").write_text("\n".join(lines))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic GroupTee dataset as COPY files."
+    )
+    parser.add_argument("--clubs", type=int, default=20)
+    parser.add_argument("--groups-per-club", type=int, default=10)
+    parser.add_argument("--members", type=int, default=5000)
+    parser.add_argument("--weekends", type=int, default=52)
+    parser.add_argument(
+        "--open-weekends",
+        type=int,
+        default=1,
+        help="Trailing weekends left unassigned (interests and tee times only)",
+    )
+    parser.add_argument(
+        "--interest-rate",
+        type=float,
+        default=0.55,
+        help="Chance a member submits interest for a given day",
+    )
+    parser.add_argument(
+        "--start-date",
+        type=datetime.date.fromisoformat,
+        help="First Saturday (default: weekends end with the upcoming one). "
+        "Set it along with --seed for a reproducible dataset",
+    )
+    parser.add_argument("--seed", type=int, default=1757)
+    parser.add_argument("--out", default="synthetic-data")
+    args = parser.parse_args()
+
+    if args.start_date is None:
+        args.start_date = upcoming_saturday() - datetime.timedelta(
+            weeks=args.weekends - 1
+        )
+    elif args.start_date.weekday() != 5:
+        parser.error("--start-date must be a Saturday")
+
+    print(f"Seed {args.seed}, start date {args.start_date.isoformat()}")
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    start = time.perf_counter()
+    generator = Generator(args, out_dir)
+    try:
+        generator.generate_clubs()
+        generator.generate_weekends()
+    finally:
+        generator.close()
+    write_load_script(out_dir, generator.writers)
+    elapsed = time.perf_counter() - start
+
+    total = sum(w.rows for w in generator.writers.values())
+    print(
+        f"Generated {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s):"
+    )
+    for table, writer in generator.writers.items():
+        print(f"   - {table}: {writer.rows:,}")
+    print(f'\nLoad with: cd {out_dir} && psql "$SUPABASE_DB_URL" -f load.sql')
+
+
+if __name__ == "__main__":
+    main()
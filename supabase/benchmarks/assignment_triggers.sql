@@ -0,0 +1,125 @@
+-- Benchmark: row-level vs statement-level assignment triggers
+--
+-- Applies weekend plans (one multi-row insert into assignments) under the
+-- original row-level triggers and the current statement-level ones
+-- (notifications from 20260207000000_statement_level_assignment_triggers.sql,
+-- capacity from 20260208000000_tee_time_occupied_spots.sql), and reports the
+-- mean time per plan. Everything runs in one transaction that is rolled back.
+--
+--   psql "$SUPABASE_DB_URL" -f supabase/benchmarks/assignment_triggers.sql
+
+begin;
+
+create function pg_temp.use_assignment_triggers(level text) returns void as $$
+begin
+  drop trigger if exists on_assignment_change on assignments;
+  drop trigger if exists validate_assignment_capacity on assignments;
+  drop trigger if exists on_assignments_added on assignments;
+  drop trigger if exists on_assignments_removed on assignments;
+  drop trigger if exists occupied_spots_on_insert on assignments;
+  drop trigger if exists occupied_spots_on_delete on assignments;
+
+  if level = 'row' then
+    create trigger on_assignment_change after insert or delete on assignments
+      for each row execute procedure notify_assignment_change();
+    create trigger validate_assignment_capacity before insert on assignments
+      for each row execute procedure validate_assignment_capacity();
+  else
+    create trigger occupied_spots_on_insert after insert on assignments
+      referencing new table as new_assignments
+      for each statement execute procedure occupied_spots_on_insert();
+    create trigger occupied_spots_on_delete after delete on assignments
+      referencing old table as old_assignments
+      for each statement execute procedure occupied_spots_on_delete();
+    create trigger on_assignments_added after insert on assignments
+      referencing new table as new_assignments
+      for each statement execute procedure notify_assignments_added();
+    create trigger on_assignments_removed after delete on assignments
+      referencing old table as old_assignments
+      for each statement execute procedure notify_assignments_removed();
+  end if;
+end;
+$$ language plpgsql;
+
+create temp table bench_players as
+  select gen_random_uuid() as id, n from generate_series(1, 240) n;
+
+create temp table bench_tee_times (id uuid, n integer);
+
+create temp table bench_results (
+  tee_times integer,
+  players_per_tee_time integer,
+  level text,
+  mean_ms numeric
+);
+
+insert into profiles (id, full_name)
+  select id, 'Benchmark Player ' || n from bench_players;
+
+do $$
+declare
+  runs constant integer := 5;
+  wk uuid;
+  scenario record;
+  level text;
+  started timestamptz;
+  total_ms numeric;
+begin
+  insert into weekends (start_date, end_date)
+  values ('2099-01-03', '2099-01-04')
+  returning id into wk;
+
+  -- (tee times, players per tee time): a typical 60-player weekend spread
+  -- over 15 tee times, and the same plan packed into fewer, larger ones
+  for scenario in
+    select * from (values (15, 4), (4, 15), (1, 60), (4, 60)) s(tee_times, per_tee_time)
+  loop
+    delete from tee_times where weekend_id = wk;
+    delete from bench_tee_times;
+    with created as (
+      insert into tee_times (weekend_id, tee_date, tee_time, max_players)
+      select wk, '2099-01-03', time '07:00' + n * interval '9 minutes', scenario.per_tee_time
+      from generate_series(1, scenario.tee_times) n
+      returning id, tee_time
+    )
+    insert into bench_tee_times
+      select id, row_number() over (order by tee_time) from created;
+
+    foreach level in array array['row', 'statement'] loop
+      perform pg_temp.use_assignment_triggers(level);
+      total_ms := 0;
+
+      for run in 1..runs loop
+        started := clock_timestamp();
+        insert into assignments (weekend_id, user_id, tee_time_id)
+        select wk, p.id, t.id
+        from bench_players p
+        join bench_tee_times t on t.n = (p.n - 1) / scenario.per_tee_time + 1
+        where p.n <= scenario.tee_times * scenario.per_tee_time;
+        total_ms := total_ms
+          + extract(epoch from clock_timestamp() - started) * 1000;
+
+        delete from assignments where weekend_id = wk;
+        delete from notifications where user_id in (select id from bench_players);
+      end loop;
+
+      insert into bench_results
+      values (scenario.tee_times, scenario.per_tee_time, level, round(total_ms / runs, 2));
+    end loop;
+  end loop;
+end;
+$$;
+
+select
+  r.tee_times,
+  r.players_per_tee_time,
+  r.tee_times * r.players_per_tee_time as players,
+  r.mean_ms as row_level_ms,
+  s.mean_ms as statement_level_ms,
+  round(r.mean_ms / nullif(s.mean_ms, 0), 1) as speedup
+from bench_results r
+join bench_results s using (tee_times, players_per_tee_time)
+where r.level = 'row' and s.level = 'statement'
+order by players, r.tee_times desc;
+
+rollback;
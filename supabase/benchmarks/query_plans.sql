@@ -0,0 +1,205 @@
+-- Plan regression check for the app's hot queries
+--
+-- Loads a synthetic dataset (in a transaction that is rolled back), runs
+-- EXPLAIN (ANALYZE) on the queries the app and its RLS helpers issue, and
+-- fails if any of them sequentially scans one of the large tables. Run it
+-- against a local database after changing indexes or queries:
+--
+--   psql "$SUPABASE_DB_URL" -f supabase/benchmarks/query_plans.sql
+--   psql "$SUPABASE_DB_URL" -v users=50000 -v weekends=52 -f supabase/benchmarks/query_plans.sql
+--
+-- Exits non-zero (ON_ERROR_STOP) when a plan regresses.
+
+\set ON_ERROR_STOP on
+
+\if :{?groups}
+\else
+  \set groups 1000
+\endif
+\if :{?users}
+\else
+  \set users 20000
+\endif
+\if :{?weekends}
+\else
+  \set weekends 26
+\endif
+
+begin;
+
+select setseed(0.42);
+
+-- Synthetic club data: users are spread round-robin over groups, every group
+-- has a tee time on each weekend day with four players. Time-ordered tables
+-- are inserted in time order, as they are in production.
+create temp table pc_clubs as
+  select gen_random_uuid() as id, n from generate_series(1, 10) n;
+insert into clubs (id, name) select id, 'Plan Club ' || n from pc_clubs;
+
+create temp table pc_groups as
+  select gen_random_uuid() as id, n from generate_series(1, :groups) n;
+insert into groups (id, name, club_id)
+  select g.id, 'Plan Group ' || g.n, c.id
+  from pc_groups g join pc_clubs c on c.n = (g.n - 1) % 10 + 1;
+
+create temp table pc_users as
+  select gen_random_uuid() as id, n, (n - 1) % :groups + 1 as group_n
+  from generate_series(1, :users) n;
+insert into profiles (id, full_name, email)
+  select id, 'Plan User ' || n, 'plan' || n || '@example.com' from pc_users;
+insert into memberships (user_id, group_id, role, is_primary)
+  select u.id, g.id, case when u.n % 20 = 0 then 'admin' else 'member' end, true
+  from pc_users u join pc_groups g on g.n = u.group_n;
+
+create temp table pc_weekends as
+  select gen_random_uuid() as id, n, date '2090-01-07' + (n - 1) * 7 as start_date
+  from generate_series(1, :weekends) n;
+insert into weekends (id, start_date, end_date)
+  select id, start_date, start_date + 1 from pc_weekends;
+
+create temp table pc_tee_times as
+  select
+    gen_random_uuid() as id,
+    w.id as weekend_id,
+    w.start_date + d as tee_date,
+    time '07:00' + (g.n % 60) * interval '9 minutes' as tee_time,
+    g.id as group_id,
+    g.n as group_n,
+    (w.n - 1) * 2 + d as slot_index
+  from pc_weekends w
+  cross join generate_series(0, 1) d
+  cross join pc_groups g;
+insert into tee_times (id, weekend_id, tee_date, tee_time, group_id)
+  select id, weekend_id, tee_date, tee_time, group_id from pc_tee_times;
+
+insert into assignments (weekend_id, user_id, tee_time_id)
+  select t.weekend_id, u.id, t.id
+  from pc_tee_times t
+  cross join generate_series(0, 3) j
+  join pc_users u
+    on u.n = t.group_n + ((t.slot_index * 4 + j) % (:users / :groups)) * :groups;
+
+insert into interests (user_id, interest_date, wants_to_play, guest_count)
+  select u.id, w.start_date, random() < 0.7, (random() * 2)::int
+  from pc_weekends w cross join pc_users u
+  where random() < 0.5;
+
+insert into trades (weekend_id, from_group_id, to_group_id, status)
+  select w.id, g1.id, g2.id, 'pending'
+  from generate_series(1, :groups * 10) n
+  join pc_weekends w on w.n = n % :weekends + 1
+  join pc_groups g1 on g1.n = n % :groups + 1
+  join pc_groups g2 on g2.n = (n * 7) % :groups + 1;
+
+insert into notifications (user_id, message, read, created_at)
+  select u.id, 'Plan notification ' || k, random() < 0.8,
+    now() - (k || ' hours')::interval
+  from pc_users u cross join generate_series(1, 10) k;
+
+insert into invitations (
+  code, invitation_type, group_id, invited_email, display_name,
+  created_by, claimed_by, expires_at
+)
+  select
+    'PC' || lpad(n::text, 8, '0'),
+    'group_member',
+    g.id,
+    'invitee' || n || '@example.com',
+    'Invitee ' || n,
+    u.id,
+    case when n % 2 = 0 then u.id end,
+    now() + interval '7 days'
+  from generate_series(1, :users / 5) n
+  join pc_groups g on g.n = n % :groups + 1
+  join pc_users u on u.n = n;
+
+analyze clubs, groups, profiles, memberships, weekends, tee_times, assignments,
+  interests, trades, notifications, invitations;
+
+-- The queries to check, with parameters taken from the synthetic data
+create temp table plan_checks (name text, query text);
+insert into plan_checks
+select q.name, q.query
+from (
+  select
+    (select id from pc_groups where n = 1) as group_id,
+    (select id from pc_users where n = 1) as user_id,
+    (select id from pc_weekends where n = 1) as weekend_id,
+    (select start_date from pc_weekends where n = 1) as weekend_start,
+    (select id from pc_tee_times where slot_index = 0 and group_n = 1) as tee_time_id
+) s,
+lateral (values
+  ('group members',
+    format('select user_id from memberships where group_id = %L', s.group_id)),
+  ('user memberships',
+    format('select role from memberships where user_id = %L', s.user_id)),
+  ('is_group_admin',
+    format('select 1 from memberships where user_id = %L and group_id = %L and role = ''admin''',
+      s.user_id, s.group_id)),
+  ('group tee sheet',
+    format('select * from tee_times where group_id = %L order by tee_date, tee_time', s.group_id)),
+  ('weekend tee times',
+    format('select * from tee_times where weekend_id = %L', s.weekend_id)),
+  ('tee time players',
+    format('select * from assignments where tee_time_id = %L', s.tee_time_id)),
+  ('my tee times',
+    format('select t.* from assignments a join tee_times t on t.id = a.tee_time_id '
+      'where a.user_id = %L order by t.tee_date, t.tee_time', s.user_id)),
+  ('interests for date',
+    format('select * from interests where interest_date = %L', s.weekend_start)),
+  ('my interests',
+    format('select * from interests where user_id = %L and interest_date between %L and %L',
+      s.user_id, s.weekend_start, s.weekend_start + 1)),
+  ('group trades',
+    format('select count(*) from trades where from_group_id = %L or to_group_id = %L',
+      s.group_id, s.group_id)),
+  ('notification feed',
+    format('select * from notifications where user_id = %L order by created_at desc', s.user_id)),
+  ('unread notifications',
+    format('select count(*) from notifications where user_id = %L and read = false', s.user_id)),
+  ('invitation auto-claim',
+    format('select * from invitations where lower(invited_email) = lower(%L) '
+      'and claimed_by is null and invitation_type = ''group_member''', 'Invitee1@example.com')),
+  ('pending group invitations',
+    format('select count(*) from invitations where group_id = %L '
+      'and invitation_type = ''group_member'' and claimed_by is null', s.group_id))
+) q(name, query);
+
+do $$
+declare
+  watched constant text[] := array[
+    'memberships', 'tee_times', 'assignments', 'interests',
+    'trades', 'notifications', 'invitations'
+  ];
+  check_row record;
+  plan jsonb;
+  seq_scans text[];
+  failures text[] := '{}';
+begin
+  for check_row in select * from plan_checks loop
+    execute 'explain (analyze, format json) ' || check_row.query into plan;
+
+    select array_agg(distinct relation #>> '{}') into seq_scans
+    from jsonb_path_query(
+      plan, 'lax $.** ? (@."Node Type" == "Seq Scan")."Relation Name"'
+    ) as relation
+    where relation #>> '{}' = any(watched);
+
+    raise notice '% % (% ms, top node: %)',
+      case when seq_scans is null then 'ok  ' else 'FAIL' end,
+      rpad(check_row.name, 26),
+      plan->0->>'Execution Time',
+      plan->0->'Plan'->>'Node Type';
+
+    if seq_scans is not null then
+      failures := failures || format('%s: seq scan on %s', check_row.name, array_to_string(seq_scans, ', '));
+    end if;
+  end loop;
+
+  if array_length(failures, 1) > 0 then
+    raise exception 'Plan regressions:%', E'\n  ' || array_to_string(failures, E'\n  ');
+  end if;
+end;
+$$;
+
+rollback;
@@ -0,0 +1,87 @@
+-- One weekend row per (start_date, end_date).
+-- The ETL previously did select-then-insert, which could race between
+-- overlapping runs and create duplicate weekends. With this constraint it
+-- bulk-upserts weekends with `on conflict do nothing`.
+
+-- Fold duplicate weekends into the oldest row before adding the constraint
+create temporary table weekend_duplicates as
+select id, keep_id
+from (
+  select id,
+    first_value(id) over (
+      partition by start_date, end_date order by created_at, id
+    ) as keep_id
+  from weekends
+) ranked
+where id <> keep_id;
+
+-- Every tee time of an affected weekend maps to the tee time that survives
+-- for its slot: the kept weekend's own, or else the oldest duplicate's.
+create temporary table tee_time_survivors as
+select id, survivor_id, weekend_id, keep_id
+from (
+  select tt.id, tt.weekend_id, k.keep_id,
+    first_value(tt.id) over (
+      partition by k.keep_id, tt.tee_date, tt.tee_time, tt.group_id
+      order by (tt.weekend_id = k.keep_id) desc, tt.created_at, tt.id
+    ) as survivor_id
+  from tee_times tt
+  join (
+    select id, keep_id from weekend_duplicates
+    union
+    select keep_id, keep_id from weekend_duplicates
+  ) k on k.id = tt.weekend_id
+) ranked;
+
+update assignments a
+set tee_time_id = s.survivor_id
+from tee_time_survivors s
+where a.tee_time_id = s.id and s.id <> s.survivor_id;
+
+update trades t
+set from_tee_time_id = s.survivor_id
+from tee_time_survivors s
+where t.from_tee_time_id = s.id and s.id <> s.survivor_id;
+
+update trades t
+set to_tee_time_id = s.survivor_id
+from tee_time_survivors s
+where t.to_tee_time_id = s.id and s.id <> s.survivor_id;
+
+-- A player assigned to the same slot on two duplicates keeps one assignment
+delete from assignments a
+using assignments older
+where a.tee_time_id = older.tee_time_id
+  and a.user_id = older.user_id
+  and (older.created_at, older.id) < (a.created_at, a.id)
+  and a.tee_time_id in (select survivor_id from tee_time_survivors);
+
+delete from tee_times tt
+using tee_time_survivors s
+where tt.id = s.id and s.id <> s.survivor_id;
+
+-- One surviving row per slot, so moving them cannot collide
+update tee_times tt
+set weekend_id = s.keep_id
+from tee_time_survivors s
+where tt.id = s.id and s.weekend_id <> s.keep_id;
+
+update assignments a
+set weekend_id = d.keep_id
+from weekend_duplicates d
+where a.weekend_id = d.id;
+
+update trades t
+set weekend_id = d.keep_id
+from weekend_duplicates d
+where t.weekend_id = d.id;
+
+delete from weekends w
+using weekend_duplicates d
+where w.id = d.id;
+
+drop table tee_time_survivors;
+drop table weekend_duplicates;
+
+alter table weekends
+  add constraint weekends_start_date_end_date_key unique (start_date, end_date);
@@ -0,0 +1,30 @@
+-- Ledger of ETL runs: one summary row per run with phase timings and row counts,
+-- used to track scrape latency per club and spot regressions when a club site changes
+create table etl_runs (
+  id uuid primary key default gen_random_uuid(),
+  club_id uuid references clubs(id) on delete cascade,
+  started_at timestamptz not null,
+  finished_at timestamptz,
+  status text not null check (status in ('success', 'failed')),
+  error text,
+  duration_ms integer,
+  rows_scraped integer default 0,
+  rows_matched integer default 0,
+  rows_written integer default 0,
+  -- {phase: {count, total_ms, max_ms, errors}}
+  phase_durations jsonb not null default '{}'::jsonb,
+  counters jsonb not null default '{}'::jsonb,
+  created_at timestamptz default now()
+);
+
+create index idx_etl_runs_club_started on etl_runs(club_id, started_at desc);
+
+alter table etl_runs enable row level security;
+
+create policy "admin read" on etl_runs for select to authenticated using (
+  is_sysadmin() or is_club_admin(club_id)
+);
+create policy "service role insert" on etl_runs for insert to service_role with check (true);
+
+grant select on public.etl_runs to authenticated;
+grant select, insert on public.etl_runs to service_role;
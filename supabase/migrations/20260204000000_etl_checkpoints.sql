@@ -0,0 +1,23 @@
+-- Per-(club, date) checkpoints for the ETL so a rerun only redoes days that
+-- failed or never finished syncing
+create table etl_checkpoints (
+  id uuid primary key default gen_random_uuid(),
+  club_id uuid references clubs(id) on delete cascade not null,
+  scraped_date date not null,
+  status text not null check (status in ('scraped', 'synced', 'failed')),
+  content_hash text,
+  run_id uuid,
+  attempts integer not null default 0,
+  error text,
+  updated_at timestamptz default now(),
+  unique (club_id, scraped_date)
+);
+
+alter table etl_checkpoints enable row level security;
+
+create policy "admin read" on etl_checkpoints for select to authenticated using (
+  is_sysadmin() or is_club_admin(club_id)
+);
+
+grant select on public.etl_checkpoints to authenticated;
+grant select, insert, update on public.etl_checkpoints to service_role;
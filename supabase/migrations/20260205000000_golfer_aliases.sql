@@ -0,0 +1,99 @@
+-- Golfer aliases: raw tee sheet names (normalized) resolved to a member or
+-- pending invitation, per club. The ETL records what it sees each run and
+-- seeds its matcher from this table; admins confirm or correct mappings.
+--
+-- status:
+--   auto       learned by the ETL from an exact name match
+--   unresolved seen on a sheet but not matched to anyone
+--   confirmed  mapping set by an admin (never overwritten by the ETL)
+--   rejected   admin says this name is not a member (never matched)
+create table golfer_aliases (
+  id uuid primary key default gen_random_uuid(),
+  club_id uuid references clubs(id) on delete cascade not null,
+  raw_name text not null,
+  display_name text,
+  user_id uuid references profiles(id) on delete cascade,
+  invitation_id uuid references invitations(id) on delete cascade,
+  status text not null default 'unresolved'
+    check (status in ('auto', 'unresolved', 'confirmed', 'rejected')),
+  seen_count integer not null default 1,
+  first_seen_at timestamptz default now(),
+  last_seen_at timestamptz default now(),
+  confirmed_by uuid references profiles(id) on delete set null,
+  confirmed_at timestamptz,
+  unique (club_id, raw_name)
+);
+
+create index idx_golfer_aliases_unresolved on golfer_aliases(club_id, last_seen_at desc)
+  where status = 'unresolved';
+
+alter table golfer_aliases enable row level security;
+
+create policy "club admin read" on golfer_aliases for select to authenticated using (
+  is_sysadmin() or is_club_admin(club_id)
+);
+
+grant select on public.golfer_aliases to authenticated;
+grant select, insert, update on public.golfer_aliases to service_role;
+
+-- Record one ETL run's observations in one statement.
+-- observations: [{raw_name, display_name, user_id, invitation_id}, ...]
+-- Admin-confirmed and rejected rows keep their mapping; others follow the latest run.
+create function record_golfer_aliases(target_club_id uuid, observations jsonb) returns void as $$
+  insert into golfer_aliases as ga (club_id, raw_name, display_name, user_id, invitation_id, status)
+  select distinct on (o->>'raw_name')
+    target_club_id,
+    o->>'raw_name',
+    o->>'display_name',
+    (o->>'user_id')::uuid,
+    (o->>'invitation_id')::uuid,
+    case when coalesce(o->>'user_id', o->>'invitation_id') is null then 'unresolved' else 'auto' end
+  from jsonb_array_elements(observations) o
+  where coalesce(o->>'raw_name', '') <> ''
+  on conflict (club_id, raw_name) do update set
+    seen_count = ga.seen_count + 1,
+    last_seen_at = now(),
+    display_name = excluded.display_name,
+    user_id = case when ga.status in ('confirmed', 'rejected') then ga.user_id else excluded.user_id end,
+    invitation_id = case when ga.status in ('confirmed', 'rejected') then ga.invitation_id else excluded.invitation_id end,
+    status = case when ga.status in ('confirmed', 'rejected') then ga.status else excluded.status end;
+$$ language sql security definer
+set search_path = public;
+
+revoke execute on function record_golfer_aliases(uuid, jsonb) from public, anon, authenticated;
+grant execute on function record_golfer_aliases(uuid, jsonb) to service_role;
+
+-- Confirm or correct an alias (admin action). Passing neither a user nor an
+-- invitation marks the name as rejected so it is never matched.
+create function resolve_golfer_alias(
+  alias_id uuid,
+  target_user_id uuid default null,
+  target_invitation_id uuid default null
+) returns jsonb as $$
+declare
+  alias record;
+begin
+  select * into alias from golfer_aliases where id = alias_id;
+
+  if alias is null then
+    return jsonb_build_object('success', false, 'error', 'Alias not found');
+  end if;
+
+  if not (is_sysadmin() or is_club_admin(alias.club_id)) then
+    return jsonb_build_object('success', false, 'error', 'Not authorized');
+  end if;
+
+  update golfer_aliases
+  set user_id = target_user_id,
+      invitation_id = case when target_user_id is null then target_invitation_id end,
+      status = case
+        when target_user_id is null and target_invitation_id is null then 'rejected'
+        else 'confirmed'
+      end,
+      confirmed_by = auth.uid(),
+      confirmed_at = now()
+  where id = alias_id;
+
+  return jsonb_build_object('success', true);
+end;
+$$ language plpgsql security definer;
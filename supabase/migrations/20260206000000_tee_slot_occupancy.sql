@@ -0,0 +1,34 @@
+-- Occupancy time series: one narrow row per tee sheet slot per ETL scrape
+-- (filled / blocked / open spots and the club group that won it, if any),
+-- so fill curves and win rates can be computed without re-parsing
+-- external_tee_sheets.raw_data. A time listed for several starting tees
+-- has one row per listing: slot_index is the listing's position among the
+-- sheet's rows at that time (0 otherwise)
+create table tee_slot_occupancy (
+  club_id uuid references clubs(id) on delete cascade not null,
+  tee_date date not null,
+  tee_time time not null,
+  slot_index smallint not null default 0,
+  scraped_at timestamptz not null,
+  filled_spots smallint not null,
+  blocked_spots smallint not null,
+  open_spots smallint not null,
+  group_id uuid references groups(id) on delete set null,
+  user_id uuid references profiles(id) on delete set null,
+  invitation_id uuid references invitations(id) on delete set null,
+  primary key (club_id, tee_date, tee_time, slot_index, scraped_at)
+);
+
+-- Rows arrive in time order, so a BRIN index keeps range scans cheap at
+-- years of history
+create index idx_tee_slot_occupancy_scraped_at on tee_slot_occupancy
+  using brin (scraped_at);
+
+alter table tee_slot_occupancy enable row level security;
+
+create policy "admin read" on tee_slot_occupancy for select to authenticated using (
+  is_sysadmin() or is_club_admin(club_id)
+);
+
+grant select on public.tee_slot_occupancy to authenticated;
+grant select, insert on public.tee_slot_occupancy to service_role;
@@ -0,0 +1,100 @@
+-- Statement-level assignment triggers
+--
+-- The row-level notify_assignment_change / validate_assignment_capacity
+-- triggers re-ran a SUM over the tee time's assignments, a tee_times/weekends
+-- join and a notification insert for every row, so applying a weekend plan in
+-- one insert did quadratic work. These versions read the statement's
+-- transition tables: capacity is checked once per touched tee time and
+-- notifications are written in one set-based insert.
+--
+-- The row-level functions are kept (unused) for
+-- supabase/benchmarks/assignment_triggers.sql.
+
+drop trigger on_assignment_change on assignments;
+drop trigger validate_assignment_capacity on assignments;
+
+create function assignment_notification_message(
+  action text, tee_date date, tee_time time, start_date date, end_date date
+) returns text as $$
+  select 'You have been ' || action || ' a tee time on ' ||
+    to_char(tee_date, 'Mon DD, YYYY') || ' at ' || to_char(tee_time, 'HH24:MI') ||
+    ' for the weekend of ' || to_char(start_date, 'Mon DD') || ' - ' || to_char(end_date, 'Mon DD, YYYY');
+$$ language sql stable;
+
+-- Validate capacity of every tee time the statement added players to.
+-- Runs after the insert, so the totals already include the new rows; raising
+-- rolls the whole statement back.
+create function validate_assignment_capacity_batch() returns trigger as $$
+declare
+  overfull record;
+begin
+  with added as (
+    select tee_time_id, sum(1 + coalesce(array_length(guest_names, 1), 0)) as needed
+    from new_assignments
+    where tee_time_id is not null
+    group by tee_time_id
+  ),
+  totals as (
+    select a.tee_time_id, sum(1 + coalesce(array_length(a.guest_names, 1), 0)) as spots
+    from assignments a
+    join added on added.tee_time_id = a.tee_time_id
+    group by a.tee_time_id
+  )
+  select tt.max_players, totals.spots, added.needed into overfull
+  from added
+  join totals on totals.tee_time_id = added.tee_time_id
+  join tee_times tt on tt.id = added.tee_time_id
+  where totals.spots > tt.max_players
+  limit 1;
+
+  if found then
+    raise exception 'Not enough space in tee time. Available: %, Needed: %',
+      overfull.max_players - (overfull.spots - overfull.needed), overfull.needed;
+  end if;
+
+  return null;
+end;
+$$ language plpgsql security definer;
+
+create trigger validate_assignment_capacity after insert on assignments
+  referencing new table as new_assignments
+  for each statement execute procedure validate_assignment_capacity_batch();
+
+-- Notify real users (not invitation-based assignments) in one insert.
+-- The inner joins skip cascade deletes from tee_times/weekends, whose rows
+-- are already gone.
+create function notify_assignments_added() returns trigger as $$
+begin
+  insert into notifications (user_id, message)
+  select a.user_id,
+    assignment_notification_message('added to', tt.tee_date, tt.tee_time, w.start_date, w.end_date)
+  from new_assignments a
+  join tee_times tt on tt.id = a.tee_time_id
+  join weekends w on w.id = tt.weekend_id
+  where a.user_id is not null;
+
+  return null;
+end;
+$$ language plpgsql security definer;
+
+create function notify_assignments_removed() returns trigger as $$
+begin
+  insert into notifications (user_id, message)
+  select a.user_id,
+    assignment_notification_message('removed from', tt.tee_date, tt.tee_time, w.start_date, w.end_date)
+  from old_assignments a
+  join tee_times tt on tt.id = a.tee_time_id
+  join weekends w on w.id = tt.weekend_id
+  where a.user_id is not null;
+
+  return null;
+end;
+$$ language plpgsql security definer;
+
+create trigger on_assignments_added after insert on assignments
+  referencing new table as new_assignments
+  for each statement execute procedure notify_assignments_added();
+
+create trigger on_assignments_removed after delete on assignments
+  referencing old table as old_assignments
+  for each statement execute procedure notify_assignments_removed();
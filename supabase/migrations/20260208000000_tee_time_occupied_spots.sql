@@ -0,0 +1,147 @@
+-- Maintained occupied_spots on tee_times
+--
+-- Each assignment occupies 1 + its guest count. Instead of summing a tee
+-- time's assignments on every insert, statement-level triggers apply the
+-- per-tee-time delta to tee_times.occupied_spots while holding the tee time
+-- row lock, so capacity checks are O(1) and concurrent assignments into the
+-- same slot serialize instead of overbooking it. The app reads remaining
+-- capacity as max_players - occupied_spots.
+
+alter table tee_times add column occupied_spots integer not null default 0
+  check (occupied_spots >= 0);
+
+update tee_times tt
+set occupied_spots = s.spots
+from (
+  select tee_time_id, sum(1 + coalesce(array_length(guest_names, 1), 0)) as spots
+  from assignments
+  where tee_time_id is not null
+  group by tee_time_id
+) s
+where s.tee_time_id = tt.id;
+
+create function assignment_spots(guest_names text[]) returns integer as $$
+  select 1 + coalesce(array_length(guest_names, 1), 0);
+$$ language sql immutable;
+
+-- Apply spot deltas to tee times and reject any increase past max_players.
+-- Rows are locked in id order so statements touching several tee times
+-- cannot deadlock. FOR NO KEY UPDATE (what the UPDATE itself takes) rather
+-- than FOR UPDATE, which would conflict with the KEY SHARE locks the
+-- assignments foreign key check already holds and deadlock two concurrent
+-- inserts into the same tee time.
+create function apply_occupied_spots(tee_time_ids uuid[], deltas integer[]) returns void as $$
+declare
+  overfull record;
+begin
+  perform 1 from tee_times
+  where id = any(tee_time_ids)
+  order by id
+  for no key update;
+
+  with delta as (
+    select * from unnest(tee_time_ids, deltas) as d(tee_time_id, spots)
+  ),
+  updated as (
+    update tee_times tt
+    set occupied_spots = tt.occupied_spots + delta.spots
+    from delta
+    where tt.id = delta.tee_time_id
+    returning tt.max_players, tt.occupied_spots, delta.spots
+  )
+  select * into overfull
+  from updated
+  where spots > 0 and occupied_spots > max_players
+  limit 1;
+
+  if found then
+    raise exception 'Not enough space in tee time. Available: %, Needed: %',
+      overfull.max_players - (overfull.occupied_spots - overfull.spots), overfull.spots;
+  end if;
+end;
+$$ language plpgsql security definer;
+
+revoke execute on function apply_occupied_spots(uuid[], integer[]) from public, anon, authenticated;
+
+create function occupied_spots_on_insert() returns trigger as $$
+declare
+  ids uuid[];
+  deltas integer[];
+begin
+  select array_agg(tee_time_id), array_agg(spots) into ids, deltas
+  from (
+    select tee_time_id, sum(assignment_spots(guest_names))::integer as spots
+    from new_assignments
+    where tee_time_id is not null
+    group by tee_time_id
+  ) s;
+
+  if ids is not null then
+    perform apply_occupied_spots(ids, deltas);
+  end if;
+  return null;
+end;
+$$ language plpgsql security definer;
+
+-- Cascade deletes from tee_times find no row to update, which is fine
+create function occupied_spots_on_delete() returns trigger as $$
+declare
+  ids uuid[];
+  deltas integer[];
+begin
+  select array_agg(tee_time_id), array_agg(spots) into ids, deltas
+  from (
+    select tee_time_id, -sum(assignment_spots(guest_names))::integer as spots
+    from old_assignments
+    where tee_time_id is not null
+    group by tee_time_id
+  ) s;
+
+  if ids is not null then
+    perform apply_occupied_spots(ids, deltas);
+  end if;
+  return null;
+end;
+$$ language plpgsql security definer;
+
+-- Covers guest list edits and moves between tee times
+create function occupied_spots_on_update() returns trigger as $$
+declare
+  ids uuid[];
+  deltas integer[];
+begin
+  select array_agg(tee_time_id), array_agg(spots) into ids, deltas
+  from (
+    select tee_time_id, sum(spots)::integer as spots
+    from (
+      select tee_time_id, assignment_spots(guest_names) as spots from new_assignments
+      union all
+      select tee_time_id, -assignment_spots(guest_names) from old_assignments
+    ) changes
+    where tee_time_id is not null
+    group by tee_time_id
+    having sum(spots) <> 0
+  ) s;
+
+  if ids is not null then
+    perform apply_occupied_spots(ids, deltas);
+  end if;
+  return null;
+end;
+$$ language plpgsql security definer;
+
+-- The capacity check now happens in apply_occupied_spots
+drop trigger validate_assignment_capacity on assignments;
+drop function validate_assignment_capacity_batch();
+
+create trigger occupied_spots_on_insert after insert on assignments
+  referencing new table as new_assignments
+  for each statement execute procedure occupied_spots_on_insert();
+
+create trigger occupied_spots_on_delete after delete on assignments
+  referencing old table as old_assignments
+  for each statement execute procedure occupied_spots_on_delete();
+
+create trigger occupied_spots_on_update after update on assignments
+  referencing old table as old_assignments new table as new_assignments
+  for each statement execute procedure occupied_spots_on_update();
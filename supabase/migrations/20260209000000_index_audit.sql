@@ -0,0 +1,37 @@
+-- Index audit: supporting indexes for the app's hot filters, RLS helpers and
+-- foreign key cascades. Checked by supabase/benchmarks/query_plans.sql.
+--
+-- tee_times(weekend_id) is already covered by the leading column of
+-- unique (weekend_id, tee_date, tee_time, group_id), and interests(user_id, ...)
+-- by unique (user_id, interest_date).
+
+-- Group member lists, the interests "admin read group" policy join
+create index idx_memberships_group_user on memberships(group_id, user_id);
+-- is_admin(), is_group_admin() and the signed-in user's groups
+create index idx_memberships_user_group on memberships(user_id, group_id) include (role);
+
+-- Group tee sheet, listed in date/time order
+create index idx_tee_times_group_date on tee_times(group_id, tee_date, tee_time);
+
+-- Players on a tee time (embeds, occupancy, cascades) and a member's tee times
+create index idx_assignments_tee_time on assignments(tee_time_id);
+create index idx_assignments_user on assignments(user_id) where user_id is not null;
+
+-- Interest lists for a date
+create index idx_interests_date on interests(interest_date, user_id);
+
+-- Trades involving a group (from_group_id = x or to_group_id = x -> BitmapOr)
+create index idx_trades_from_group on trades(from_group_id);
+create index idx_trades_to_group on trades(to_group_id);
+
+-- Notification feed (newest first) and the unread badge / mark-all-read
+create index idx_notifications_user_created on notifications(user_id, created_at desc);
+create index idx_notifications_user_unread on notifications(user_id) where read = false;
+
+-- handle_new_user auto-claim by email, and pending invitations per group / creator
+create index idx_invitations_pending_email on invitations(lower(invited_email))
+  where claimed_by is null and invitation_type = 'group_member';
+create index idx_invitations_pending_group on invitations(group_id)
+  where claimed_by is null;
+create index idx_invitations_pending_created_by on invitations(created_by, created_at desc)
+  where claimed_by is null;
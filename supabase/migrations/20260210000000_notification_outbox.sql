@@ -0,0 +1,138 @@
+-- Notification outbox for the backend push dispatcher (backend/push_dispatcher.py)
+--
+-- Every notifications insert used to fire the send-push-notification webhook:
+-- one token lookup and one Expo request per row, so publishing a weekend sent
+-- each member a burst of pushes. Notifications are now queued here in one
+-- statement-level insert, and the dispatcher claims them per user once the
+-- user's oldest pending row is older than the coalescing window, sends one
+-- push per user and batches Expo requests. Disable the notifications database
+-- webhook when deploying the dispatcher, or pushes are sent twice.
+create table notification_outbox (
+  id bigint generated always as identity primary key,
+  notification_id uuid references notifications(id) on delete cascade,
+  user_id uuid references profiles(id) on delete cascade not null,
+  message text not null,
+  created_at timestamptz not null default now(),
+  -- Set while a dispatcher holds the row; expired claims are reclaimed
+  claimed_until timestamptz,
+  attempts integer not null default 0,
+  last_error text,
+  sent_at timestamptz,
+  -- Set when the row used its last attempt; it is never claimed again
+  failed_at timestamptz
+);
+
+create index idx_notification_outbox_pending
+  on notification_outbox(user_id, created_at)
+  where sent_at is null and failed_at is null;
+
+alter table notification_outbox enable row level security;
+
+grant select, insert, update, delete on public.notification_outbox to service_role;
+
+create function enqueue_notification_pushes() returns trigger as $$
+begin
+  insert into notification_outbox (notification_id, user_id, message, created_at)
+  select n.id, n.user_id, n.message, coalesce(n.created_at, now())
+  from new_notifications n
+  where n.user_id is not null;
+
+  return null;
+end;
+$$ language plpgsql security definer;
+
+create trigger on_notifications_enqueue after insert on notifications
+  referencing new table as new_notifications
+  for each statement execute procedure enqueue_notification_pushes();
+
+-- Claim the pending rows of up to max_users users whose oldest pending row
+-- is older than coalesce_window. Rows stay claimed for lease; the
+-- dispatcher completes or releases them. Concurrent dispatchers skip rows
+-- another one holds.
+create function claim_notification_outbox(
+  max_users integer default 500,
+  coalesce_window interval default interval '5 seconds',
+  lease interval default interval '1 minute',
+  max_attempts integer default 5
+)
+returns table (id bigint, user_id uuid, notification_id uuid, message text, created_at timestamptz)
+language sql
+security definer
+set search_path = public
+as $$
+  with ready_users as (
+    select o.user_id
+    from notification_outbox o
+    where o.sent_at is null
+      and o.failed_at is null
+      and o.attempts < max_attempts
+      and (o.claimed_until is null or o.claimed_until < now())
+    group by o.user_id
+    having min(o.created_at) <= now() - coalesce_window
+    limit max_users
+  ),
+  claimed as (
+    update notification_outbox o
+    set claimed_until = now() + lease,
+        attempts = o.attempts + 1
+    where o.id in (
+      select p.id
+      from notification_outbox p
+      join ready_users r on r.user_id = p.user_id
+      where p.sent_at is null
+        and p.failed_at is null
+        and p.attempts < max_attempts
+        and (p.claimed_until is null or p.claimed_until < now())
+      for update of p skip locked
+    )
+    returning o.id, o.user_id, o.notification_id, o.message, o.created_at
+  )
+  select * from claimed order by user_id, created_at;
+$$;
+
+create function complete_notification_outbox(outbox_ids bigint[])
+returns void
+language sql
+security definer
+set search_path = public
+as $$
+  update notification_outbox
+  set sent_at = now(), claimed_until = null, last_error = null
+  where id = any(outbox_ids);
+$$;
+
+-- Hand rows back after a failed send. They stay hidden for a backoff that
+-- doubles with each attempt (30 seconds up to an hour), so an Expo outage
+-- does not burn every attempt at once. Rows with no attempts left are marked
+-- failed instead, which takes them out of the pending index and every claim;
+-- returns how many.
+create function release_notification_outbox(
+  outbox_ids bigint[],
+  error text,
+  max_attempts integer default 5
+)
+returns integer
+language sql
+security definer
+set search_path = public
+as $$
+  with released as (
+    update notification_outbox
+    set claimed_until = case when attempts < max_attempts then now() + least(
+          interval '30 seconds' * power(2, greatest(attempts - 1, 0)),
+          interval '1 hour'
+        ) end,
+        failed_at = case when attempts >= max_attempts then now() end,
+        last_error = error
+    where id = any(outbox_ids) and sent_at is null and failed_at is null
+    returning failed_at
+  )
+  select count(*)::integer from released where failed_at is not null;
+$$;
+
+revoke execute on function claim_notification_outbox(integer, interval, interval, integer) from public, anon, authenticated;
+revoke execute on function complete_notification_outbox(bigint[]) from public, anon, authenticated;
+revoke execute on function release_notification_outbox(bigint[], text, integer) from public, anon, authenticated;
+grant execute on function claim_notification_outbox(integer, interval, interval, integer) to service_role;
+grant execute on function complete_notification_outbox(bigint[]) to service_role;
+grant execute on function release_notification_outbox(bigint[], text, integer) to service_role;
@@ -0,0 +1,156 @@
+-- Push token hygiene: receipts, failure counters and one row per device token
+--
+-- Expo reports most delivery failures (uninstalled apps, revoked credentials)
+-- only in push receipts, fetched by ticket id some minutes after the send.
+-- The push dispatcher stores the tickets it gets back in push_tickets, polls
+-- their receipts in batches and reports the outcome per token through
+-- record_push_token_results: DeviceNotRegistered tokens are deleted, other
+-- errors bump a failure counter and tokens that keep failing are disabled,
+-- so the dispatcher skips them before sending, until the app registers the
+-- token again.
+
+alter table push_tokens
+  add column failure_count integer not null default 0,
+  add column last_error text,
+  add column last_failure_at timestamptz,
+  add column disabled_at timestamptz;
+
+-- A device token belongs to the account last signed in on the device: keep
+-- only the most recently registered row for each token, and move the token
+-- to the new user when another account registers it.
+delete from push_tokens p
+using push_tokens newer
+where newer.token = p.token
+  and (coalesce(newer.updated_at, newer.created_at), newer.id)
+    > (coalesce(p.updated_at, p.created_at), p.id);
+
+create unique index idx_push_tokens_token on push_tokens(token);
+
+create function claim_push_token() returns trigger as $$
+begin
+  delete from push_tokens where token = new.token and user_id <> new.user_id;
+  return new;
+end;
+$$ language plpgsql security definer;
+
+create trigger claim_push_token before insert on push_tokens
+  for each row execute procedure claim_push_token();
+
+-- The app re-registering its token (an upsert by the signed-in user) is a
+-- fresh start: failures so far, possibly transient, no longer count and a
+-- disabled token is sent to again. The dispatcher's own updates run as
+-- service_role and keep the counters.
+create function reset_push_token_failures() returns trigger as $$
+begin
+  if auth.role() = 'authenticated' then
+    new.failure_count := 0;
+    new.last_error := null;
+    new.last_failure_at := null;
+    new.disabled_at := null;
+  end if;
+  return new;
+end;
+$$ language plpgsql;
+
+create trigger reset_push_token_failures before update on push_tokens
+  for each row execute procedure reset_push_token_failures();
+
+-- Tickets awaiting a receipt
+create table push_tickets (
+  ticket_id text primary key,
+  token text not null,
+  created_at timestamptz not null default now(),
+  claimed_until timestamptz
+);
+
+create index idx_push_tickets_created on push_tickets(created_at);
+
+alter table push_tickets enable row level security;
+
+grant select, insert, update, delete on public.push_tickets to service_role;
+
+-- Claim up to max_tickets tickets old enough for Expo to have a receipt
+create function claim_push_tickets(
+  max_tickets integer default 1000,
+  min_age interval default interval '15 minutes',
+  lease interval default interval '5 minutes'
+)
+returns table (ticket_id text, token text, created_at timestamptz)
+language sql
+security definer
+set search_path = public
+as $$
+  update push_tickets t
+  set claimed_until = now() + lease
+  where t.ticket_id in (
+    select p.ticket_id
+    from push_tickets p
+    where p.created_at <= now() - min_age
+      and (p.claimed_until is null or p.claimed_until < now())
+    order by p.created_at
+    limit max_tickets
+    for update skip locked
+  )
+  returning t.ticket_id, t.token, t.created_at;
+$$;
+
+-- Apply per-token send outcomes ([{token, status: "ok"|"error", error}]) from
+-- tickets or receipts, and drop the processed tickets
+create function record_push_token_results(
+  results jsonb,
+  processed_ticket_ids text[] default '{}',
+  max_failures integer default 5
+)
+returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+  removed integer;
+  failed integer;
+begin
+  with outcomes as (
+    select
+      r.token,
+      count(*) filter (where r.status = 'error') as errors,
+      coalesce(bool_or(r.error = 'DeviceNotRegistered'), false) as unregistered,
+      max(r.error) filter (where r.status = 'error') as last_error
+    from jsonb_to_recordset(results) as r(token text, status text, error text)
+    group by r.token
+  ),
+  deleted as (
+    delete from push_tokens p
+    using outcomes o
+    where p.token = o.token and o.unregistered
+    returning p.token
+  ),
+  updated as (
+    update push_tokens p
+    set failure_count = case when o.errors > 0 then p.failure_count + o.errors else 0 end,
+        last_error = case when o.errors > 0 then o.last_error else p.last_error end,
+        last_failure_at = case when o.errors > 0 then now() else p.last_failure_at end,
+        disabled_at = case
+          when p.disabled_at is null and p.failure_count + o.errors >= max_failures
+            then now()
+          else p.disabled_at
+        end
+    from outcomes o
+    where p.token = o.token and not o.unregistered
+    returning o.errors
+  )
+  select
+    (select count(*) from deleted),
+    (select count(*) from updated where errors > 0)
+  into removed, failed;
+
+  delete from push_tickets where ticket_id = any(processed_ticket_ids);
+
+  return jsonb_build_object('removed', removed, 'failed', failed);
+end;
+$$;
+
+revoke execute on function claim_push_tickets(integer, interval, interval) from public, anon, authenticated;
+revoke execute on function record_push_token_results(jsonb, text[], integer) from public, anon, authenticated;
+grant execute on function claim_push_tickets(integer, interval, interval) to service_role;
+grant execute on function record_push_token_results(jsonb, text[], integer) to service_role;
@@ -0,0 +1,269 @@
+-- Weekend board: one pre-joined read for a group's weekend, versioned for caching
+--
+-- weekend_versions holds a counter per weekend, bumped by statement-level
+-- triggers whenever something shown on the board changes: the weekend's tee
+-- times, assignments or interests, (for upcoming weekends) group memberships
+-- and member invitations, and the names of the players and members shown.
+-- Invitations also leave the board by expiring, which no write records, so
+-- the full view carries the earliest expiry among the pending invitations
+-- it shows (next_expiry, in epoch seconds) alongside the version. The
+-- backend's GET /weekends/{id}/board derives its ETag from both and caches
+-- boards by them, so a write anywhere on the weekend, or an invitation
+-- expiring, invalidates every cached copy.
+
+create table weekend_versions (
+  weekend_id uuid primary key references weekends(id) on delete cascade,
+  version bigint not null default 1,
+  updated_at timestamptz not null default now()
+);
+
+alter table weekend_versions enable row level security;
+
+create policy "authenticated read" on weekend_versions for select to authenticated using (true);
+
+grant select on public.weekend_versions to authenticated;
+grant select on public.weekend_versions to service_role;
+
+-- Weekends are locked in id order so concurrent writers cannot deadlock.
+-- Weekends deleted in the same statement (cascades) are skipped.
+create function bump_weekend_versions(weekend_ids uuid[]) returns void as $$
+  insert into weekend_versions as v (weekend_id)
+  select w.id from weekends w where w.id = any(weekend_ids) order by w.id
+  on conflict (weekend_id) do update
+    set version = v.version + 1, updated_at = now();
+$$ language sql security definer set search_path = public;
+
+revoke execute on function bump_weekend_versions(uuid[]) from public, anon, authenticated;
+
+-- tee_times and assignments carry weekend_id
+create function bump_weekend_versions_by_weekend_id() returns trigger as $$
+begin
+  if TG_OP = 'INSERT' then
+    perform bump_weekend_versions(array(select distinct weekend_id from new_rows));
+  elsif TG_OP = 'DELETE' then
+    perform bump_weekend_versions(array(select distinct weekend_id from old_rows));
+  else
+    perform bump_weekend_versions(array(
+      select weekend_id from old_rows union select weekend_id from new_rows
+    ));
+  end if;
+  return null;
+end;
+$$ language plpgsql security definer set search_path = public;
+
+-- interests are matched to the weekend containing their date
+create function bump_weekend_versions_by_interest_date() returns trigger as $$
+begin
+  if TG_OP = 'INSERT' then
+    perform bump_weekend_versions(array(
+      select w.id from weekends w
+      join new_rows r on r.interest_date between w.start_date and w.end_date
+    ));
+  elsif TG_OP = 'DELETE' then
+    perform bump_weekend_versions(array(
+      select w.id from weekends w
+      join old_rows r on r.interest_date between w.start_date and w.end_date
+    ));
+  else
+    perform bump_weekend_versions(array(
+      select w.id from weekends w
+      join (
+        select interest_date from old_rows union select interest_date from new_rows
+      ) r on r.interest_date between w.start_date and w.end_date
+    ));
+  end if;
+  return null;
+end;
+$$ language plpgsql security definer set search_path = public;
+
+-- Member lists only matter for weekends that can still be planned
+create function bump_upcoming_weekend_versions() returns trigger as $$
+begin
+  perform bump_weekend_versions(array(
+    select id from weekends where end_date >= current_date
+  ));
+  return null;
+end;
+$$ language plpgsql security definer set search_path = public;
+
+create trigger weekend_version_on_insert after insert on tee_times
+  referencing new table as new_rows
+  for each statement execute procedure bump_weekend_versions_by_weekend_id();
+create trigger weekend_version_on_update after update on tee_times
+  referencing old table as old_rows new table as new_rows
+  for each statement execute procedure bump_weekend_versions_by_weekend_id();
+create trigger weekend_version_on_delete after delete on tee_times
+  referencing old table as old_rows
+  for each statement execute procedure bump_weekend_versions_by_weekend_id();
+
+create trigger weekend_version_on_insert after insert on assignments
+  referencing new table as new_rows
+  for each statement execute procedure bump_weekend_versions_by_weekend_id();
+create trigger weekend_version_on_update after update on assignments
+  referencing old table as old_rows new table as new_rows
+  for each statement execute procedure bump_weekend_versions_by_weekend_id();
+create trigger weekend_version_on_delete after delete on assignments
+  referencing old table as old_rows
+  for each statement execute procedure bump_weekend_versions_by_weekend_id();
+
+create trigger weekend_version_on_insert after insert on interests
+  referencing new table as new_rows
+  for each statement execute procedure bump_weekend_versions_by_interest_date();
+create trigger weekend_version_on_update after update on interests
+  referencing old table as old_rows new table as new_rows
+  for each statement execute procedure bump_weekend_versions_by_interest_date();
+create trigger weekend_version_on_delete after delete on interests
+  referencing old table as old_rows
+  for each statement execute procedure bump_weekend_versions_by_interest_date();
+
+-- A renamed player shows in the player lists of the weekends they are
+-- assigned to and in the member lists of upcoming weekends
+create function bump_weekend_versions_on_rename() returns trigger as $$
+begin
+  perform bump_weekend_versions(array(
+    select a.weekend_id
+    from new_rows n
+    join old_rows o on o.id = n.id
+    join assignments a on a.user_id = n.id
+    where n.full_name is distinct from o.full_name
+    union
+    select w.id from weekends w
+    where w.end_date >= current_date
+      and exists (
+        select 1 from new_rows n
+        join old_rows o on o.id = n.id
+        where n.full_name is distinct from o.full_name
+      )
+  ));
+  return null;
+end;
+$$ language plpgsql security definer set search_path = public;
+
+create trigger weekend_version_on_rename after update on profiles
+  referencing old table as old_rows new table as new_rows
+  for each statement execute procedure bump_weekend_versions_on_rename();
+
+create trigger weekend_version_on_change after insert or update or delete on memberships
+  for each statement execute procedure bump_upcoming_weekend_versions();
+create trigger weekend_version_on_change after insert or update or delete on invitations
+  for each statement execute procedure bump_upcoming_weekend_versions();
+
+-- Current version and the caller's view of a board. Group admins, club admins
+-- and sysadmins get the full board (with interests and pending invitations);
+-- everyone else gets tee times, players and members. next_expiry changes
+-- when one of the full view's pending invitations expires.
+create function weekend_board_version(target_weekend_id uuid, target_group_id uuid)
+returns table (version bigint, full_view boolean, next_expiry bigint) as $$
+  select
+    b.version,
+    b.full_view,
+    case when b.full_view then (
+      select floor(extract(epoch from min(i.expires_at)))::bigint
+      from invitations i
+      where i.group_id = target_group_id
+        and i.invitation_type = 'group_member'
+        and i.claimed_by is null
+        and i.expires_at > now()
+    ) end
+  from (
+    select
+      coalesce((select v.version from weekend_versions v where v.weekend_id = target_weekend_id), 0) as version,
+      is_sysadmin()
+        or is_group_admin(target_group_id)
+        or is_club_admin((select club_id from groups where id = target_group_id)) as full_view
+  ) b;
+$$ language sql security definer stable set search_path = public;
+
+create function weekend_board(target_weekend_id uuid, target_group_id uuid) returns jsonb as $$
+declare
+  board_version bigint;
+  full_view boolean;
+  next_expiry bigint;
+  board jsonb;
+begin
+  select v.version, v.full_view, v.next_expiry into board_version, full_view, next_expiry
+  from weekend_board_version(target_weekend_id, target_group_id) v;
+
+  select jsonb_build_object(
+    'weekend', jsonb_build_object('id', w.id, 'start_date', w.start_date, 'end_date', w.end_date),
+    'group_id', target_group_id,
+    'version', board_version,
+    'full_view', full_view,
+    'next_expiry', next_expiry,
+    'tee_times', coalesce((
+      select jsonb_agg(jsonb_build_object(
+        'id', t.id,
+        'tee_date', t.tee_date,
+        'tee_time', t.tee_time,
+        'max_players', t.max_players,
+        'occupied_spots', t.occupied_spots,
+        'players', coalesce((
+          select jsonb_agg(jsonb_build_object(
+            'assignment_id', a.id,
+            'id', coalesce(a.user_id, a.invitation_id),
+            'user_id', a.user_id,
+            'invitation_id', a.invitation_id,
+            'full_name', coalesce(p.full_name, i.display_name,
+              case when a.user_id is null then 'Pending Member' else 'Unknown' end),
+            'guest_names', coalesce(to_jsonb(a.guest_names), '[]'::jsonb),
+            'is_pending', a.user_id is null
+          ) order by a.created_at, a.id)
+          from assignments a
+          left join profiles p on p.id = a.user_id
+          left join invitations i on i.id = a.invitation_id
+          where a.tee_time_id = t.id
+        ), '[]'::jsonb)
+      ) order by t.tee_date, t.tee_time)
+      from tee_times t
+      where t.weekend_id = w.id and t.group_id = target_group_id
+    ), '[]'::jsonb),
+    'members', coalesce((
+      select jsonb_agg(jsonb_build_object(
+        'id', m.user_id,
+        'full_name', p.full_name,
+        'role', m.role,
+        'is_pending', false
+      ) order by p.full_name)
+      from memberships m
+      join profiles p on p.id = m.user_id
+      where m.group_id = target_group_id
+    ), '[]'::jsonb) || case when full_view then coalesce((
+      select jsonb_agg(jsonb_build_object(
+        'id', i.id,
+        'full_name', coalesce(i.display_name, 'Pending Member'),
+        'role', i.target_role,
+        'is_pending', true
+      ) order by i.display_name)
+      from invitations i
+      where i.group_id = target_group_id
+        and i.invitation_type = 'group_member'
+        and i.claimed_by is null
+        and i.expires_at > now()
+    ), '[]'::jsonb) else '[]'::jsonb end,
+    'interests', case when full_view then coalesce((
+      select jsonb_agg(jsonb_build_object(
+        'user_id', n.user_id,
+        'interest_date', n.interest_date,
+        'wants_to_play', n.wants_to_play,
+        'time_preference', n.time_preference,
+        'transportation', n.transportation,
+        'partners', n.partners,
+        'guest_count', n.guest_count,
+        'notes', n.notes
+      ) order by n.interest_date, n.created_at)
+      from interests n
+      join memberships m on m.user_id = n.user_id and m.group_id = target_group_id
+      where n.interest_date between w.start_date and w.end_date
+    ), '[]'::jsonb) end
+  ) into board
+  from weekends w
+  where w.id = target_weekend_id;
+
+  return board;
+end;
+$$ language plpgsql security definer stable set search_path = public;
+
+revoke execute on function weekend_board_version(uuid, uuid) from public, anon;
+revoke execute on function weekend_board(uuid, uuid) from public, anon;
+grant execute on function weekend_board_version(uuid, uuid) to authenticated;
+grant execute on function weekend_board(uuid, uuid) to authenticated;
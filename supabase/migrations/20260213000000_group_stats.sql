@@ -0,0 +1,197 @@
+-- Precomputed dashboard counters per group
+--
+-- The dashboard showed four exact counts (members, pending invitations, tee
+-- times, trades), each a scan of a large table. group_stats keeps them up to
+-- date from statement-level triggers, so the dashboard (and the backend's
+-- GET /groups/{id}/stats) reads a single row.
+
+create table group_stats (
+  group_id uuid primary key references groups(id) on delete cascade,
+  member_count integer not null default 0,
+  pending_invitation_count integer not null default 0,
+  tee_time_count integer not null default 0,
+  trade_count integer not null default 0,
+  updated_at timestamptz not null default now()
+);
+
+alter table group_stats enable row level security;
+
+create policy "authenticated read" on group_stats for select to authenticated using (true);
+
+grant select on public.group_stats to authenticated;
+grant select on public.group_stats to service_role;
+
+insert into group_stats (
+  group_id, member_count, pending_invitation_count, tee_time_count, trade_count
+)
+select
+  g.id,
+  (select count(*) from memberships m where m.group_id = g.id),
+  (select count(*) from invitations i
+    where i.group_id = g.id and i.invitation_type = 'group_member' and i.claimed_by is null),
+  (select count(*) from tee_times t where t.group_id = g.id),
+  (select count(*) from trades tr where tr.from_group_id = g.id or tr.to_group_id = g.id)
+from groups g;
+
+-- Add one to `stat` for each entry of added_group_ids and subtract one for
+-- each entry of removed_group_ids. Rows are locked in group id order so
+-- concurrent writers cannot deadlock; groups deleted in the same statement
+-- (cascades) are skipped.
+create function apply_group_stat_deltas(
+  stat text, added_group_ids uuid[], removed_group_ids uuid[]
+) returns void as $$
+begin
+  execute format($sql$
+    insert into group_stats as s (group_id, %1$I)
+    select g.id, sum(d.delta)
+    from (
+      select unnest($1), 1
+      union all
+      select unnest($2), -1
+    ) d(group_id, delta)
+    join groups g on g.id = d.group_id
+    group by g.id
+    having sum(d.delta) <> 0
+    order by g.id
+    on conflict (group_id) do update
+      set %1$I = s.%1$I + excluded.%1$I, updated_at = now()
+  $sql$, stat)
+  using added_group_ids, removed_group_ids;
+end;
+$$ language plpgsql security definer set search_path = public;
+
+revoke execute on function apply_group_stat_deltas(text, uuid[], uuid[]) from public, anon, authenticated;
+
+create function group_stats_on_memberships() returns trigger as $$
+begin
+  if TG_OP = 'INSERT' then
+    perform apply_group_stat_deltas('member_count', array(select group_id from new_rows), '{}');
+  elsif TG_OP = 'DELETE' then
+    perform apply_group_stat_deltas('member_count', '{}', array(select group_id from old_rows));
+  else
+    perform apply_group_stat_deltas('member_count',
+      array(select group_id from new_rows), array(select group_id from old_rows));
+  end if;
+  return null;
+end;
+$$ language plpgsql security definer set search_path = public;
+
+-- Pending: group member invitations not yet claimed
+create function group_stats_on_invitations() returns trigger as $$
+begin
+  if TG_OP = 'INSERT' then
+    perform apply_group_stat_deltas('pending_invitation_count',
+      array(select group_id from new_rows
+        where invitation_type = 'group_member' and claimed_by is null),
+      '{}');
+  elsif TG_OP = 'DELETE' then
+    perform apply_group_stat_deltas('pending_invitation_count',
+      '{}',
+      array(select group_id from old_rows
+        where invitation_type = 'group_member' and claimed_by is null));
+  else
+    perform apply_group_stat_deltas('pending_invitation_count',
+      array(select group_id from new_rows
+        where invitation_type = 'group_member' and claimed_by is null),
+      array(select group_id from old_rows
+        where invitation_type = 'group_member' and claimed_by is null));
+  end if;
+  return null;
+end;
+$$ language plpgsql security definer set search_path = public;
+
+create function group_stats_on_tee_times() returns trigger as $$
+begin
+  if TG_OP = 'INSERT' then
+    perform apply_group_stat_deltas('tee_time_count', array(select group_id from new_rows), '{}');
+  elsif TG_OP = 'DELETE' then
+    perform apply_group_stat_deltas('tee_time_count', '{}', array(select group_id from old_rows));
+  else
+    perform apply_group_stat_deltas('tee_time_count',
+      array(select group_id from new_rows), array(select group_id from old_rows));
+  end if;
+  return null;
+end;
+$$ language plpgsql security definer set search_path = public;
+
+-- A trade counts once for each group on either side of it
+create function group_stats_on_trades() returns trigger as $$
+begin
+  if TG_OP = 'INSERT' then
+    perform apply_group_stat_deltas('trade_count',
+      array(select from_group_id from new_rows
+        union all
+        select to_group_id from new_rows where to_group_id is distinct from from_group_id),
+      '{}');
+  elsif TG_OP = 'DELETE' then
+    perform apply_group_stat_deltas('trade_count',
+      '{}',
+      array(select from_group_id from old_rows
+        union all
+        select to_group_id from old_rows where to_group_id is distinct from from_group_id));
+  else
+    perform apply_group_stat_deltas('trade_count',
+      array(select from_group_id from new_rows
+        union all
+        select to_group_id from new_rows where to_group_id is distinct from from_group_id),
+      array(select from_group_id from old_rows
+        union all
+        select to_group_id from old_rows where to_group_id is distinct from from_group_id));
+  end if;
+  return null;
+end;
+$$ language plpgsql security definer set search_path = public;
+
+create trigger group_stats_on_insert after insert on memberships
+  referencing new table as new_rows
+  for each statement execute procedure group_stats_on_memberships();
+create trigger group_stats_on_update after update on memberships
+  referencing old table as old_rows new table as new_rows
+  for each statement execute procedure group_stats_on_memberships();
+create trigger group_stats_on_delete after delete on memberships
+  referencing old table as old_rows
+  for each statement execute procedure group_stats_on_memberships();
+
+create trigger group_stats_on_insert after insert on invitations
+  referencing new table as new_rows
+  for each statement execute procedure group_stats_on_invitations();
+create trigger group_stats_on_update after update on invitations
+  referencing old table as old_rows new table as new_rows
+  for each statement execute procedure group_stats_on_invitations();
+create trigger group_stats_on_delete after delete on invitations
+  referencing old table as old_rows
+  for each statement execute procedure group_stats_on_invitations();
+
+create trigger group_stats_on_insert after insert on tee_times
+  referencing new table as new_rows
+  for each statement execute procedure group_stats_on_tee_times();
+create trigger group_stats_on_update after update on tee_times
+  referencing old table as old_rows new table as new_rows
+  for each statement execute procedure group_stats_on_tee_times();
+create trigger group_stats_on_delete after delete on tee_times
+  referencing old table as old_rows
+  for each statement execute procedure group_stats_on_tee_times();
+
+create trigger group_stats_on_insert after insert on trades
+  referencing new table as new_rows
+  for each statement execute procedure group_stats_on_trades();
+create trigger group_stats_on_update after update on trades
+  referencing old table as old_rows new table as new_rows
+  for each statement execute procedure group_stats_on_trades();
+create trigger group_stats_on_delete after delete on trades
+  referencing old table as old_rows
+  for each statement execute procedure group_stats_on_trades();
+
+-- New groups start with a zero row
+create function create_group_stats() returns trigger as $$
+begin
+  insert into group_stats (group_id)
+  select id from new_groups
+  on conflict (group_id) do nothing;
+  return null;
+end;
+$$ language plpgsql security definer set search_path = public;
+
+create trigger create_group_stats after insert on groups
+  referencing new table as new_groups
+  for each statement execute procedure create_group_stats();
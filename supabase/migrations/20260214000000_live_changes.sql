@@ -0,0 +1,99 @@
+-- Live change feed for the backend's server-sent events
+--
+-- Statement-level triggers on assignments, tee_times and trades publish what
+-- changed on the grouptee_changes channel: one notification per (weekend,
+-- group) touched by the statement, carrying the changed rows' display
+-- columns (only ids for deletes). The backend LISTENs on the channel and
+-- fans each notification out to the clients subscribed to that weekend or
+-- group. Notifications are delivered on commit, and not at all on rollback.
+--
+-- pg_notify payloads are limited to 8000 bytes: larger changes are sent
+-- without rows and flagged truncated, and clients refetch instead.
+
+create function notify_live_changes() returns trigger as $$
+declare
+  changed jsonb;
+  kept_columns text[];
+  change record;
+  payload jsonb;
+begin
+  if TG_OP = 'DELETE' then
+    select coalesce(jsonb_agg(to_jsonb(r)), '[]'::jsonb) into changed from old_rows r;
+    kept_columns := array['id'];
+  else
+    select coalesce(jsonb_agg(to_jsonb(r)), '[]'::jsonb) into changed from new_rows r;
+    kept_columns := case TG_TABLE_NAME
+      when 'assignments' then
+        array['id', 'tee_time_id', 'user_id', 'invitation_id', 'guest_names']
+      when 'tee_times' then
+        array['id', 'tee_date', 'tee_time', 'max_players', 'occupied_spots']
+      else
+        array['id', 'status', 'from_group_id', 'to_group_id', 'from_tee_time_id', 'to_tee_time_id']
+    end;
+  end if;
+
+  for change in
+    select s.weekend_id, s.group_id, jsonb_agg(s.row_diff) as rows
+    from (
+      select
+        (r ->> 'weekend_id')::uuid as weekend_id,
+        g.group_id,
+        (select jsonb_object_agg(c, r -> c) from unnest(kept_columns) c) as row_diff
+      from jsonb_array_elements(changed) r
+      cross join lateral (
+        select distinct unnest(case TG_TABLE_NAME
+          when 'tee_times' then array[(r ->> 'group_id')::uuid]
+          when 'trades' then array[(r ->> 'from_group_id')::uuid, (r ->> 'to_group_id')::uuid]
+          -- assignments: the tee time's group (gone if the tee time was deleted)
+          else array[(select t.group_id from tee_times t where t.id = (r ->> 'tee_time_id')::uuid)]
+        end)
+      ) g(group_id)
+    ) s
+    group by s.weekend_id, s.group_id
+  loop
+    payload := jsonb_build_object(
+      'table', TG_TABLE_NAME,
+      'op', lower(TG_OP),
+      'weekend_id', change.weekend_id,
+      'group_id', change.group_id,
+      'rows', change.rows
+    );
+    if octet_length(payload::text) > 7900 then
+      payload := (payload - 'rows') || jsonb_build_object('truncated', true);
+    end if;
+    perform pg_notify('grouptee_changes', payload::text);
+  end loop;
+
+  return null;
+end;
+$$ language plpgsql security definer set search_path = public;
+
+create trigger live_changes_on_insert after insert on assignments
+  referencing new table as new_rows
+  for each statement execute procedure notify_live_changes();
+create trigger live_changes_on_update after update on assignments
+  referencing new table as new_rows
+  for each statement execute procedure notify_live_changes();
+create trigger live_changes_on_delete after delete on assignments
+  referencing old table as old_rows
+  for each statement execute procedure notify_live_changes();
+
+create trigger live_changes_on_insert after insert on tee_times
+  referencing new table as new_rows
+  for each statement execute procedure notify_live_changes();
+create trigger live_changes_on_update after update on tee_times
+  referencing new table as new_rows
+  for each statement execute procedure notify_live_changes();
+create trigger live_changes_on_delete after delete on tee_times
+  referencing old table as old_rows
+  for each statement execute procedure notify_live_changes();
+
+create trigger live_changes_on_insert after insert on trades
+  referencing new table as new_rows
+  for each statement execute procedure notify_live_changes();
+create trigger live_changes_on_update after update on trades
+  referencing new table as new_rows
+  for each statement execute procedure notify_live_changes();
+create trigger live_changes_on_delete after delete on trades
+  referencing old table as old_rows
+  for each statement execute procedure notify_live_changes();
@@ -0,0 +1,83 @@
+-- Input for the backend's weekend assignment solver
+--
+-- weekend_solver_snapshot() returns everything a solve needs in one round
+-- trip: the weekend's tee times across all groups with their remaining
+-- capacity, the interested players of each group, and the existing
+-- assignments. Admins manage assignments in every group (see the "admin
+-- manage" policy on assignments), so the snapshot is limited to admins
+-- rather than filtered per group. The backend checks can_assign_weekends()
+-- before letting a caller join a solve already in progress.
+
+create function can_assign_weekends() returns boolean as $$
+  select is_sysadmin() or is_admin()
+    or exists (select 1 from club_admins where user_id = auth.uid());
+$$ language sql security definer stable set search_path = public;
+
+create function weekend_solver_snapshot(target_weekend_id uuid) returns jsonb as $$
+declare
+  snapshot jsonb;
+begin
+  if not can_assign_weekends() then
+    raise exception 'Only admins can assign a weekend' using errcode = '42501';
+  end if;
+
+  select jsonb_build_object(
+    'weekend', jsonb_build_object('id', w.id, 'start_date', w.start_date, 'end_date', w.end_date),
+    'tee_times', coalesce((
+      select jsonb_agg(jsonb_build_object(
+        'id', t.id,
+        'group_id', t.group_id,
+        'tee_date', t.tee_date,
+        'tee_time', t.tee_time,
+        'max_players', coalesce(t.max_players, 4),
+        'occupied_spots', t.occupied_spots
+      ) order by t.tee_date, t.tee_time, t.id)
+      from tee_times t
+      where t.weekend_id = w.id
+    ), '[]'::jsonb),
+    -- A player in several groups plays with their primary group
+    'players', coalesce((
+      select jsonb_agg(jsonb_build_object(
+        'user_id', n.user_id,
+        'group_id', m.group_id,
+        'interest_date', n.interest_date,
+        'time_preference', n.time_preference,
+        'guest_count', coalesce(n.guest_count, 0),
+        'partners', coalesce(n.partners, '[]'::jsonb)
+      ) order by n.interest_date, n.user_id)
+      from interests n
+      cross join lateral (
+        select mm.group_id from memberships mm
+        where mm.user_id = n.user_id
+        order by mm.is_primary desc nulls last, mm.created_at, mm.group_id
+        limit 1
+      ) m
+      where n.interest_date between w.start_date and w.end_date
+        and n.wants_to_play
+    ), '[]'::jsonb),
+    'assignments', coalesce((
+      select jsonb_agg(jsonb_build_object(
+        'id', a.id,
+        'tee_time_id', a.tee_time_id,
+        'group_id', t.group_id,
+        'tee_date', t.tee_date,
+        'user_id', a.user_id,
+        'invitation_id', a.invitation_id,
+        'guest_count', coalesce(array_length(a.guest_names, 1), 0)
+      ) order by a.id)
+      from assignments a
+      join tee_times t on t.id = a.tee_time_id
+      where a.weekend_id = w.id
+    ), '[]'::jsonb)
+  ) into snapshot
+  from weekends w
+  where w.id = target_weekend_id;
+
+  return snapshot;
+end;
+$$ language plpgsql security definer stable set search_path = public;
+
+revoke execute on function can_assign_weekends() from public, anon;
+revoke execute on function weekend_solver_snapshot(uuid) from public, anon;
+grant execute on function can_assign_weekends() to authenticated;
+grant execute on function weekend_solver_snapshot(uuid) to authenticated;
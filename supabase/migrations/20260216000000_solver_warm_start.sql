@@ -0,0 +1,73 @@
+-- Warm-start re-solves
+--
+-- The solver now starts from the weekend's existing assignments and only
+-- re-plans the tee times a change touches. To release the assignment of a
+-- player who changed their mind, it needs their interest even when
+-- wants_to_play is false, so the snapshot's players carry wants_to_play.
+
+create or replace function weekend_solver_snapshot(target_weekend_id uuid) returns jsonb as $$
+declare
+  snapshot jsonb;
+begin
+  if not can_assign_weekends() then
+    raise exception 'Only admins can assign a weekend' using errcode = '42501';
+  end if;
+
+  select jsonb_build_object(
+    'weekend', jsonb_build_object('id', w.id, 'start_date', w.start_date, 'end_date', w.end_date),
+    'tee_times', coalesce((
+      select jsonb_agg(jsonb_build_object(
+        'id', t.id,
+        'group_id', t.group_id,
+        'tee_date', t.tee_date,
+        'tee_time', t.tee_time,
+        'max_players', coalesce(t.max_players, 4),
+        'occupied_spots', t.occupied_spots
+      ) order by t.tee_date, t.tee_time, t.id)
+      from tee_times t
+      where t.weekend_id = w.id
+    ), '[]'::jsonb),
+    -- A player in several groups plays with their primary group. Players
+    -- who said they won't play are included so a re-solve can release
+    -- their existing assignments.
+    'players', coalesce((
+      select jsonb_agg(jsonb_build_object(
+        'user_id', n.user_id,
+        'group_id', m.group_id,
+        'interest_date', n.interest_date,
+        'wants_to_play', n.wants_to_play,
+        'time_preference', n.time_preference,
+        'guest_count', coalesce(n.guest_count, 0),
+        'partners', coalesce(n.partners, '[]'::jsonb)
+      ) order by n.interest_date, n.user_id)
+      from interests n
+      cross join lateral (
+        select mm.group_id from memberships mm
+        where mm.user_id = n.user_id
+        order by mm.is_primary desc nulls last, mm.created_at, mm.group_id
+        limit 1
+      ) m
+      where n.interest_date between w.start_date and w.end_date
+        and n.wants_to_play is not null
+    ), '[]'::jsonb),
+    'assignments', coalesce((
+      select jsonb_agg(jsonb_build_object(
+        'id', a.id,
+        'tee_time_id', a.tee_time_id,
+        'group_id', t.group_id,
+        'tee_date', t.tee_date,
+        'user_id', a.user_id,
+        'invitation_id', a.invitation_id,
+        'guest_count', coalesce(array_length(a.guest_names, 1), 0)
+      ) order by a.id)
+      from assignments a
+      join tee_times t on t.id = a.tee_time_id
+      where a.weekend_id = w.id
+    ), '[]'::jsonb)
+  ) into snapshot
+  from weekends w
+  where w.id = target_weekend_id;
+
+  return snapshot;
+end;
+$$ language plpgsql security definer stable set search_path = public;
@@ -0,0 +1,202 @@
+-- Cross-weekend fairness ledger
+--
+-- fairness_ledger keeps running totals per player: rounds played, early
+-- (before 09:00) and late (from 14:00) rounds, and days they wanted to play
+-- but were not placed. Totals grow when a weekend is finalized: an admin
+-- calls finalize_weekend() once the plan is played, and that weekend's
+-- assignments and unmet interests are added in one set-based upsert. The
+-- solver reads the rows of the weekend's players with the rest of its
+-- snapshot, so no run re-aggregates the assignments history.
+--
+-- Weekends already over are finalized here to seed the ledger.
+
+alter table weekends add column finalized_at timestamptz;
+
+create table fairness_ledger (
+  user_id uuid primary key references profiles(id) on delete cascade,
+  rounds_played integer not null default 0,
+  early_rounds integer not null default 0,
+  late_rounds integer not null default 0,
+  missed_rounds integer not null default 0,
+  last_weekend_id uuid references weekends(id) on delete set null,
+  updated_at timestamptz not null default now()
+);
+
+alter table fairness_ledger enable row level security;
+
+create policy "read own or admin" on fairness_ledger for select to authenticated
+  using (user_id = auth.uid() or can_assign_weekends());
+
+grant select on public.fairness_ledger to authenticated;
+grant select on public.fairness_ledger to service_role;
+
+-- Add a weekend's results to the ledger. The tee time bounds match the
+-- solver's morning and late-afternoon windows. Rows are upserted in user id
+-- order so concurrent finalizations cannot deadlock.
+create function apply_weekend_to_fairness_ledger(target_weekend_id uuid) returns integer as $$
+declare
+  players integer;
+begin
+  insert into fairness_ledger as l (
+    user_id, rounds_played, early_rounds, late_rounds, missed_rounds, last_weekend_id
+  )
+  select d.user_id, sum(d.played), sum(d.early), sum(d.late), sum(d.missed), target_weekend_id
+  from (
+    select a.user_id, 1, (t.tee_time < '09:00')::int, (t.tee_time >= '14:00')::int, 0
+    from assignments a
+    join tee_times t on t.id = a.tee_time_id
+    where a.weekend_id = target_weekend_id and a.user_id is not null
+    union all
+    select n.user_id, 0, 0, 0, 1
+    from interests n
+    join weekends w on n.interest_date between w.start_date and w.end_date
+    where w.id = target_weekend_id
+      and n.wants_to_play
+      and not exists (
+        select 1 from assignments a
+        join tee_times t on t.id = a.tee_time_id
+        where a.weekend_id = target_weekend_id
+          and a.user_id = n.user_id
+          and t.tee_date = n.interest_date
+      )
+  ) d(user_id, played, early, late, missed)
+  group by d.user_id
+  order by d.user_id
+  on conflict (user_id) do update set
+    rounds_played = l.rounds_played + excluded.rounds_played,
+    early_rounds = l.early_rounds + excluded.early_rounds,
+    late_rounds = l.late_rounds + excluded.late_rounds,
+    missed_rounds = l.missed_rounds + excluded.missed_rounds,
+    last_weekend_id = excluded.last_weekend_id,
+    updated_at = now();
+
+  get diagnostics players = row_count;
+  return players;
+end;
+$$ language plpgsql security definer set search_path = public;
+
+revoke execute on function apply_weekend_to_fairness_ledger(uuid) from public, anon, authenticated;
+
+-- Finalize a weekend once; a second call fails instead of counting it twice.
+-- Returns null for an unknown weekend.
+create function finalize_weekend(target_weekend_id uuid) returns jsonb as $$
+declare
+  finalized timestamptz;
+  players integer;
+begin
+  if not can_assign_weekends() then
+    raise exception 'Only admins can finalize a weekend' using errcode = '42501';
+  end if;
+
+  update weekends set finalized_at = now()
+  where id = target_weekend_id and finalized_at is null
+  returning finalized_at into finalized;
+
+  if finalized is null then
+    if exists (select 1 from weekends where id = target_weekend_id) then
+      raise exception 'Weekend % is already finalized', target_weekend_id
+        using errcode = '55000';
+    end if;
+    return null;
+  end if;
+
+  players := apply_weekend_to_fairness_ledger(target_weekend_id);
+  return jsonb_build_object(
+    'weekend_id', target_weekend_id,
+    'finalized_at', finalized,
+    'players', players
+  );
+end;
+$$ language plpgsql security definer set search_path = public;
+
+revoke execute on function finalize_weekend(uuid) from public, anon;
+grant execute on function finalize_weekend(uuid) to authenticated;
+
+update weekends set finalized_at = now() where end_date < current_date;
+
+select apply_weekend_to_fairness_ledger(id)
+from weekends
+where finalized_at is not null
+order by start_date;
+
+create or replace function weekend_solver_snapshot(target_weekend_id uuid) returns jsonb as $$
+declare
+  snapshot jsonb;
+begin
+  if not can_assign_weekends() then
+    raise exception 'Only admins can assign a weekend' using errcode = '42501';
+  end if;
+
+  select jsonb_build_object(
+    'weekend', jsonb_build_object('id', w.id, 'start_date', w.start_date, 'end_date', w.end_date),
+    'tee_times', coalesce((
+      select jsonb_agg(jsonb_build_object(
+        'id', t.id,
+        'group_id', t.group_id,
+        'tee_date', t.tee_date,
+        'tee_time', t.tee_time,
+        'max_players', coalesce(t.max_players, 4),
+        'occupied_spots', t.occupied_spots
+      ) order by t.tee_date, t.tee_time, t.id)
+      from tee_times t
+      where t.weekend_id = w.id
+    ), '[]'::jsonb),
+    -- A player in several groups plays with their primary group. Players
+    -- who said they won't play are included so a re-solve can release
+    -- their existing assignments.
+    'players', coalesce((
+      select jsonb_agg(jsonb_build_object(
+        'user_id', n.user_id,
+        'group_id', m.group_id,
+        'interest_date', n.interest_date,
+        'wants_to_play', n.wants_to_play,
+        'time_preference', n.time_preference,
+        'guest_count', coalesce(n.guest_count, 0),
+        'partners', coalesce(n.partners, '[]'::jsonb)
+      ) order by n.interest_date, n.user_id)
+      from interests n
+      cross join lateral (
+        select mm.group_id from memberships mm
+        where mm.user_id = n.user_id
+        order by mm.is_primary desc nulls last, mm.created_at, mm.group_id
+        limit 1
+      ) m
+      where n.interest_date between w.start_date and w.end_date
+        and n.wants_to_play is not null
+    ), '[]'::jsonb),
+    'assignments', coalesce((
+      select jsonb_agg(jsonb_build_object(
+        'id', a.id,
+        'tee_time_id', a.tee_time_id,
+        'group_id', t.group_id,
+        'tee_date', t.tee_date,
+        'user_id', a.user_id,
+        'invitation_id', a.invitation_id,
+        'guest_count', coalesce(array_length(a.guest_names, 1), 0)
+      ) order by a.id)
+      from assignments a
+      join tee_times t on t.id = a.tee_time_id
+      where a.weekend_id = w.id
+    ), '[]'::jsonb),
+    -- Ledger rows of the weekend's interested players, by user id
+    'fairness', coalesce((
+      select jsonb_object_agg(l.user_id, jsonb_build_object(
+        'rounds_played', l.rounds_played,
+        'early_rounds', l.early_rounds,
+        'late_rounds', l.late_rounds,
+        'missed_rounds', l.missed_rounds
+      ))
+      from fairness_ledger l
+      where l.user_id in (
+        select n.user_id from interests n
+        where n.interest_date between w.start_date and w.end_date
+          and n.wants_to_play
+      )
+    ), '{}'::jsonb)
+  ) into snapshot
+  from weekends w
+  where w.id = target_weekend_id;
+
+  return snapshot;
+end;
+$$ language plpgsql security definer stable set search_path = public;